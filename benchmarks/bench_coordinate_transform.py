@@ -0,0 +1,80 @@
+"""
+Coordinate Transform Benchmark
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: Compare single-point and batch pixel -> world conversion at 10^6 points
+
+The single-point path (pixel_to_world_coords) is timed on a subset and
+extrapolated, since a million calls take minutes. Both paths are checked
+against each other on that subset.
+
+Usage:
+    python benchmarks/bench_coordinate_transform.py
+    python benchmarks/bench_coordinate_transform.py --points 1000000 --single 20000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pyrealsense2 as rs
+
+# Make the repository root importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'xy_transform'))
+from coordinate_transform import CoordinateTransformer
+from src.utils.intrinsics import default_intrinsics, make_intrinsics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batch coordinate transforms")
+    parser.add_argument('--points', type=int, default=1_000_000, help="Points for the batch path")
+    parser.add_argument('--single', type=int, default=20_000, help="Points for the single-point path")
+    parser.add_argument('--repeats', type=int, default=5, help="Timing repeats for the batch path")
+    args = parser.parse_args()
+
+    transformer = CoordinateTransformer(camera_height_m=2.21, pitch_deg=3.0, roll_deg=1.0, yaw_deg=-2.0)
+
+    # Typical D435 color intrinsics with inverse Brown-Conrady distortion
+    ideal = default_intrinsics(1280, 720)
+    transformer.set_intrinsics(make_intrinsics(1280, 720, ideal.fx, ideal.fy, 641.3, 362.8,
+                                               rs.distortion.inverse_brown_conrady,
+                                               [0.002, -0.004, 0.0003, 0.0005, 0.001]))
+
+    rng = np.random.default_rng(0)
+    u = rng.uniform(0, 1280, args.points)
+    v = rng.uniform(0, 720, args.points)
+    depth = rng.uniform(1.8, 2.3, args.points)
+
+    # Batch path
+    transformer.pixels_to_world_coords(u[:1000], v[:1000], depth[:1000])  # Warm-up
+    start = time.perf_counter()
+    for _ in range(args.repeats):
+        camera_coords, world_coords = transformer.pixels_to_world_coords(u, v, depth)
+    batch_s = (time.perf_counter() - start) / args.repeats
+
+    # Single-point path on a subset
+    n_single = min(args.single, args.points)
+    single_world = np.empty((n_single, 3))
+    start = time.perf_counter()
+    for i in range(n_single):
+        single_world[i] = transformer.pixel_to_world_coords(u[i], v[i], depth[i])['world_coords']
+    single_s = (time.perf_counter() - start) / n_single * args.points
+
+    max_error_mm = np.abs(world_coords[:n_single] - single_world).max() * 1000
+
+    print("\n" + "="*60)
+    print(f"Points:                 {args.points:,}")
+    print(f"Single-point (est.):    {single_s:.2f} s ({single_s / args.points * 1e6:.2f} us/point)")
+    print(f"Batch:                  {batch_s * 1000:.1f} ms ({batch_s / args.points * 1e9:.1f} ns/point)")
+    print(f"Speedup:                {single_s / batch_s:.0f}x")
+    print(f"Max difference:         {max_error_mm:.6f} mm (over {n_single:,} points)")
+    print(f"Output:                 {world_coords.shape} {world_coords.dtype}, "
+          f"C-contiguous={world_coords.flags['C_CONTIGUOUS']}")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Decimation Benchmark
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: Throughput of the processing path at decimation 1, 2, 3 and 4
+
+Each frame goes through RealSenseDataProcessor.get_frames (decimation,
+filters, colormap, color resampling) and generate_point_cloud. With a
+live camera or .bag the SDK filters run; other sources use the array
+versions from src.utils.depth_filters.
+
+Usage:
+    python benchmarks/bench_decimation.py                   # live camera
+    python benchmarks/bench_decimation.py --source session.bag
+    python benchmarks/bench_decimation.py --source synthetic --frames 100
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Make the repository root importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.data.frame_source import open_frame_source
+from src.week3_data_processing_FINAL import RealSenseDataProcessor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark decimated processing")
+    parser.add_argument('--source', default=None, help="'camera', 'synthetic' or a recording path")
+    parser.add_argument('--frames', type=int, default=60, help="Frames per factor")
+    parser.add_argument('--factors', type=int, nargs='+', default=[1, 2, 3, 4])
+    args = parser.parse_args()
+
+    source = open_frame_source(args.source, 1280, 720, 30, real_time=False)
+    processor = RealSenseDataProcessor(output_dir=tempfile.mkdtemp(), source=source)
+
+    results = []
+    try:
+        for factor in args.factors:
+            processor.set_decimation(factor)
+            processor.get_frames()  # First frame builds the ray table for these intrinsics
+
+            times = []
+            while len(times) < args.frames:
+                start = time.perf_counter()
+                frames = processor.get_frames(aligned=True, apply_filters=True)
+                if frames is None:
+                    if source.finished:
+                        break
+                    continue
+                cloud = processor.generate_point_cloud(frames['depth'], frames['color'])
+                times.append(time.perf_counter() - start)
+
+            if times:
+                results.append((factor, frames['depth'].shape, len(cloud), np.mean(times), np.percentile(times, 95)))
+    finally:
+        processor.shutdown()
+
+    print("\n" + "="*72)
+    print(f"{'Factor':<8}{'Depth size':>12}{'Points':>10}{'Mean ms':>10}{'p95 ms':>10}{'FPS':>10}{'Speedup':>10}")
+    print("="*72)
+    base = results[0][3] if results else None
+    for factor, shape, points, mean, p95 in results:
+        print(f"{factor:<8}{f'{shape[1]}x{shape[0]}':>12}{points:>10}{mean * 1000:>10.2f}{p95 * 1000:>10.2f}"
+              f"{1 / mean:>10.1f}{base / mean:>9.1f}x")
+    print("="*72)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Depth Codec Benchmark
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: Compare the RVL depth codec with zlib and lzma on real frames
+
+Frames come from OverheadPerceptor.get_frame(), so the numbers reflect
+whatever source is selected (live camera, recording or synthetic scene).
+
+Usage:
+    python benchmarks/bench_depth_codec.py                       # live camera
+    python benchmarks/bench_depth_codec.py --source synthetic
+    python benchmarks/bench_depth_codec.py --source session.opsrec --frames 60
+"""
+
+import argparse
+import lzma
+import sys
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+# Make the repository root importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.overhead_perceptor_v1 import OverheadPerceptor
+from src.data.frame_source import open_frame_source
+from src.data.depth_codec import encode_depth, decode_depth
+
+
+def collect_frames(source_spec, num_frames, width, height):
+    """
+    Grab depth images through OverheadPerceptor.get_frame().
+
+    Returns:
+        list of HxW uint16 depth images
+    """
+    perceptor = OverheadPerceptor(source=open_frame_source(source_spec, width, height, 30, real_time=False))
+    frames = []
+    try:
+        while len(frames) < num_frames:
+            frame = perceptor.get_frame()
+            if frame is None:
+                if perceptor.source.finished:
+                    break
+                continue
+            frames.append(np.array(frame['depth_image'], copy=True))
+    finally:
+        perceptor.shutdown()
+    return frames
+
+
+def bench_codec(name, encode, decode, frames, repeats):
+    """
+    Time one codec over all frames and check that it is lossless.
+
+    Returns:
+        dict with ratio, encode/decode MB/s and ms per frame
+    """
+    raw_bytes = sum(f.nbytes for f in frames)
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        encoded = [encode(f) for f in frames]
+    encode_s = (time.perf_counter() - start) / repeats
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        decoded = [decode(e, f.shape) for e, f in zip(encoded, frames)]
+    decode_s = (time.perf_counter() - start) / repeats
+
+    for original, restored in zip(frames, decoded):
+        if not np.array_equal(original, restored):
+            raise AssertionError(f"{name} is not lossless")
+
+    encoded_bytes = sum(len(e) for e in encoded)
+    return {
+        'name': name,
+        'ratio': raw_bytes / encoded_bytes,
+        'encode_mb_s': raw_bytes / encode_s / 1e6,
+        'decode_mb_s': raw_bytes / decode_s / 1e6,
+        'encode_ms': encode_s / len(frames) * 1000,
+        'decode_ms': decode_s / len(frames) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark lossless depth compression")
+    parser.add_argument('--source', default=None, help="'camera', 'synthetic' or a recording path")
+    parser.add_argument('--frames', type=int, default=30, help="Number of frames to compress")
+    parser.add_argument('--repeats', type=int, default=3, help="Timing repeats per codec")
+    parser.add_argument('--width', type=int, default=1280)
+    parser.add_argument('--height', type=int, default=720)
+    args = parser.parse_args()
+
+    frames = collect_frames(args.source, args.frames, args.width, args.height)
+    if not frames:
+        print("No frames captured")
+        return
+
+    height, width = frames[0].shape
+    print(f"\n{len(frames)} frames at {width}x{height} "
+          f"({frames[0].nbytes / 1e6:.2f} MB raw each, {frames[0].nbytes * 30 / 1e6:.1f} MB/s at 30 FPS)")
+
+    def raw_decode(data, shape):
+        return np.frombuffer(data, dtype=np.uint16).reshape(shape)
+
+    codecs = [
+        ('rvl', encode_depth, lambda data, shape: decode_depth(data)),
+        ('zlib-1', lambda f: zlib.compress(f.tobytes(), 1), lambda d, s: raw_decode(zlib.decompress(d), s)),
+        ('zlib-6', lambda f: zlib.compress(f.tobytes(), 6), lambda d, s: raw_decode(zlib.decompress(d), s)),
+        ('lzma-0', lambda f: lzma.compress(f.tobytes(), preset=0), lambda d, s: raw_decode(lzma.decompress(d), s)),
+    ]
+
+    print("\n" + "="*78)
+    print(f"{'Codec':<10}{'Ratio':>8}{'Encode MB/s':>14}{'Decode MB/s':>14}"
+          f"{'Encode ms':>12}{'Decode ms':>12}{'30 FPS?':>8}")
+    print("="*78)
+    for name, encode, decode in codecs:
+        result = bench_codec(name, encode, decode, frames, args.repeats)
+        realtime = "yes" if result['encode_ms'] < 1000 / 30 else "no"
+        print(f"{result['name']:<10}{result['ratio']:>8.2f}{result['encode_mb_s']:>14.1f}"
+              f"{result['decode_mb_s']:>14.1f}{result['encode_ms']:>12.2f}{result['decode_ms']:>12.2f}"
+              f"{realtime:>8}")
+    print("="*78)
+
+
+if __name__ == "__main__":
+    main()
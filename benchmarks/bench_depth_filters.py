@@ -0,0 +1,207 @@
+"""
+Depth Filter Benchmark
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: Check the array depth filters against the SDK filters and time both
+
+Depth images are read from a source and, for the SDK side, turned back into
+rs.depth_frame objects through a software device, so both implementations
+filter exactly the same data. Each filter is checked on its own (temporal
+over the whole sequence) and as the processing chain spatial -> temporal ->
+hole filling. Only the process() calls are timed.
+
+Usage:
+    python benchmarks/bench_depth_filters.py                     # live camera
+    python benchmarks/bench_depth_filters.py --source session.opsrec
+    python benchmarks/bench_depth_filters.py --source synthetic --frames 30 --width 848 --height 480
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pyrealsense2 as rs
+
+# Make the repository root importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.data.frame_source import open_frame_source
+from src.utils.depth_filters import SpatialFilter, TemporalFilter, HoleFillingFilter
+
+
+class SoftwareDepthSensor:
+    """Turns uint16 arrays into rs.depth_frame objects so SDK filters can process them."""
+
+    def __init__(self, width, height, depth_units):
+        self.width = width
+        self.device = rs.software_device()
+        self.sensor = self.device.add_sensor("Depth")
+
+        intrinsics = rs.intrinsics()
+        intrinsics.width, intrinsics.height = width, height
+        intrinsics.fx = intrinsics.fy = width
+        intrinsics.ppx, intrinsics.ppy = width / 2, height / 2
+        intrinsics.model = rs.distortion.none
+        intrinsics.coeffs = [0] * 5
+
+        stream = rs.video_stream()
+        stream.type, stream.index, stream.uid = rs.stream.depth, 0, 0
+        stream.width, stream.height, stream.fps = width, height, 30
+        stream.bpp, stream.fmt = 2, rs.format.z16
+        stream.intrinsics = intrinsics
+        self.profile = self.sensor.add_video_stream(stream)
+        self.sensor.add_read_only_option(rs.option.depth_units, depth_units)
+        self.depth_units = depth_units
+
+        self.queue = rs.frame_queue(4)
+        self.sensor.open(self.profile)
+        self.sensor.start(self.queue)
+        self.frame_number = 0
+
+    def frame(self, depth):
+        """
+        Wrap a depth image in an SDK frame.
+
+        Args:
+            depth: HxW uint16 depth image
+
+        Returns:
+            rs.frame
+        """
+        self.frame_number += 1
+        frame = rs.software_video_frame()
+        frame.pixels = np.ascontiguousarray(depth, dtype=np.uint16)
+        frame.bpp, frame.stride = 2, self.width * 2
+        frame.timestamp = self.frame_number * 1000 / 30
+        frame.domain = rs.timestamp_domain.hardware_clock
+        frame.frame_number = self.frame_number
+        frame.depth_units = self.depth_units
+        frame.profile = self.profile.as_video_stream_profile()
+        self.sensor.on_video_frame(frame)
+        return self.queue.wait_for_frame()
+
+    def stop(self):
+        self.sensor.stop()
+        self.sensor.close()
+
+
+def make_filters(args):
+    """
+    SDK and array versions of each filter with the processing settings.
+
+    Returns:
+        {name: (SDK filter, array filter)}
+    """
+    spatial = rs.spatial_filter()
+    spatial.set_option(rs.option.filter_magnitude, args.magnitude)
+    spatial.set_option(rs.option.filter_smooth_alpha, args.spatial_alpha)
+    spatial.set_option(rs.option.filter_smooth_delta, args.spatial_delta)
+
+    temporal = rs.temporal_filter()
+    temporal.set_option(rs.option.filter_smooth_alpha, args.temporal_alpha)
+    temporal.set_option(rs.option.filter_smooth_delta, args.temporal_delta)
+    temporal.set_option(rs.option.holes_fill, args.persistence)
+
+    hole_filling = rs.hole_filling_filter()
+    hole_filling.set_option(rs.option.holes_fill, args.hole_mode)
+
+    return {
+        'spatial': (spatial, SpatialFilter(args.magnitude, args.spatial_alpha, args.spatial_delta)),
+        'temporal': (temporal, TemporalFilter(args.temporal_alpha, args.temporal_delta, args.persistence)),
+        'hole_filling': (hole_filling, HoleFillingFilter(args.hole_mode)),
+    }
+
+
+def run_filter(names, filters, sensor, depth_images):
+    """
+    Run a chain of filters over every image with both implementations.
+
+    Returns:
+        (SDK seconds per frame, array seconds per frame, mismatched pixels, max abs difference)
+    """
+    sdk_times, array_times = [], []
+    mismatched, max_diff = 0, 0
+    buffer = np.empty_like(depth_images[0])
+
+    for depth in depth_images:
+        frame = sensor.frame(depth)
+        start = time.perf_counter()
+        for name in names:
+            frame = filters[name][0].process(frame)
+        sdk_times.append(time.perf_counter() - start)
+        expected = np.asanyarray(frame.get_data())
+
+        np.copyto(buffer, depth)
+        start = time.perf_counter()
+        for name in names:
+            filters[name][1].process(buffer)
+        array_times.append(time.perf_counter() - start)
+
+        diff = np.abs(expected.astype(np.int32) - buffer)
+        mismatched += np.count_nonzero(diff)
+        max_diff = max(max_diff, int(diff.max()))
+
+    return np.median(sdk_times), np.median(array_times), mismatched, max_diff
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate and benchmark the array depth filters")
+    parser.add_argument('--source', default=None, help="'camera', 'synthetic' or a recording path")
+    parser.add_argument('--frames', type=int, default=60, help="Depth frames to use")
+    parser.add_argument('--width', type=int, default=1280)
+    parser.add_argument('--height', type=int, default=720)
+    parser.add_argument('--magnitude', type=int, default=2)
+    parser.add_argument('--spatial-alpha', type=float, default=0.5)
+    parser.add_argument('--spatial-delta', type=float, default=20)
+    parser.add_argument('--temporal-alpha', type=float, default=0.4)
+    parser.add_argument('--temporal-delta', type=float, default=20)
+    parser.add_argument('--persistence', type=int, default=3, help="Temporal persistency mode (0-8)")
+    parser.add_argument('--hole-mode', type=int, default=1, help="Hole filling mode (0-2)")
+    args = parser.parse_args()
+
+    source = open_frame_source(args.source, args.width, args.height, 30, real_time=False)
+    source.start()
+    depth_images = []
+    try:
+        while len(depth_images) < args.frames:
+            frame = source.read(aligned=False)
+            if frame is None:
+                if source.finished:
+                    break
+                continue
+            depth_images.append(frame['depth_image'].copy())
+        depth_scale = source.depth_scale
+    finally:
+        source.stop()
+
+    if not depth_images:
+        print("No frames read")
+        return
+    height, width = depth_images[0].shape
+    print(f"\n{len(depth_images)} frames of {width}x{height}, depth units {depth_scale}")
+
+    sensor = SoftwareDepthSensor(width, height, depth_scale)
+    runs = [('spatial',), ('temporal',), ('hole_filling',), ('spatial', 'temporal', 'hole_filling')]
+    results = []
+    try:
+        for names in runs:
+            # Fresh filters per run so temporal history starts empty on both sides
+            results.append((' -> '.join(names),) + run_filter(names, make_filters(args), sensor, depth_images))
+    finally:
+        sensor.stop()
+
+    print("\n" + "="*86)
+    print(f"{'Filter':<36}{'SDK ms':>9}{'Array ms':>10}{'Ratio':>8}{'Mismatched px':>15}{'Max diff':>10}")
+    print("="*86)
+    for name, sdk_time, array_time, mismatched, max_diff in results:
+        print(f"{name:<36}{sdk_time * 1000:>9.2f}{array_time * 1000:>10.2f}{array_time / sdk_time:>7.1f}x"
+              f"{mismatched:>15}{max_diff:>10}")
+    print("="*86)
+
+    total = sum(result[3] for result in results)
+    print("✓ Array filters match the SDK exactly" if total == 0 else f"⚠ {total} pixels differ from the SDK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Foreground Segmentation Benchmark
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: Time FloorBackground segmentation and background update per frame
+
+The floor is learned from the first --learn frames, then every following
+frame is segmented and blended into the background (as in the perceptor
+loop). On the synthetic source the learning frames are the source's empty
+floors and the foreground is checked against the known box heights.
+
+Usage:
+    python benchmarks/bench_foreground.py                        # live camera
+    python benchmarks/bench_foreground.py --source session.opsrec
+    python benchmarks/bench_foreground.py --source synthetic --frames 300
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Make the repository root importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'xy_transform'))
+from coordinate_transform import CoordinateTransformer
+from src.data.frame_source import open_frame_source, SyntheticFrameSource
+from src.utils.foreground import FloorBackground
+
+
+def read_depth(source):
+    """Next aligned depth image, or None at the end of a recording."""
+    while True:
+        frame = source.read(aligned=True)
+        if frame is not None:
+            return frame
+        if source.finished:
+            return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark foreground segmentation")
+    parser.add_argument('--source', default=None, help="'camera', 'synthetic' or a recording path")
+    parser.add_argument('--frames', type=int, default=300, help="Frames to segment")
+    parser.add_argument('--learn', type=int, default=30, help="Frames to learn the floor from")
+    parser.add_argument('--width', type=int, default=848)
+    parser.add_argument('--height', type=int, default=480)
+    parser.add_argument('--camera-height', type=float, default=2.2, help="Camera height (meters)")
+    parser.add_argument('--pitch', type=float, default=0.0, help="Camera pitch (degrees)")
+    parser.add_argument('--threshold', type=float, default=0.05, help="Foreground height (meters)")
+    parser.add_argument('--stride', type=int, default=4, help="Background update row stride")
+    args = parser.parse_args()
+
+    source = open_frame_source(args.source, args.width, args.height, 30, real_time=False)
+    source.start()
+    synthetic = isinstance(source, SyntheticFrameSource)
+
+    try:
+        first = read_depth(source)
+        transformer = CoordinateTransformer(args.camera_height, pitch_deg=args.pitch)
+        transformer.set_intrinsics(first['color_intrinsics'])
+        background = FloorBackground.from_transformer(transformer, source.depth_scale, threshold_m=args.threshold,
+                                                      update_stride=args.stride)
+
+        start = time.perf_counter()
+        if synthetic:
+            for floor in source.floor_bank:
+                background.learn(floor)
+        else:
+            for _ in range(args.learn):
+                frame = read_depth(source)
+                if frame is None:
+                    break
+                background.learn(frame['depth_image'])
+        background.finish_learning()
+        learn_time = time.perf_counter() - start
+
+        segment_times, update_times, fractions, errors = [], [], [], []
+        for _ in range(args.frames):
+            frame = read_depth(source)
+            if frame is None:
+                break
+            depth = frame['depth_image']
+
+            start = time.perf_counter()
+            mask = background.segment(depth)
+            segment_times.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            background.update(depth, mask)
+            update_times.append(time.perf_counter() - start)
+
+            fractions.append(np.count_nonzero(mask) / mask.size)
+            if synthetic:
+                # Ground truth: the frame minus the empty floor it was drawn on
+                floor = source.floor_bank[(source.frames_read - 1) % len(source.floor_bank)]
+                truth = (floor.astype(np.int32) - depth) * source.depth_scale > args.threshold
+                errors.append(np.count_nonzero(mask != truth))
+    finally:
+        source.stop()
+
+    if not segment_times:
+        print("No frames read")
+        return
+
+    segment_ms = np.array(segment_times) * 1000
+    update_ms = np.array(update_times) * 1000
+    total_ms = segment_ms + update_ms
+
+    print("\n" + "="*60)
+    print(f"Foreground segmentation: {args.width}x{args.height}, {len(segment_ms)} frames, "
+          f"learned in {learn_time * 1000:.1f} ms")
+    print("="*60)
+    print(f"{'Stage':<20}{'Median ms':>12}{'p95 ms':>12}{'Max ms':>12}")
+    for name, values in (('segment', segment_ms), ('update', update_ms), ('total', total_ms)):
+        print(f"{name:<20}{np.median(values):>12.2f}{np.percentile(values, 95):>12.2f}{values.max():>12.2f}")
+    print("="*60)
+    print(f"Foreground: {np.mean(fractions):.2%} of pixels per frame")
+    if errors:
+        print(f"Pixels differing from ground truth: {np.mean(errors):.1f} per frame "
+              f"({np.mean(errors) / (args.width * args.height):.4%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Point Cloud Benchmark
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: Per-frame time and peak memory of the NumPy point cloud engine vs the
+         original rs.pointcloud() + Open3D implementation
+
+Each method runs in its own process so peak memory (ru_maxrss growth and
+tracemalloc peak) is not polluted by the other method.
+
+The original method needs SDK frames and Open3D, so it only runs on the live
+camera or a .bag recording. The engine runs on any source.
+
+Usage:
+    python benchmarks/bench_point_cloud.py                   # live camera
+    python benchmarks/bench_point_cloud.py --source session.bag
+    python benchmarks/bench_point_cloud.py --source synthetic --frames 60
+"""
+
+import argparse
+import multiprocessing as mp
+import resource
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+# Make the repository root importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.data.frame_source import open_frame_source
+from src.utils.point_cloud import PointCloudEngine
+
+
+def legacy_point_cloud(depth_frame, color_frame):
+    """
+    The original RealSenseDataProcessor.generate_point_cloud() (without saving).
+    """
+    import open3d as o3d
+    import pyrealsense2 as rs
+
+    pc = rs.pointcloud()
+    pc.map_to(color_frame)
+    points = pc.calculate(depth_frame)
+
+    vtx = np.asanyarray(points.get_vertices()).view(np.float32).reshape(-1, 3)
+    tex = np.asanyarray(points.get_texture_coordinates()).view(np.float32).reshape(-1, 2)
+
+    color_image = np.asanyarray(color_frame.get_data())
+
+    h, w = color_image.shape[:2]
+    u = np.clip(tex[:, 0] * w, 0, w-1).astype(int)
+    v = np.clip(tex[:, 1] * h, 0, h-1).astype(int)
+    colors = color_image[v, u] / 255.0
+    colors = colors[:, [2, 1, 0]]
+
+    pcd = o3d.geometry.PointCloud()
+    pcd.points = o3d.utility.Vector3dVector(vtx)
+    pcd.colors = o3d.utility.Vector3dVector(colors)
+
+    valid_mask = np.any(vtx != 0, axis=1)
+    pcd = pcd.select_by_index(np.where(valid_mask)[0])
+    return len(pcd.points)
+
+
+def max_rss_mb():
+    """Peak resident memory of this process so far (MB)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return peak / 1024 if sys.platform != 'darwin' else peak / 1024 / 1024
+
+
+def run_method(method, source_spec, num_frames, width, height, results):
+    """
+    Time one method over num_frames frames (runs in a child process).
+    """
+    source = open_frame_source(source_spec, width, height, 30, real_time=False)
+    try:
+        source.start()
+        source.warmup(30)
+        engine = PointCloudEngine()
+
+        frame = source.read(aligned=True)
+        if method == 'legacy' and frame['depth_frame'] is None:
+            results.put((method, None, "needs SDK frames (camera or .bag)"))
+            return
+        if method == 'legacy':
+            try:
+                import open3d  # noqa: F401
+            except ImportError:
+                results.put((method, None, "open3d not installed"))
+                return
+
+        rss_before = max_rss_mb()
+        tracemalloc.start()
+
+        times = []
+        num_points = 0
+        while len(times) < num_frames and frame is not None:
+            start = time.perf_counter()
+            if method == 'legacy':
+                num_points = legacy_point_cloud(frame['depth_frame'], frame['color_frame'])
+            else:
+                cloud = engine.compute(frame['depth_image'], frame['color_image'],
+                                       frame['depth_intrinsics'], source.depth_scale)
+                num_points = len(cloud)
+            times.append(time.perf_counter() - start)
+            frame = source.read(aligned=True)
+
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results.put((method, {
+            'frames': len(times),
+            'points': num_points,
+            'mean_ms': np.mean(times) * 1000,
+            'p95_ms': np.percentile(times, 95) * 1000,
+            'rss_growth_mb': max_rss_mb() - rss_before,
+            'traced_peak_mb': traced_peak / 1e6,
+        }, None))
+    finally:
+        source.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark point cloud generation")
+    parser.add_argument('--source', default=None, help="'camera', 'synthetic' or a recording path")
+    parser.add_argument('--frames', type=int, default=30, help="Frames per method")
+    parser.add_argument('--width', type=int, default=1280)
+    parser.add_argument('--height', type=int, default=720)
+    args = parser.parse_args()
+
+    # Fresh interpreter per method for clean peak memory numbers
+    context = mp.get_context('spawn')
+    results = context.Queue()
+
+    print("\n" + "="*84)
+    print(f"{'Method':<10}{'Frames':>8}{'Points':>10}{'Mean ms':>10}{'p95 ms':>10}"
+          f"{'Peak RSS +MB':>15}{'Traced peak MB':>17}")
+    print("="*84)
+    for method in ('legacy', 'engine'):
+        process = context.Process(target=run_method,
+                                  args=(method, args.source, args.frames, args.width, args.height, results))
+        process.start()
+        name, stats, skipped = results.get()
+        process.join()
+
+        if stats is None:
+            print(f"{name:<10}skipped: {skipped}")
+            continue
+        print(f"{name:<10}{stats['frames']:>8}{stats['points']:>10}{stats['mean_ms']:>10.2f}"
+              f"{stats['p95_ms']:>10.2f}{stats['rss_growth_mb']:>15.1f}{stats['traced_peak_mb']:>17.1f}")
+    print("="*84)
+
+
+if __name__ == "__main__":
+    main()
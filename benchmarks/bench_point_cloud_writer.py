@@ -0,0 +1,100 @@
+"""
+Point Cloud Writer Benchmark
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: Compare PLY/PCD writing speed with a raw write of the same number of bytes
+
+Usage:
+    python benchmarks/bench_point_cloud_writer.py
+    python benchmarks/bench_point_cloud_writer.py --points 1000000 --output-dir /tmp/clouds
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Make the repository root importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.data.point_cloud_writer import write_point_cloud, PointCloudWriter
+
+
+def timed_write(write_fn, path, repeats):
+    """Best time of several writes, including fsync so the disk is really measured."""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        write_fn(path)
+        with open(path, 'rb+') as f:
+            os.fsync(f.fileno())
+        best = min(best, time.perf_counter() - start)
+    return best, os.path.getsize(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark point cloud file writing")
+    parser.add_argument('--points', type=int, default=1_000_000)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--output-dir', default=None, help="Where to write (default: temp dir)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-2, 2, (args.points, 3)).astype(np.float32)
+    colors = rng.integers(0, 256, (args.points, 3), dtype=np.uint8)
+
+    output_dir = Path(args.output_dir or tempfile.mkdtemp())
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Reference: one write of the same number of bytes as the PLY body
+    raw = np.zeros(args.points * 15, dtype=np.uint8)
+
+    def write_raw(path):
+        with open(path, 'wb') as f:
+            f.write(raw)
+
+    tests = [
+        ('raw bytes', write_raw, output_dir / 'raw.bin'),
+        ('ply', lambda p: write_point_cloud(p, (points, colors)), output_dir / 'cloud.ply'),
+        ('pcd', lambda p: write_point_cloud(p, (points, colors)), output_dir / 'cloud.pcd'),
+    ]
+
+    try:
+        import open3d as o3d
+
+        def write_open3d(path):
+            pcd = o3d.geometry.PointCloud()
+            pcd.points = o3d.utility.Vector3dVector(points.astype(np.float64))
+            pcd.colors = o3d.utility.Vector3dVector(colors / 255.0)
+            o3d.io.write_point_cloud(str(path), pcd)
+
+        tests.append(('open3d ply', write_open3d, output_dir / 'open3d.ply'))
+    except ImportError:
+        print("open3d not installed, skipping Open3D comparison")
+
+    print("\n" + "="*60)
+    print(f"{args.points:,} colored points -> {output_dir}")
+    print(f"{'Writer':<14}{'Time ms':>10}{'Size MB':>10}{'MB/s':>10}{'% of raw':>12}")
+    print("="*60)
+    raw_speed = None
+    for name, write_fn, path in tests:
+        seconds, size = timed_write(write_fn, path, args.repeats)
+        speed = size / seconds / 1e6
+        raw_speed = raw_speed or speed
+        print(f"{name:<14}{seconds * 1000:>10.1f}{size / 1e6:>10.1f}{speed:>10.1f}{speed / raw_speed * 100:>11.0f}%")
+
+    # Background writer: how long the caller is blocked
+    writer = PointCloudWriter(verbose=False)
+    start = time.perf_counter()
+    writer.submit(output_dir / 'background.ply', (points, colors))
+    blocked = time.perf_counter() - start
+    writer.close()
+    print("="*60)
+    print(f"Background submit() blocked the caller for {blocked * 1000:.1f} ms (array copy)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+ROI Benchmark
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: Processing time as a function of processing ROI area
+
+Each frame goes through RealSenseDataProcessor.get_frames (crop, filters,
+colormap, color) and generate_point_cloud. ROIs are centered rectangles
+covering the given fraction of the frame, plus the 10%-90% best accuracy
+rectangle and a diamond polygon. The baseline is the full frame with no ROI
+(SDK filters on a camera or .bag, array filters otherwise). On a camera or
+.bag, ROIs larger than ARRAY_FILTER_MAX_ROI_AREA keep the SDK filters on the
+full frame and crop afterwards, so only small ROIs switch to the (slower per
+pixel) array filters; the Filters column shows which path each case took.
+Synthetic runs compare array filters with array filters only.
+
+Usage:
+    python benchmarks/bench_roi.py                          # live camera
+    python benchmarks/bench_roi.py --source session.bag
+    python benchmarks/bench_roi.py --source synthetic --frames 30 --areas 1 0.5 0.25 0.1
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Make the repository root importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.data.frame_source import open_frame_source
+from src.utils.roi import ProcessingROI, BEST_ACCURACY_ROI
+from src.data.frame_source import RealSenseFrameSource
+from src.week3_data_processing_FINAL import RealSenseDataProcessor, ARRAY_FILTER_MAX_ROI_AREA
+
+
+def centered_roi(area):
+    """Centered rectangle covering about area of the frame (same aspect ratio)."""
+    half = np.sqrt(area) / 2
+    return ProcessingROI.rectangle(0.5 - half, 0.5 - half, 0.5 + half, 0.5 + half)
+
+
+def filter_path(window, sdk_frames):
+    """Which filters process a case (see RealSenseDataProcessor.set_roi)."""
+    if not sdk_frames:
+        return 'array'
+    if window is None:
+        return 'SDK'
+    if window.width * window.height <= ARRAY_FILTER_MAX_ROI_AREA * window.shape[0] * window.shape[1]:
+        return 'crop+array'
+    return 'SDK+crop'
+
+
+def time_frames(processor, num_frames):
+    """
+    Mean and p95 seconds per frame, and mean points per cloud.
+
+    Returns:
+        (mean, p95, points) or None if no frames were read
+    """
+    processor.get_frames()  # Builds filter state, ray tables and windows for this ROI
+
+    times, points = [], []
+    while len(times) < num_frames:
+        start = time.perf_counter()
+        frames = processor.get_frames(aligned=True, apply_filters=True)
+        if frames is None:
+            if processor.source.finished:
+                break
+            continue
+        cloud = processor.generate_point_cloud(frames['depth'], frames['color'], intrinsics=frames['intrinsics'])
+        times.append(time.perf_counter() - start)
+        points.append(len(cloud))
+
+    if not times:
+        return None
+    return np.mean(times), np.percentile(times, 95), np.mean(points)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark processing time against ROI area")
+    parser.add_argument('--source', default=None, help="'camera', 'synthetic' or a recording path")
+    parser.add_argument('--frames', type=int, default=60, help="Frames per ROI")
+    parser.add_argument('--areas', type=float, nargs='+', default=[1.0, 0.5, 0.25, 0.1, 0.05],
+                        help="Fractions of the frame covered by centered rectangles")
+    parser.add_argument('--decimation', type=int, default=1)
+    args = parser.parse_args()
+
+    source = open_frame_source(args.source, 1280, 720, 30, real_time=False)
+    processor = RealSenseDataProcessor(output_dir=tempfile.mkdtemp(), source=source,
+                                       decimation=args.decimation)
+
+    diamond = ProcessingROI([(0.5, 0.1), (0.9, 0.5), (0.5, 0.9), (0.1, 0.5)])
+    cases = [('full frame', None)]
+    cases += [(f"rect {area:.0%}", centered_roi(area)) for area in args.areas]
+    cases += [('best accuracy', BEST_ACCURACY_ROI), ('diamond polygon', diamond)]
+
+    results = []
+    try:
+        for name, roi in cases:
+            processor.set_roi(roi)
+            timing = time_frames(processor, args.frames)
+            if timing is None:
+                break
+            results.append((name, roi, timing))
+    finally:
+        processor.shutdown()
+
+    # Area of each ROI on the processed (decimated) frame
+    full_shape = (source.height // args.decimation, source.width // args.decimation)
+
+    # Camera and .bag sources (replay derives from the camera source) deliver SDK frames
+    sdk_frames = isinstance(source, RealSenseFrameSource)
+
+    print("\n" + "="*90)
+    print(f"{'ROI':<18}{'Area':>8}{'Pixels':>10}{'Filters':>12}{'Points':>10}{'Mean ms':>10}{'p95 ms':>10}"
+          f"{'Speedup':>10}")
+    print("="*90)
+    base = results[0][2][0] if results else None
+    for name, roi, (mean, p95, points) in results:
+        window = None if roi is None else roi.window(full_shape)
+        area = 1.0 if window is None else window.area_fraction
+        pixels = full_shape[0] * full_shape[1] if window is None else window.pixel_count
+        print(f"{name:<18}{area:>8.0%}{pixels:>10}{filter_path(window, sdk_frames):>12}{points:>10.0f}"
+              f"{mean * 1000:>10.2f}{p95 * 1000:>10.2f}{base / mean:>9.1f}x")
+    print("="*90)
+    print(f"Speedup is against the full frame ({'SDK' if sdk_frames else 'array'} filters)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Startup Benchmark
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: Process start to first usable frame for each CLI subcommand
+
+Every subcommand runs in a fresh interpreter with --startup-report, which
+stops after the first frame. Wall time includes interpreter start; the
+import / open / first frame split comes from the CLI itself. 'open' is
+camera start plus warm-up.
+
+Usage:
+    python benchmarks/bench_startup.py                      # live camera
+    python benchmarks/bench_startup.py --source synthetic --repeats 5
+    python benchmarks/bench_startup.py --commands intrinsics filters
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Subcommands that have something to time before user input
+DEFAULT_COMMANDS = ['intrinsics', 'filters', 'pointcloud', 'coords', 'workspace', 'calibrate', 'accuracy']
+
+
+def run_once(command, source):
+    """
+    Start the CLI for one subcommand and stop after the first frame.
+
+    Returns:
+        (wall seconds, startup report dict) or (None, error text)
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        report_path = os.path.join(tmp, 'startup.json')
+        cli_args = [sys.executable, '-m', 'src.cli', '--startup-report', report_path]
+        if source:
+            cli_args += ['--source', source]
+        cli_args.append(command)
+
+        start = time.perf_counter()
+        result = subprocess.run(cli_args, cwd=REPO_ROOT, capture_output=True, text=True)
+        wall = time.perf_counter() - start
+
+        if result.returncode != 0 or not os.path.exists(report_path):
+            lines = (result.stdout + result.stderr).strip().splitlines()
+            return None, lines[-1] if lines else f"exit code {result.returncode}"
+        with open(report_path) as f:
+            return wall, json.load(f)
+
+
+def interpreter_baseline():
+    """Wall time of starting and exiting a bare interpreter."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'pass'], check=True)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CLI startup to first frame")
+    parser.add_argument('--source', default=None, help="'camera', 'synthetic' or a recording path")
+    parser.add_argument('--commands', nargs='+', default=DEFAULT_COMMANDS)
+    parser.add_argument('--repeats', type=int, default=3, help="Runs per command (best is reported)")
+    args = parser.parse_args()
+
+    baseline = min(interpreter_baseline() for _ in range(args.repeats))
+
+    print("\n" + "="*92)
+    print(f"{'Command':<12}{'Wall ms':>10}{'Import ms':>11}{'Open ms':>10}{'1st frame':>11}"
+          f"{'Total ms':>10}   Heavy modules loaded")
+    print("="*92)
+    print(f"{'(python)':<12}{baseline * 1000:>10.0f}")
+
+    for command in args.commands:
+        best = None
+        for _ in range(args.repeats):
+            wall, report = run_once(command, args.source)
+            if wall is None:
+                best = (None, report)
+                break
+            if best is None or wall < best[0]:
+                best = (wall, report)
+
+        wall, report = best
+        if wall is None:
+            print(f"{command:<12}failed: {report}")
+            continue
+        print(f"{command:<12}{wall * 1000:>10.0f}{report['import_ms']:>11.0f}{report['open_ms']:>10.0f}"
+              f"{report['first_frame_ms']:>11.1f}{report['total_ms']:>10.0f}   "
+              f"{', '.join(report['modules_loaded'])}")
+    print("="*92)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Multi-Object Tracker Benchmark
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: Time MultiObjectTracker at 30 Hz with many simultaneous targets
+
+Simulated targets move around the floor with constant velocity plus small
+random accelerations; each frame they are detected with position noise,
+some detections are missed and a few clutter detections are added.
+Per-frame step time is compared against the 33 ms frame budget, track
+identity is checked against the simulated targets (id switches), and the
+batched filter is compared with a per-track object implementation fed the
+same associations.
+
+Usage:
+    python benchmarks/bench_tracker.py
+    python benchmarks/bench_tracker.py --targets 50 100 200 --frames 600
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Make the repository root importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.utils.tracker import MultiObjectTracker
+
+
+class PerTrackFilter:
+    """Reference: one Python object per track, one Kalman filter at a time."""
+
+    def __init__(self, position, tracker):
+        self.x = np.array([position[0], position[1], 0.0, 0.0])
+        self.P = tracker._initial_covariance.copy()
+        self.q = tracker.acceleration_var
+        self.R = np.eye(2) * tracker.measurement_var
+
+    def predict(self, dt):
+        F = np.eye(4)
+        F[0, 2] = F[1, 3] = dt
+        G = np.array([[dt ** 2 / 2, 0], [0, dt ** 2 / 2], [dt, 0], [0, dt]])
+        self.x = F @ self.x
+        self.P = F @ self.P @ F.T + G @ G.T * self.q
+
+    def update(self, z):
+        H = np.eye(2, 4)
+        S = H @ self.P @ H.T + self.R
+        K = self.P @ H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ (z - H @ self.x)
+        self.P = (np.eye(4) - K @ H) @ self.P
+
+
+def simulate(num_targets, num_frames, fps, rng, detection_prob=0.95, clutter=2, noise_m=0.03, area_m=20.0):
+    """Per frame: (detection positions, true target index per detection (-1 = clutter))."""
+    dt = 1.0 / fps
+    position = rng.uniform(0, area_m, size=(num_targets, 2))
+    velocity = rng.uniform(-1.0, 1.0, size=(num_targets, 2))
+    frames = []
+    for _ in range(num_frames):
+        velocity += rng.normal(0, 0.5, size=velocity.shape) * dt
+        position += velocity * dt
+        bounced = (position < 0) | (position > area_m)
+        velocity[bounced] *= -1
+
+        seen = np.flatnonzero(rng.random(num_targets) < detection_prob)
+        detections = position[seen] + rng.normal(0, noise_m, size=(len(seen), 2))
+        false_alarms = rng.uniform(0, area_m, size=(rng.poisson(clutter), 2))
+        order = rng.permutation(len(seen) + len(false_alarms))
+        frames.append((np.vstack([detections, false_alarms])[order],
+                       np.concatenate([seen, np.full(len(false_alarms), -1)])[order]))
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the multi-object tracker")
+    parser.add_argument('--targets', type=int, nargs='+', default=[25, 100, 200], help="Simultaneous targets")
+    parser.add_argument('--frames', type=int, default=300, help="Frames per run")
+    parser.add_argument('--fps', type=float, default=30.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rows = []
+    for num_targets in args.targets:
+        rng = np.random.default_rng(args.seed)
+        frames = simulate(num_targets, args.frames, args.fps, rng)
+        tracker = MultiObjectTracker(capacity=max(256, 2 * num_targets))
+
+        step_times, reference_times = [], []
+        last_id = {}
+        switches = 0
+        max_diff = 0.0
+        reference = {}
+        for frame_index, (positions, truth) in enumerate(frames):
+            timestamp = frame_index / args.fps
+            start = time.perf_counter()
+            tracks = tracker.step(positions, timestamp)
+            step_times.append(time.perf_counter() - start)
+
+            # Identity: a target's confirmed track id should never change
+            for target, track_id in zip(truth, tracker.detection_ids):
+                if target < 0 or track_id < 0:
+                    continue
+                if last_id.setdefault(target, track_id) != track_id:
+                    switches += 1
+                    last_id[target] = track_id
+
+            # Per-track reference with the same associations (predict all, update the matched ones)
+            start = time.perf_counter()
+            for track_filter in reference.values():
+                track_filter.predict(1.0 / args.fps)
+            for position, track_id in zip(positions, tracker.detection_ids):
+                if track_id in reference:
+                    reference[track_id].update(position)
+            reference_times.append(time.perf_counter() - start)
+            # Newly confirmed tracks start the reference from the tracker's state
+            live = set(tracks['id'].tolist())
+            for track_id in list(reference):
+                if track_id not in live:
+                    del reference[track_id]
+            index = {int(i): k for k, i in enumerate(tracker.ids[:tracker.count])}
+            for track in tracks:
+                track_id = int(track['id'])
+                k = index[track_id]
+                if track_id not in reference:
+                    reference[track_id] = PerTrackFilter(tracker.state[k, :2], tracker)
+                    reference[track_id].x = tracker.state[k].copy()
+                    reference[track_id].P = tracker.covariance[k].copy()
+                else:
+                    max_diff = max(max_diff, float(np.abs(reference[track_id].x - tracker.state[k]).max()))
+
+        confirmed = len(tracker.tracks())
+        rows.append((num_targets, confirmed, np.median(step_times), np.percentile(step_times, 95),
+                     np.max(step_times), np.median(reference_times), switches, max_diff))
+
+    budget_ms = 1000.0 / args.fps
+    print("\n" + "="*96)
+    print(f"Tracker: {args.frames} frames at {args.fps:.0f} Hz (budget {budget_ms:.1f} ms per frame)")
+    print("="*96)
+    print(f"{'Targets':>8}{'Tracks':>8}{'Median ms':>11}{'p95 ms':>9}{'Max ms':>9}"
+          f"{'Per-track filter ms':>21}{'ID switches':>13}{'Max state diff':>17}")
+    for num_targets, confirmed, median, p95, worst, reference_ms, switches, diff in rows:
+        print(f"{num_targets:>8}{confirmed:>8}{median * 1000:>11.2f}{p95 * 1000:>9.2f}{worst * 1000:>9.2f}"
+              f"{reference_ms * 1000:>21.2f}{switches:>13}{diff:>17.2e}")
+    print("="*96)
+    print("Per-track filter: predict/update only (no association), one Python object per track")
+    print("ID switches: simulated targets are points and can pass within centimeters of each other,")
+    print("             where swapping identities is expected; denser scenes have more such passes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Trajectory Store Benchmark
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: Time TrajectoryStore appends and queries over a long simulated session
+
+Simulates --minutes of tracks at 30 Hz (some walking on curved paths, some
+standing still, new track ids every few minutes) and writes them to a raw
+store and a simplified one. Then compares time + floor rectangle queries
+against a full scan of the memory-mapped columns, and checks that every
+dropped point is within tolerance of its track's stored polyline.
+
+Usage:
+    python benchmarks/bench_trajectory_store.py
+    python benchmarks/bench_trajectory_store.py --minutes 120 --tracks 40 --window 300
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Make the repository root importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.data.trajectory_store import TrajectoryStore, POINT_DTYPE
+
+
+def store_bytes(root):
+    return sum(path.stat().st_size for path in Path(root).iterdir())
+
+
+def polyline_deviation(raw, kept):
+    """Largest floor distance of a track's raw points from its stored polyline (time-bracketed segments)."""
+    if len(kept) < 2:
+        return 0.0
+    j = np.clip(np.searchsorted(kept['timestamp'], raw['timestamp'], side='right') - 1, 0, len(kept) - 2)
+    A = np.stack([kept['x'][j], kept['y'][j]], axis=1).astype(np.float64)
+    C = np.stack([kept['x'][j + 1], kept['y'][j + 1]], axis=1).astype(np.float64)
+    B = np.stack([raw['x'], raw['y']], axis=1).astype(np.float64)
+    segment = C - A
+    length_sq = (segment ** 2).sum(axis=1)
+    t = np.clip(((B - A) * segment).sum(axis=1) / np.where(length_sq > 0, length_sq, 1), 0, 1)
+    return float(np.linalg.norm(B - A - t[:, None] * segment, axis=1).max())
+
+
+def full_scan(store, t0, t1, rect):
+    """Reference: filter every row of the memory-mapped columns."""
+    columns = store._columns()
+    x0, y0, x1, y1 = rect
+    match = (columns['timestamp'] >= t0) & (columns['timestamp'] <= t1) & \
+            (columns['x'] >= x0) & (columns['x'] <= x1) & (columns['y'] >= y0) & (columns['y'] <= y1)
+    index = np.flatnonzero(match)
+    points = np.empty(len(index), dtype=POINT_DTYPE)
+    for name in POINT_DTYPE.names:
+        points[name] = columns[name][index]
+    return points
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the trajectory store")
+    parser.add_argument('--minutes', type=float, default=60.0, help="Simulated session length")
+    parser.add_argument('--tracks', type=int, default=20, help="Simultaneous tracks")
+    parser.add_argument('--static', type=float, default=0.5, help="Fraction of standing objects")
+    parser.add_argument('--tolerance', type=float, default=0.02, help="Simplification tolerance (meters)")
+    parser.add_argument('--fps', type=float, default=30.0)
+    parser.add_argument('--window', type=float, default=60.0, help="Query time window (seconds)")
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    workdir = Path(tempfile.mkdtemp(prefix='trajectories_'))
+    try:
+        raw = TrajectoryStore(workdir / 'raw')
+        simplified = TrajectoryStore(workdir / 'simplified', tolerance_m=args.tolerance)
+
+        num_frames = int(args.minutes * 60 * args.fps)
+        lifetime = int(3 * 60 * args.fps)  # New objects every 3 minutes
+        raw_times, simplified_times = [], []
+        for frame in range(num_frames):
+            if frame % lifetime == 0:
+                ids = np.arange(args.tracks) + frame // lifetime * args.tracks
+                position = rng.uniform(0, 20, size=(args.tracks, 2))
+                speed = np.where(rng.random(args.tracks) < args.static, 0.0, rng.uniform(0.3, 1.5, args.tracks))
+                heading = rng.uniform(-np.pi, np.pi, args.tracks)
+                turn = rng.normal(0, 0.3, args.tracks)
+            heading += turn / args.fps
+            position += np.column_stack([np.cos(heading), np.sin(heading)]) * speed[:, None] / args.fps
+            position = np.mod(position, 20)
+            measured = np.column_stack([position + rng.normal(0, 0.003, position.shape),
+                                        np.full(args.tracks, 1.7)])
+            timestamp = frame / args.fps
+
+            start = time.perf_counter()
+            raw.append(ids, timestamp, measured)
+            raw_times.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            simplified.append(ids, timestamp, measured)
+            simplified_times.append(time.perf_counter() - start)
+        raw.close()
+        simplified.close()
+
+        raw = TrajectoryStore(workdir / 'raw')
+        simplified = TrajectoryStore(workdir / 'simplified')
+
+        # --window time ranges and 4x4 m floor areas
+        duration = num_frames / args.fps
+        index_times, scan_times, chunks_read = [], [], []
+        for _ in range(args.queries):
+            t0 = rng.uniform(0, max(duration - args.window, 0))
+            x0, y0 = rng.uniform(0, 16, size=2)
+            rect = (x0, y0, x0 + 4, y0 + 4)
+
+            start = time.perf_counter()
+            points = raw.query(t0, t0 + args.window, rect)
+            index_times.append(time.perf_counter() - start)
+            chunks_read.append(len(raw.candidate_chunks(t0, t0 + args.window, rect)))
+
+            start = time.perf_counter()
+            expected = full_scan(raw, t0, t0 + args.window, rect)
+            scan_times.append(time.perf_counter() - start)
+            assert len(points) == len(expected)
+
+        deviation = max(polyline_deviation(raw.trajectory(track_id), simplified.trajectory(track_id))
+                        for track_id in raw.tracks_in())
+
+        print("\n" + "="*72)
+        print(f"Trajectory store: {args.minutes:.0f} min at {args.fps:.0f} Hz, {args.tracks} tracks "
+              f"({args.static:.0%} standing)")
+        print("="*72)
+        print(f"{'Store':<14}{'Rows':>12}{'MB':>10}{'Chunks':>9}{'Append ms (p50)':>17}{'p99':>10}")
+        for name, store, times in (('raw', raw, raw_times), ('simplified', simplified, simplified_times)):
+            print(f"{name:<14}{len(store):>12}{store_bytes(store.root) / 1e6:>10.2f}{len(store.chunks):>9}"
+                  f"{np.median(times) * 1000:>17.3f}{np.percentile(times, 99) * 1000:>10.3f}")
+        print("="*72)
+        print(f"Simplified keeps {len(simplified) / len(raw):.2%} of the points; "
+              f"max deviation {deviation * 1000:.1f} mm (tolerance {args.tolerance * 1000:.0f} mm)")
+        print(f"Query ({args.window:.0f} s, 4x4 m) on raw: {np.median(index_times) * 1000:.2f} ms median, "
+              f"{np.mean(chunks_read):.1f} of {len(raw.chunks)} chunks read")
+        print(f"Full scan of the same:       {np.median(scan_times) * 1000:.2f} ms median "
+              f"({np.median(scan_times) / np.median(index_times):.1f}x slower)")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Zone Membership Benchmark
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: Time ZoneMap lookups against deprojecting and testing polygons every frame
+
+Synthetic frames are segmented with FloorBackground, then zone membership
+of every foreground pixel is computed two ways:
+- ZoneMap: pixel_counts() on the precomputed per-pixel label map
+- per frame: deproject the foreground pixels with their measured depth
+  (CoordinateTransformer) and test each zone polygon (matplotlib Path)
+The label map gives a pixel the zone of the floor point behind it, so the
+pixels of tall objects near a zone edge are counted in the wrong zone
+(parallax); the difference to the measured positions is reported, next to
+the floor grid's own edge error. Also times the label map rebuild after a
+tilt change.
+
+Usage:
+    python benchmarks/bench_zones.py
+    python benchmarks/bench_zones.py --zones 16 --frames 100
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from matplotlib.path import Path as PolygonPath
+
+# Make the repository root importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'xy_transform'))
+from coordinate_transform import CoordinateTransformer
+from src.data.frame_source import SyntheticFrameSource
+from src.utils.foreground import FloorBackground
+from src.utils.zones import Zone, ZoneMap
+
+
+def random_zones(count, rng, extent_m=1.5):
+    """Non-overlapping quadrilaterals on a grid over the floor."""
+    side = int(np.ceil(np.sqrt(count)))
+    cell = 2 * extent_m / side
+    zones = []
+    for index in range(count):
+        x0 = -extent_m + (index % side) * cell
+        y0 = -extent_m + (index // side) * cell
+        corners = np.array([[0.1, 0.1], [0.9, 0.1], [0.9, 0.9], [0.1, 0.9]]) * cell
+        corners += rng.uniform(-0.08, 0.08, size=corners.shape) * cell
+        zones.append(Zone(f"zone {index + 1}", corners + [x0, y0]))
+    return zones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark zone membership")
+    parser.add_argument('--zones', type=int, default=4)
+    parser.add_argument('--frames', type=int, default=50)
+    parser.add_argument('--objects', type=int, default=8)
+    parser.add_argument('--width', type=int, default=848)
+    parser.add_argument('--height', type=int, default=480)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    source = SyntheticFrameSource(args.width, args.height, 30, num_objects=args.objects)
+    source.start()
+    first = source.read(aligned=True)
+    transformer = CoordinateTransformer(source.camera_height_m, pitch_deg=3.0)
+    transformer.set_intrinsics(first['color_intrinsics'])
+
+    background = FloorBackground.from_transformer(transformer, source.depth_scale)
+    for floor in source.floor_bank:
+        background.learn(floor)
+
+    zones = random_zones(args.zones, rng)
+    paths = [PolygonPath(zone.polygon) for zone in zones]
+    start = time.perf_counter()
+    zone_map = ZoneMap(zones, transformer)
+    zone_map.pixel_map()
+    build_time = time.perf_counter() - start
+
+    lookup_times, polygon_times, parallax, grid_edges, pixels = [], [], [], [], []
+    for _ in range(args.frames):
+        depth = source.read(aligned=True)['depth_image']
+        mask = background.process(depth)
+
+        start = time.perf_counter()
+        counts = zone_map.pixel_counts(mask)
+        lookup_times.append(time.perf_counter() - start)
+
+        # Reference: every foreground pixel's measured world position, tested against every polygon
+        start = time.perf_counter()
+        v, u = np.nonzero(mask)
+        _, world = transformer.pixels_to_world_coords(u, v, depth[v, u] * source.depth_scale)
+        measured = np.zeros(len(u), dtype=np.int64)
+        for label, path in enumerate(paths, start=1):
+            measured[path.contains_points(world[:, :2])] = label
+        expected = np.bincount(measured, minlength=len(zones) + 1)[1:]
+        polygon_times.append(time.perf_counter() - start)
+
+        # Where each pixel's ray meets the floor (what the label map approximates), for the grid error
+        _, direction = transformer.pixels_to_world_coords(u, v, np.ones(len(u)))
+        scale = transformer.camera_height / (transformer.camera_height - direction[:, 2])
+        floor = np.zeros(len(u), dtype=np.int64)
+        for label, path in enumerate(paths, start=1):
+            floor[path.contains_points(direction[:, :2] * scale[:, None])] = label
+
+        labels = zone_map.pixel_map()[v, u]
+        parallax.append(np.count_nonzero(labels != measured))
+        grid_edges.append(np.count_nonzero(labels != floor))
+        pixels.append(len(u))
+    source.stop()
+
+    # Rebuild after the calibration changes
+    transformer.update_tilt(pitch_deg=4.0)
+    start = time.perf_counter()
+    zone_map.pixel_map()
+    rebuild_time = time.perf_counter() - start
+
+    print("\n" + "="*64)
+    print(f"Zones: {args.zones}, {args.width}x{args.height}, {np.mean(pixels):.0f} foreground pixels per frame")
+    print("="*64)
+    print(f"{'Method':<34}{'Median ms':>12}{'Max ms':>12}")
+    print(f"{'ZoneMap.pixel_counts':<34}{np.median(lookup_times) * 1000:>12.3f}{np.max(lookup_times) * 1000:>12.3f}")
+    print(f"{'Deproject depth + polygon test':<34}{np.median(polygon_times) * 1000:>12.3f}"
+          f"{np.max(polygon_times) * 1000:>12.3f}")
+    print("="*64)
+    print(f"Label maps built in {build_time * 1000:.1f} ms (first, with ray table), "
+          f"rebuilt in {rebuild_time * 1000:.1f} ms after a tilt change")
+    print(f"Pixels labeled differently from their measured position: {np.mean(parallax):.1f} per frame "
+          f"({np.sum(parallax) / max(np.sum(pixels), 1):.2%}, parallax of objects above the floor)")
+    print(f"Pixels labeled differently from the floor point behind them: {np.mean(grid_edges):.1f} per frame "
+          f"(edge cells of the {zone_map.cell_m * 100:.0f} cm floor grid)")
+    print("Object membership should use zone_map.lookup(blobs['centroid']) (measured world positions)")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,14 +5,25 @@ Date: January 21, 2026
 Purpose: Systematically test depth accuracy and document results
 """
 
-import pyrealsense2 as rs
 import numpy as np
 import cv2
 import time
 import json
 from datetime import datetime
 from pathlib import Path
-import matplotlib.pyplot as plt
+import sys
+
+# Make the repository root importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.data.frame_source import RealSenseFrameSource, open_frame_source
+from src.utils.pixel_statistics import PixelStatistics
+from src.utils.grid_statistics import grid_statistics
+from src.data.results_store import ResultsStore
+
+
+def _json_number(value):
+    """Float for JSON, with None for NaN (cells without valid depth)."""
+    return None if np.isnan(value) else float(value)
 
 
 class DepthAccuracyTester:
@@ -20,99 +31,120 @@ class DepthAccuracyTester:
     Automated depth accuracy testing for RealSense camera.
     """
     
-    def __init__(self, output_dir="results/depth_accuracy"):
+    def __init__(self, output_dir="results/depth_accuracy", source=None):
         """
         Initialize the depth accuracy tester.
         
         Args:
-            output_dir: Directory to save results and figures
+            output_dir: Directory to save results (ResultsStore) and figures
+            source: FrameSource to read from (None = live RealSense camera)
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.store = ResultsStore(self.output_dir)
         
         # Initialize RealSense pipeline
-        self.pipeline = rs.pipeline()
-        self.config = rs.config()
-        
         # Configure streams (640x480 is a good balance for accuracy testing)
-        self.config.enable_stream(rs.stream.depth, 640, 480, rs.format.z16, 30)
-        self.config.enable_stream(rs.stream.color, 640, 480, rs.format.bgr8, 30)
+        if source is None:
+            source = RealSenseFrameSource(640, 480, 30)
+        self.source = source
         
         # Start pipeline
-        print("Starting RealSense camera...")
-        self.profile = self.pipeline.start(self.config)
+        self.source.start()
         
-        # Get depth sensor and set options
-        self.depth_sensor = self.profile.get_device().first_depth_sensor()
-        self.depth_scale = self.depth_sensor.get_depth_scale()
+        # Get depth scale
+        self.depth_scale = self.source.depth_scale
         
         print(f"Depth scale: {self.depth_scale} meters/unit")
         print("Camera initialized successfully!")
         
         # Allow camera to stabilize
-        print("Warming up camera (3 seconds)...")
-        for _ in range(90):  # Discard first 90 frames (3 seconds at 30fps)
-            self.pipeline.wait_for_frames()
+        if self.source.is_live:
+            print("Warming up camera (up to 3 seconds)...")
+        self.source.warmup(90)  # Discard frames until exposure and depth settle (at most 3 seconds at 30fps)
         
         print("Ready to test!\n")
+    
+    def _get_depth_image(self):
+        """
+        Get the next raw (unaligned) depth image.
         
-    def capture_depth_samples(self, num_frames=100, roi_center=True, roi_size=(100, 100)):
+        Returns:
+            HxW uint16 depth image or None
+        """
+        frame = self.source.read(aligned=False)
+        if frame is None:
+            return None
+        return frame['depth_image']
+        
+    def capture_depth_samples(self, num_frames=100, roi_center=True, roi_size=(100, 100), keep_samples=True):
         """
         Capture multiple depth frames and extract measurements.
         
+        Statistics are updated frame by frame in constant memory: the mean
+        valid depth of each frame, and per-pixel statistics of the region.
+        
         Args:
             num_frames: Number of frames to capture
             roi_center: If True, measure center region. If False, measure entire frame
             roi_size: Size of ROI in pixels (width, height)
+            keep_samples: If True, also return every frame's mean depth ('raw_measurements')
             
         Returns:
-            dict with depth statistics and raw measurements
+            dict with depth statistics, per-pixel maps (pixel_std_meters,
+            fill_rate) and raw measurements (empty if keep_samples is False)
         """
         print(f"Capturing {num_frames} depth frames...")
+        frame_stats = PixelStatistics()   # Mean valid depth of each frame (meters)
+        pixel_stats = PixelStatistics()   # Per-pixel depth over the region (depth units)
+        frame_mean = np.empty(1, dtype=np.float32)
         depth_measurements = []
         
         for i in range(num_frames):
-            frames = self.pipeline.wait_for_frames()
-            depth_frame = frames.get_depth_frame()
+            depth_image = self._get_depth_image()
             
-            if not depth_frame:
+            if depth_image is None:
                 continue
             
-            # Convert to numpy array
-            depth_image = np.asanyarray(depth_frame.get_data())
-            depth_meters = depth_image * self.depth_scale
-            
             # Extract ROI or full frame
             if roi_center:
                 h, w = depth_image.shape
                 cx, cy = w // 2, h // 2
                 roi_w, roi_h = roi_size[0] // 2, roi_size[1] // 2
-                roi = depth_meters[cy-roi_h:cy+roi_h, cx-roi_w:cx+roi_w]
+                roi = depth_image[cy-roi_h:cy+roi_h, cx-roi_w:cx+roi_w]
             else:
-                roi = depth_meters
+                roi = depth_image
             
-            # Get valid (non-zero) depth values
-            valid_depths = roi[roi > 0]
+            pixel_stats.update(roi)
             
-            if len(valid_depths) > 0:
-                depth_measurements.append(np.mean(valid_depths))
+            # Mean of valid (non-zero) depth values
+            num_valid = np.count_nonzero(roi)
+            if num_valid > 0:
+                frame_mean[0] = roi.sum(dtype=np.uint64) / num_valid * self.depth_scale
+                frame_stats.update(frame_mean)
+                if keep_samples:
+                    depth_measurements.append(float(frame_mean[0]))
             
             # Progress indicator
             if (i + 1) % 20 == 0:
                 print(f"  {i + 1}/{num_frames} frames captured")
         
         # Calculate statistics
-        measurements_array = np.array(depth_measurements)
+        mean_meters = float(frame_stats.mean()[0])
+        std_meters = float(frame_stats.std()[0])
         
         stats = {
-            'mean_meters': np.mean(measurements_array),
-            'mean_cm': np.mean(measurements_array) * 100,
-            'std_meters': np.std(measurements_array),
-            'std_cm': np.std(measurements_array) * 100,
-            'min_meters': np.min(measurements_array),
-            'max_meters': np.max(measurements_array),
-            'num_samples': len(measurements_array),
-            'raw_measurements': measurements_array.tolist()
+            'mean_meters': mean_meters,
+            'mean_cm': mean_meters * 100,
+            'std_meters': std_meters,
+            'std_cm': std_meters * 100,
+            'min_meters': float(frame_stats.minimum()[0]),
+            'max_meters': float(frame_stats.maximum()[0]),
+            'median_meters': float(frame_stats.median()[0]),
+            'num_samples': int(frame_stats.count[0]),
+            'raw_measurements': depth_measurements,
+            'pixel_std_meters': pixel_stats.std() * self.depth_scale,
+            'fill_rate': pixel_stats.fill_rate()
         }
         
         print(f"  Mean depth: {stats['mean_cm']:.2f} cm (±{stats['std_cm']:.2f} cm)")
@@ -181,13 +213,18 @@ class DepthAccuracyTester:
         
         return results
     
-    def test_spatial_uniformity(self, num_frames=100, grid_size=(5, 5)):
+    def test_spatial_uniformity(self, num_frames=100, grid_size=(5, 5), pixel_maps=False):
         """
         Test depth uniformity across the field of view.
         
+        Per-pixel statistics skip dropouts, so a cell's mean is the mean of
+        its valid samples (pixels that dropped out are not averaged in as 0).
+        
         Args:
             num_frames: Number of frames to average
             grid_size: Grid dimensions (rows, cols)
+            pixel_maps: If True, also save full-resolution mean, noise and
+                        fill-rate maps with the run, for heatmaps
             
         Returns:
             dict with spatial depth map
@@ -198,91 +235,78 @@ class DepthAccuracyTester:
         
         print(f"Capturing {num_frames} frames for spatial analysis...")
         
-        # Accumulate depth frames
-        depth_accumulator = None
-        count = 0
+        # Per-pixel statistics, updated in place
+        pixel_stats = PixelStatistics()
         
         for i in range(num_frames):
-            frames = self.pipeline.wait_for_frames()
-            depth_frame = frames.get_depth_frame()
+            depth_image = self._get_depth_image()
             
-            if not depth_frame:
+            if depth_image is None:
                 continue
             
-            depth_image = np.asanyarray(depth_frame.get_data())
-            depth_meters = depth_image * self.depth_scale
-            
-            if depth_accumulator is None:
-                depth_accumulator = np.zeros_like(depth_meters, dtype=np.float64)
-            
-            depth_accumulator += depth_meters
-            count += 1
+            pixel_stats.update(depth_image)
             
             if (i + 1) % 20 == 0:
                 print(f"  {i + 1}/{num_frames} frames captured")
         
-        # Calculate average depth map
-        avg_depth_map = depth_accumulator / count
-        
-        # Sample grid
-        h, w = avg_depth_map.shape
+        # One vectorized reduction for all cells (depth units -> cm)
+        scale = self.depth_scale * 100
+        grid = grid_statistics(pixel_stats, grid_size, scale=scale)
         rows, cols = grid_size
         
         grid_results = []
-        
-        print("\nSpatial Depth Map (cm):")
-        print("-" * (cols * 10))
-        
         for r in range(rows):
-            row_values = []
             for c in range(cols):
-                # Define grid cell boundaries
-                y_start = int(r * h / rows)
-                y_end = int((r + 1) * h / rows)
-                x_start = int(c * w / cols)
-                x_end = int((c + 1) * w / cols)
-                
-                # Extract cell
-                cell = avg_depth_map[y_start:y_end, x_start:x_end]
-                valid_cell = cell[cell > 0]
-                
-                if len(valid_cell) > 0:
-                    mean_depth_cm = np.mean(valid_cell) * 100
-                    std_depth_cm = np.std(valid_cell) * 100
-                else:
-                    mean_depth_cm = 0
-                    std_depth_cm = 0
-                
                 grid_results.append({
                     'row': r,
                     'col': c,
-                    'mean_cm': mean_depth_cm,
-                    'std_cm': std_depth_cm
+                    'mean_cm': _json_number(grid['mean'][r, c]),
+                    'std_cm': _json_number(grid['std'][r, c]),
+                    'noise_cm': _json_number(grid['noise'][r, c]),
+                    'fill_rate': float(grid['fill_rate'][r, c]),
+                    **{f"p{p}_cm": _json_number(values[r, c]) for p, values in grid['percentiles'].items()}
                 })
-                
-                row_values.append(mean_depth_cm)
-            
-            # Print row
+        
+        print("\nSpatial Depth Map (cm):")
+        print("-" * (cols * 10))
+        for row_values in np.nan_to_num(grid['mean']):
             print(" | ".join([f"{v:6.2f}" for v in row_values]))
         
+        print("\nFill Rate:")
+        print("-" * (cols * 10))
+        for row_values in grid['fill_rate']:
+            print(" | ".join([f"{v:6.1%}" for v in row_values]))
+        
         results = {
             'test_name': 'spatial_uniformity',
             'timestamp': datetime.now().isoformat(),
             'grid_size': grid_size,
             'grid_data': grid_results,
-            'num_frames': count
+            'num_frames': pixel_stats.frames
         }
         
-        self._save_test_results(results)
+        arrays = None
+        if pixel_maps:
+            maps = grid_statistics(pixel_stats, None, scale=scale)
+            arrays = {
+                'mean_cm': maps['mean'].astype(np.float32),
+                'noise_cm': maps['noise'].astype(np.float32),
+                'median_cm': maps['percentiles'][50].astype(np.float32),
+                'fill_rate': maps['fill_rate'].astype(np.float32)
+            }
+        
+        self._save_test_results(results, arrays)
         
         return results
     
-    def test_repeatability(self, num_frames=1000):
+    def test_repeatability(self, num_frames=1000, keep_samples=True):
         """
         Test depth measurement repeatability at a fixed position.
         
         Args:
             num_frames: Number of frames to capture (more = better statistics)
+            keep_samples: If True, save every frame's measurement (for histograms).
+                          Memory does not grow with num_frames when False
             
         Returns:
             dict with repeatability statistics
@@ -291,60 +315,78 @@ class DepthAccuracyTester:
         print(f"TEST: Repeatability/Precision - {num_frames} frames")
         print(f"{'='*60}")
         
-        stats = self.capture_depth_samples(num_frames=num_frames, roi_center=True)
+        stats = self.capture_depth_samples(num_frames=num_frames, roi_center=True, keep_samples=keep_samples)
         
-        # Calculate additional statistics
-        measurements = np.array(stats['raw_measurements']) * 100  # Convert to cm
+        # Per-pixel noise over the region, from the same pass
+        pixel_std_cm = stats['pixel_std_meters'] * 100
         
         results = {
             'test_name': 'repeatability',
             'timestamp': datetime.now().isoformat(),
             'mean_cm': stats['mean_cm'],
             'std_dev_cm': stats['std_cm'],
-            'min_cm': np.min(measurements),
-            'max_cm': np.max(measurements),
-            'range_cm': np.max(measurements) - np.min(measurements),
-            'num_samples': len(measurements),
-            'measurements_cm': measurements.tolist()
+            'min_cm': stats['min_meters'] * 100,
+            'max_cm': stats['max_meters'] * 100,
+            'range_cm': (stats['max_meters'] - stats['min_meters']) * 100,
+            'median_cm': stats['median_meters'] * 100,
+            'num_samples': stats['num_samples'],
+            'pixel_noise_median_cm': float(np.nanmedian(pixel_std_cm)),
+            'pixel_noise_p95_cm': float(np.nanpercentile(pixel_std_cm, 95)),
+            'fill_rate': float(np.mean(stats['fill_rate']))
         }
+        if keep_samples:
+            results['measurements_cm'] = [m * 100 for m in stats['raw_measurements']]
         
         print(f"\nREPEATABILITY RESULTS:")
         print(f"  Mean:       {results['mean_cm']:.3f} cm")
         print(f"  Std Dev:    {results['std_dev_cm']:.3f} cm")
         print(f"  Range:      {results['range_cm']:.3f} cm")
         print(f"  Min/Max:    [{results['min_cm']:.3f}, {results['max_cm']:.3f}] cm")
+        print(f"  Pixel noise: {results['pixel_noise_median_cm']:.3f} cm median, "
+              f"{results['pixel_noise_p95_cm']:.3f} cm p95 (fill {results['fill_rate']:.1%})")
         
         self._save_test_results(results)
         
         return results
     
-    def _save_test_results(self, results):
-        """Save test results to JSON file."""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        test_name = results.get('test_name', 'test')
-        filename = f"{timestamp}_{test_name}.json"
-        filepath = self.output_dir / filename
+    def _save_test_results(self, results, arrays=None):
+        """
+        Save test results to the results store.
         
-        with open(filepath, 'w') as f:
-            json.dump(results, f, indent=2)
+        Measurement lists and grids are stored as arrays next to the database.
         
-        print(f"\n✓ Results saved to: {filepath}")
+        Args:
+            results: Results dict (the run id is added as results['run_id'])
+            arrays: Optional dict of extra NumPy arrays (e.g. per-pixel maps)
+        """
+        resolution = (self.source.width, self.source.height)
+        results['run_id'] = self.store.add_run(results, arrays, resolution=resolution)
+        
+        print(f"\n✓ Results saved to: {self.store.root / 'results.sqlite'} (run {results['run_id']})")
     
-    def visualize_test_results(self, results_file):
+    def visualize_test_results(self, run):
         """
         Create visualization plots from test results.
         
         Args:
-            results_file: Path to JSON results file
+            run: Run id in the results store, or path to a JSON results file
+                 (older runs)
         """
-        with open(results_file, 'r') as f:
-            results = json.load(f)
-        
-        test_name = results.get('test_name', 'test')
-        
-        if 'raw_measurements_cm' in results:
+        if isinstance(run, int):
+            results = self.store.load_run(run)
+        else:
+            with open(run, 'r') as f:
+                results = json.load(f)
+            results['measurements_cm'] = results.get('raw_measurements_cm')
+        
+        test_name = results.get('test_name') or 'test'
+        
+        if results.get('measurements_cm') is not None and 'ground_truth_cm' in results:
+            # Imported here so the tests themselves start without matplotlib
+            import matplotlib.pyplot as plt
+            
             # Plot histogram of measurements
-            measurements = np.array(results['raw_measurements_cm'])
+            measurements = np.asarray(results['measurements_cm'])
             
             plt.figure(figsize=(10, 6))
             plt.hist(measurements, bins=50, edgecolor='black', alpha=0.7)
@@ -367,100 +409,116 @@ class DepthAccuracyTester:
     def shutdown(self):
         """Stop the camera pipeline."""
         print("\nShutting down camera...")
-        self.pipeline.stop()
+        self.source.stop()
+        self.store.close()
         print("Done!")
 
 
-# Example usage
-if __name__ == "__main__":
-    print("="*60)
-    print("RealSense D435 Depth Accuracy Testing")
+def run_test_menu(tester):
+    """
+    Print the experiment guide and run the interactive test menu.
+    
+    Args:
+        tester: DepthAccuracyTester with a started source
+    """
+    print("\n" + "="*60)
+    print("EXPERIMENT GUIDE")
     print("="*60)
+    print("\n1. Position your camera to face a flat wall")
+    print("2. Measure the distance from camera to wall using tape measure")
+    print("3. Run tests for each distance you want to evaluate")
     print()
+    print("Recommended test distances: 50, 100, 150, 200, 250, 300 cm")
+    print("="*60)
     
-    # Initialize tester
-    tester = DepthAccuracyTester()
-    
-    try:
+    # Interactive mode
+    while True:
         print("\n" + "="*60)
-        print("EXPERIMENT GUIDE")
+        print("TEST MENU")
         print("="*60)
-        print("\n1. Position your camera to face a flat wall")
-        print("2. Measure the distance from camera to wall using tape measure")
-        print("3. Run tests for each distance you want to evaluate")
-        print()
-        print("Recommended test distances: 50, 100, 150, 200, 250, 300 cm")
+        print("1. Distance Accuracy Test (single distance)")
+        print("2. Multiple Distance Tests (automated)")
+        print("3. Spatial Uniformity Test")
+        print("4. Repeatability/Precision Test")
+        print("5. Exit")
         print("="*60)
         
-        # Interactive mode
-        while True:
-            print("\n" + "="*60)
-            print("TEST MENU")
-            print("="*60)
-            print("1. Distance Accuracy Test (single distance)")
-            print("2. Multiple Distance Tests (automated)")
-            print("3. Spatial Uniformity Test")
-            print("4. Repeatability/Precision Test")
-            print("5. Exit")
-            print("="*60)
-            
-            choice = input("\nEnter choice (1-5): ").strip()
+        choice = input("\nEnter choice (1-5): ").strip()
+        
+        if choice == '1':
+            # Single distance test
+            distance_str = input("Enter ground truth distance (cm): ").strip()
+            try:
+                distance_cm = float(distance_str)
+                tester.test_distance_accuracy(distance_cm, num_frames=100)
+            except ValueError:
+                print("Invalid distance. Please enter a number.")
+        
+        elif choice == '2':
+            # Multiple distances (batch mode)
+            print("\nEnter distances to test (comma-separated in cm)")
+            print("Example: 50, 100, 150, 200")
+            distances_str = input("Distances: ").strip()
             
-            if choice == '1':
-                # Single distance test
-                distance_str = input("Enter ground truth distance (cm): ").strip()
-                try:
-                    distance_cm = float(distance_str)
-                    tester.test_distance_accuracy(distance_cm, num_frames=100)
-                except ValueError:
-                    print("Invalid distance. Please enter a number.")
-            
-            elif choice == '2':
-                # Multiple distances (batch mode)
-                print("\nEnter distances to test (comma-separated in cm)")
-                print("Example: 50, 100, 150, 200")
-                distances_str = input("Distances: ").strip()
+            try:
+                distances = [float(d.strip()) for d in distances_str.split(',')]
+                print(f"\nWill test {len(distances)} distances: {distances}")
+                input("Press ENTER to start (position camera at first distance)...")
                 
-                try:
-                    distances = [float(d.strip()) for d in distances_str.split(',')]
-                    print(f"\nWill test {len(distances)} distances: {distances}")
-                    input("Press ENTER to start (position camera at first distance)...")
-                    
-                    results_all = []
-                    for i, dist in enumerate(distances, 1):
-                        print(f"\n\n*** Distance {i}/{len(distances)}: {dist} cm ***")
-                        input(f"Position camera at {dist} cm and press ENTER...")
-                        result = tester.test_distance_accuracy(dist, num_frames=100,
-                                                               test_name=f"dist_{dist}cm")
-                        results_all.append(result)
-                    
-                    print("\n" + "="*60)
-                    print("ALL TESTS COMPLETE - SUMMARY")
-                    print("="*60)
-                    for r in results_all:
-                        print(f"{r['ground_truth_cm']:6.1f} cm: "
-                              f"Measured {r['measured_depth_cm']:6.2f} cm | "
-                              f"Error {r['absolute_error_cm']:+6.2f} cm ({r['relative_error_pct']:+5.2f}%) | "
-                              f"MAE {r['l1_loss_mae_cm']:5.2f} cm | RMSE {r['l2_loss_rmse_cm']:5.2f} cm")
-                    
-                except ValueError:
-                    print("Invalid input. Please use comma-separated numbers.")
-            
-            elif choice == '3':
-                # Spatial uniformity
-                distance_str = input("Enter approximate distance to wall (cm): ").strip()
-                tester.test_spatial_uniformity(num_frames=100)
-            
-            elif choice == '4':
-                # Repeatability test
-                distance_str = input("Enter approximate distance to wall (cm): ").strip()
-                tester.test_repeatability(num_frames=1000)
-            
-            elif choice == '5':
-                break
-            
-            else:
-                print("Invalid choice. Please enter 1-5.")
+                results_all = []
+                for i, dist in enumerate(distances, 1):
+                    print(f"\n\n*** Distance {i}/{len(distances)}: {dist} cm ***")
+                    input(f"Position camera at {dist} cm and press ENTER...")
+                    result = tester.test_distance_accuracy(dist, num_frames=100,
+                                                           test_name=f"dist_{dist}cm")
+                    results_all.append(result)
+                
+                print("\n" + "="*60)
+                print("ALL TESTS COMPLETE - SUMMARY")
+                print("="*60)
+                for r in results_all:
+                    print(f"{r['ground_truth_cm']:6.1f} cm: "
+                          f"Measured {r['measured_depth_cm']:6.2f} cm | "
+                          f"Error {r['absolute_error_cm']:+6.2f} cm ({r['relative_error_pct']:+5.2f}%) | "
+                          f"MAE {r['l1_loss_mae_cm']:5.2f} cm | RMSE {r['l2_loss_rmse_cm']:5.2f} cm")
+                
+            except ValueError:
+                print("Invalid input. Please use comma-separated numbers.")
+        
+        elif choice == '3':
+            # Spatial uniformity
+            distance_str = input("Enter approximate distance to wall (cm): ").strip()
+            tester.test_spatial_uniformity(num_frames=100)
+        
+        elif choice == '4':
+            # Repeatability test
+            distance_str = input("Enter approximate distance to wall (cm): ").strip()
+            tester.test_repeatability(num_frames=1000)
+        
+        elif choice == '5':
+            break
+        
+        else:
+            print("Invalid choice. Please enter 1-5.")
+
+
+# Example usage
+if __name__ == "__main__":
+    print("="*60)
+    print("RealSense D435 Depth Accuracy Testing")
+    print("="*60)
+    print()
+    
+    # Initialize tester (optional frame source: 'synthetic' or a recording path)
+    source_spec = sys.argv[1] if len(sys.argv) > 1 else None
+    try:
+        tester = DepthAccuracyTester(source=open_frame_source(source_spec, 640, 480, 30))
+    except RuntimeError as e:
+        print(e)
+        sys.exit(1)
+    
+    try:
+        run_test_menu(tester)
     
     except KeyboardInterrupt:
         print("\n\nTest interrupted by user.")
@@ -11,12 +11,17 @@ Frame alignment is necessary because:
 4. Alignment projects RGB data onto the depth sensor's coordinate frame
 """
 
-import pyrealsense2 as rs
 import numpy as np
 import cv2
 from pathlib import Path
 from datetime import datetime
 import time
+import sys
+
+# Make the repository root importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.data.frame_source import RealSenseFrameSource, open_frame_source
+from src.utils.profiling import get_profiler
 
 
 class FrameAligner:
@@ -24,7 +29,8 @@ class FrameAligner:
     Handles RGB-to-Depth frame alignment for RealSense camera.
     """
     
-    def __init__(self, width=640, height=480, fps=30, output_dir="results/frame_alignment"):
+    def __init__(self, width=640, height=480, fps=30, output_dir="results/frame_alignment", source=None,
+                 profile=False):
         """
         Initialize the frame aligner.
         
@@ -33,42 +39,39 @@ class FrameAligner:
             height: Frame height (480 recommended for D435)
             fps: Frames per second
             output_dir: Directory to save results
+            source: FrameSource to read from (None = live RealSense camera)
+            profile: If True, record per-stage timings (saved on shutdown)
         """
-        self.width = width
-        self.height = height
-        self.fps = fps
-        
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
         # Initialize RealSense pipeline
-        self.pipeline = rs.pipeline()
-        self.config = rs.config()
-        
         # Configure streams - BOTH depth and color
-        self.config.enable_stream(rs.stream.depth, width, height, rs.format.z16, fps)
-        self.config.enable_stream(rs.stream.color, width, height, rs.format.bgr8, fps)
-        
-        print(f"Configuring streams: {width}x{height} @ {fps}fps")
-        
-        # Start pipeline
-        print("Starting RealSense camera...")
-        self.profile = self.pipeline.start(self.config)
-        
-        # Create align object - this is the KEY component
-        # rs.align aligns frames to a target stream (depth in this case)
-        align_to = rs.stream.color  # We can align TO color or TO depth
-        self.align = rs.align(align_to)
+        if source is None:
+            source = RealSenseFrameSource(width, height, fps)
+            print(f"Configuring streams: {width}x{height} @ {fps}fps")
+        self.source = source
+        
+        # Start source. The live source aligns with rs.align(rs.stream.color),
+        # the KEY component: we can align TO color or TO depth
+        self.source.start()
+        self.width = self.source.width
+        self.height = self.source.height
+        self.fps = self.source.fps
         
         # Get depth scale
-        depth_sensor = self.profile.get_device().first_depth_sensor()
-        self.depth_scale = depth_sensor.get_depth_scale()
+        self.depth_scale = self.source.depth_scale
         print(f"Depth scale: {self.depth_scale} meters/unit")
         
         # Allow camera to stabilize
-        print("Warming up camera (2 seconds)...")
-        for _ in range(fps * 2):
-            self.pipeline.wait_for_frames()
+        if self.source.is_live:
+            print("Warming up camera (up to 2 seconds)...")
+        self.source.warmup(self.fps * 2)
+        
+        # Stage timings (enabled after warm-up so warm-up frames are not counted)
+        self.profiler = get_profiler()
+        if profile:
+            self.profiler.enable()
         
         print("✓ Camera ready!\n")
     
@@ -78,29 +81,31 @@ class FrameAligner:
         
         Returns:
             tuple: (aligned_depth_frame, aligned_color_frame, color_image, depth_image, depth_colormap)
+                   Frames are None for sources without SDK frames
         """
-        # Wait for frames
-        frames = self.pipeline.wait_for_frames()
-        
-        # Align the depth frame to color frame
-        aligned_frames = self.align.process(frames)
+        with self.profiler.stage('get_aligned_frames'):
+            return self._get_aligned_frames()
+
+    def _get_aligned_frames(self):
+        # Wait for frames, aligning the depth frame to the color frame
+        frame = self.source.read(aligned=True)
+        if frame is None:
+            return None
         
         # Get aligned frames
-        aligned_depth_frame = aligned_frames.get_depth_frame()
-        color_frame = aligned_frames.get_color_frame()
-        
-        if not aligned_depth_frame or not color_frame:
-            return None
+        aligned_depth_frame = frame['depth_frame']
+        color_frame = frame['color_frame']
         
-        # Convert to numpy arrays
-        depth_image = np.asanyarray(aligned_depth_frame.get_data())
-        color_image = np.asanyarray(color_frame.get_data())
+        # Numpy arrays
+        depth_image = frame['depth_image']
+        color_image = frame['color_image']
         
         # Create colorized depth image for visualization
-        depth_colormap = cv2.applyColorMap(
-            cv2.convertScaleAbs(depth_image, alpha=0.03),
-            cv2.COLORMAP_JET
-        )
+        with self.profiler.stage('colormap'):
+            depth_colormap = cv2.applyColorMap(
+                cv2.convertScaleAbs(depth_image, alpha=0.03),
+                cv2.COLORMAP_JET
+            )
         
         return aligned_depth_frame, color_frame, color_image, depth_image, depth_colormap
     
@@ -111,16 +116,15 @@ class FrameAligner:
         Returns:
             tuple: (depth_frame, color_frame, color_image, depth_image, depth_colormap)
         """
-        frames = self.pipeline.wait_for_frames()
-        
-        depth_frame = frames.get_depth_frame()
-        color_frame = frames.get_color_frame()
-        
-        if not depth_frame or not color_frame:
+        frame = self.source.read(aligned=False)
+        if frame is None:
             return None
         
-        depth_image = np.asanyarray(depth_frame.get_data())
-        color_image = np.asanyarray(color_frame.get_data())
+        depth_frame = frame['depth_frame']
+        color_frame = frame['color_frame']
+        
+        depth_image = frame['depth_image']
+        color_image = frame['color_image']
         
         depth_colormap = cv2.applyColorMap(
             cv2.convertScaleAbs(depth_image, alpha=0.03),
@@ -208,6 +212,8 @@ class FrameAligner:
                 
                 aligned_depth_frame, color_frame, color_image, depth_image, depth_colormap = result
                 
+                overlay_start = time.perf_counter()
+                
                 # Create side-by-side view
                 combined = np.hstack((color_image, depth_colormap))
                 
@@ -222,9 +228,11 @@ class FrameAligner:
                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
                 cv2.putText(combined, "Depth (Aligned)", (self.width + 10, 60),
                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+                self.profiler.record('overlay', time.perf_counter() - overlay_start)
                 
                 # Show
-                cv2.imshow("Live Aligned RGB-D View (Press 'q' to quit, 's' to save)", combined)
+                with self.profiler.stage('imshow'):
+                    cv2.imshow("Live Aligned RGB-D View (Press 'q' to quit, 's' to save)", combined)
                 
                 key = cv2.waitKey(1) & 0xFF
                 
@@ -247,19 +255,21 @@ class FrameAligner:
             print(f"\nCaptured {frame_count} frames in {elapsed:.1f} seconds")
             print(f"Average FPS: {fps:.1f}")
     
-    def get_depth_at_pixel(self, aligned_depth_frame, x, y):
+    def get_depth_at_pixel(self, aligned_depth, x, y):
         """
         Get depth value at specific pixel coordinate.
         Only works correctly with ALIGNED frames!
         
         Args:
-            aligned_depth_frame: Aligned depth frame
+            aligned_depth: Aligned depth frame or aligned depth image (numpy array)
             x, y: Pixel coordinates
             
         Returns:
             float: Depth in meters
         """
-        depth = aligned_depth_frame.get_distance(x, y)
+        if isinstance(aligned_depth, np.ndarray):
+            return float(aligned_depth[y, x]) * self.depth_scale
+        depth = aligned_depth.get_distance(x, y)
         return depth
     
     def demonstrate_pixel_query(self):
@@ -301,7 +311,7 @@ class FrameAligner:
             
             # Draw all clicked points
             for i, (cx, cy) in enumerate(click_coords):
-                depth = aligned_depth_frame.get_distance(cx, cy)
+                depth = self.get_depth_at_pixel(depth_image, cx, cy)
                 
                 # Draw circle
                 cv2.circle(display_copy, (cx, cy), 5, (0, 255, 0), -1)
@@ -386,11 +396,9 @@ class FrameAligner:
         if result is None:
             return None
         
-        aligned_depth_frame, color_frame, _, _, _ = result
-        
-        # Get intrinsics
-        color_intrinsics = color_frame.profile.as_video_stream_profile().intrinsics
-        depth_intrinsics = aligned_depth_frame.profile.as_video_stream_profile().intrinsics
+        # Get intrinsics (aligned depth shares the color intrinsics)
+        color_intrinsics = self.source.color_intrinsics
+        depth_intrinsics = self.source.color_intrinsics
         
         print("\n" + "="*60)
         print("CAMERA INTRINSICS")
@@ -412,8 +420,9 @@ class FrameAligner:
     def shutdown(self):
         """Stop the camera pipeline."""
         print("\nShutting down camera...")
-        self.pipeline.stop()
+        self.source.stop()
         cv2.destroyAllWindows()
+        self.profiler.finish('frame_alignment')
         print("✓ Done!")
 
 
@@ -430,8 +439,16 @@ def main():
     print("  3. Create accurate 3D point clouds with color")
     print("="*60)
     
-    # Initialize aligner
-    aligner = FrameAligner(width=640, height=480, fps=30)
+    # Initialize aligner (optional frame source: 'synthetic' or a recording path)
+    # --profile saves per-stage timings on exit
+    args = [arg for arg in sys.argv[1:] if arg != '--profile']
+    source_spec = args[0] if args else None
+    try:
+        aligner = FrameAligner(source=open_frame_source(source_spec, 640, 480, 30),
+                               profile='--profile' in sys.argv)
+    except RuntimeError as e:
+        print(e)
+        sys.exit(1)
     
     try:
         while True:
@@ -1,28 +1,27 @@
-import json
-import matplotlib.pyplot as plt
-import numpy as np
+"""
+Repeatability Histograms
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: Measurement histogram of every repeatability run
 
-# Load your repeatability test results
-with open('results/depth_accuracy/20260124_151205_repeatability.json', 'r') as f:
-    data = json.load(f)
+Reads the saved results (JSON files and the results store in this
+directory) instead of hardcoded numbers and renders headlessly into
+results/figures. Only runs that changed since the last render are redrawn;
+'python -m src.cli report' renders every figure at once.
 
-measurements = np.array(data['measurements_cm'])
+Usage:
+    python results/depth_accuracy/histogram_generator.py
+"""
 
-# Create histogram
-plt.figure(figsize=(10, 6))
-plt.hist(measurements, bins=50, edgecolor='black', alpha=0.7)
-plt.axvline(data['mean_cm'], color='r', linestyle='--', linewidth=2,
-            label=f"Mean: {data['mean_cm']:.2f} cm")
-plt.axvline(data['mean_cm'] - data['std_dev_cm'], color='g', linestyle=':', linewidth=1.5,
-            label=f"±1 Std Dev: {data['std_dev_cm']:.2f} cm")
-plt.axvline(data['mean_cm'] + data['std_dev_cm'], color='g', linestyle=':', linewidth=1.5)
+import sys
+from pathlib import Path
 
-plt.xlabel('Measured Depth (cm)', fontsize=12)
-plt.ylabel('Frequency', fontsize=12)
-plt.title('Depth Measurement Distribution - Repeatability Test', fontsize=14)
-plt.legend()
-plt.grid(alpha=0.3)
+# Make the repository root importable when run as a script
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+from src.accuracy_report import generate_report, print_report_summary
 
-plt.savefig('repeatability_histogram.png', dpi=150, bbox_inches='tight')
-print("Histogram saved!")
-plt.show()
\ No newline at end of file
+if __name__ == "__main__":
+    report_dir = REPO_ROOT / 'results' / 'figures'
+    summary = generate_report(Path(__file__).resolve().parent, report_dir, kinds=('repeatability',))
+    print_report_summary(summary, report_dir)
@@ -1,32 +1,27 @@
-import matplotlib.pyplot as plt
+"""
+Error vs Distance Plot
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: Error-vs-distance figure from every distance accuracy run
 
-# Your test data
-ground_truth = [50, 100, 150, 200, 250, 300]
-abs_error = [0.44, 0.81, 0.75, 2.20, 2.37, 10.65]
-rel_error = [0.89, 0.81, 0.5, 1.10, 0.95, 3.55]
+Reads the saved results (JSON files and the results store in this
+directory) instead of hardcoded numbers and renders headlessly into
+results/figures. Only runs that changed since the last render are redrawn;
+'python -m src.cli report' renders every figure at once.
 
-# Create figure with two subplots
-fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
+Usage:
+    python results/depth_accuracy/plot_generator.py
+"""
 
-# Plot 1: Absolute Error
-ax1.plot(ground_truth, abs_error, 'bo-', linewidth=2, markersize=8)
-ax1.axhline(y=2, color='r', linestyle='--', label='2% at 200cm (4cm)')
-ax1.set_xlabel('Distance (cm)', fontsize=12)
-ax1.set_ylabel('Absolute Error (cm)', fontsize=12)
-ax1.set_title('Absolute Error vs. Distance')
-ax1.grid(True, alpha=0.3)
-ax1.legend()
+import sys
+from pathlib import Path
 
-# Plot 2: Relative Error
-ax2.plot(ground_truth, rel_error, 'go-', linewidth=2, markersize=8)
-ax2.axhline(y=2, color='r', linestyle='--', label='2% Spec')
-ax2.set_xlabel('Distance (cm)', fontsize=12)
-ax2.set_ylabel('Relative Error (%)', fontsize=12)
-ax2.set_title('Relative Error vs. Distance')
-ax2.grid(True, alpha=0.3)
-ax2.legend()
+# Make the repository root importable when run as a script
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+from src.accuracy_report import generate_report, print_report_summary
 
-plt.tight_layout()
-plt.savefig('depth_accuracy_error_plot.png', dpi=150, bbox_inches='tight')
-print("Plot saved as 'depth_accuracy_error_plot.png'")
-plt.show()
\ No newline at end of file
+if __name__ == "__main__":
+    report_dir = REPO_ROOT / 'results' / 'figures'
+    summary = generate_report(Path(__file__).resolve().parent, report_dir, kinds=('distance',))
+    print_report_summary(summary, report_dir)
@@ -0,0 +1,413 @@
+"""
+Depth Accuracy Report
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: Regenerate every depth accuracy figure headlessly from the saved results
+
+Scans a results directory for runs (per-run JSON files and the results
+store), derives the statistics each figure needs and renders:
+- error_vs_distance.png: absolute and relative error of all distance runs
+- <run>_repeatability.png: measurement histogram of each repeatability run
+- <run>_spatial_uniformity.png: grid heatmap (and per-pixel map when saved)
+
+Figures are drawn with the Agg backend in a process pool. Derived
+statistics are cached in <report dir>/.cache/<hash>.npz, keyed by the hash
+of the run's files, and a figure is only rendered again when the hashes of
+the runs behind it change (or the figure is missing), so re-running after
+one new test renders one figure.
+"""
+
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from src.data.results_store import DATABASE_NAME, ResultsStore, infer_test_type
+
+
+REPORT_KINDS = ('distance', 'repeatability', 'spatial_uniformity')
+
+CACHE_DIR = '.cache'
+INDEX_NAME = 'index.json'
+
+# Per-pixel maps are block-averaged down to at most this many columns for the report
+PIXEL_MAP_WIDTH = 160
+
+HISTOGRAM_BINS = 50
+
+
+def _hash_files(paths, extra=b''):
+    """SHA-1 of some bytes followed by the contents of files."""
+    digest = hashlib.sha1(extra)
+    for path in paths:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def scan_runs(results_dir):
+    """
+    Every run in a results directory, without loading it.
+
+    JSON runs that were imported into the store are listed once (as the file).
+
+    Args:
+        results_dir: Directory with *.json results and/or results.sqlite
+
+    Returns:
+        List of dicts {'name', 'hash', 'load'} where load() returns the results dict
+    """
+    results_dir = Path(results_dir)
+    runs = []
+    json_files = sorted(results_dir.glob('*.json'))
+    for path in json_files:
+        runs.append({'name': path.stem, 'hash': _hash_files([path]), 'load': _JsonRun(path)})
+
+    if (results_dir / DATABASE_NAME).exists():
+        imported = {str(path.resolve()) for path in json_files}
+        with ResultsStore(results_dir) as store:
+            for run in store.find_runs():
+                if run['source'] in imported:
+                    continue
+                array_paths = [store.root / row['path'] for row in store.db.execute(
+                    "SELECT path FROM arrays WHERE run_id = ? ORDER BY name", (run['id'],))]
+                metadata = json.dumps(run, sort_keys=True, default=str).encode()
+                timestamp = datetime.fromisoformat(run['timestamp']).strftime("%Y%m%d_%H%M%S")
+                runs.append({'name': f"{timestamp}_run{run['id']}",
+                             'hash': _hash_files(array_paths, metadata),
+                             'load': _StoreRun(results_dir, run['id'])})
+    return runs
+
+
+class _JsonRun:
+    """Loader for a per-run JSON file (picklable, unlike a lambda)."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __call__(self):
+        with open(self.path, 'r') as f:
+            results = json.load(f)
+        if 'raw_measurements_cm' in results:
+            results['measurements_cm'] = results.pop('raw_measurements_cm')
+        arrays_file = results.get('arrays_file')
+        if arrays_file and (self.path.parent / arrays_file).exists():
+            with np.load(self.path.parent / arrays_file) as data:
+                results.update({name: data[name] for name in data.files})
+        return results
+
+
+class _StoreRun:
+    """Loader for a run in the results store."""
+
+    def __init__(self, results_dir, run_id):
+        self.results_dir = results_dir
+        self.run_id = run_id
+
+    def __call__(self):
+        with ResultsStore(self.results_dir) as store:
+            return store.load_run(self.run_id, arrays=True)
+
+
+def _block_mean(values, width):
+    """NaN-aware block average of a 2-D map down to about width columns."""
+    factor = max(1, int(np.ceil(values.shape[1] / width)))
+    height, width = values.shape[0] // factor, values.shape[1] // factor
+    blocks = values[:height * factor, :width * factor].reshape(height, factor, width, factor)
+    with np.errstate(invalid='ignore'):
+        valid = np.isfinite(blocks)
+        total = np.where(valid, blocks, 0).sum(axis=(1, 3))
+        return (total / valid.sum(axis=(1, 3))).astype(np.float32)
+
+
+def run_statistics(results):
+    """
+    Statistics a figure needs from one run.
+
+    Args:
+        results: Results dict (JSON or ResultsStore.load_run); measurement
+                 lists under 'measurements_cm'
+
+    Returns:
+        dict of scalars and arrays, or None if the run has nothing to plot
+    """
+    test_type = infer_test_type(results)
+    stats = {'test_type': test_type, 'timestamp': results.get('timestamp', '')}
+
+    if test_type == 'distance':
+        ground_truth = results['ground_truth_cm']
+        stats.update(ground_truth_cm=ground_truth,
+                     measured_cm=results['measured_depth_cm'],
+                     absolute_error_cm=results['absolute_error_cm'],
+                     relative_error_pct=results['relative_error_pct'],
+                     std_cm=results['std_dev_cm'])
+
+    elif test_type == 'repeatability':
+        measurements = results.get('measurements_cm')
+        if measurements is None or not len(measurements):
+            return None
+        counts, edges = np.histogram(np.asarray(measurements, dtype=np.float64), bins=HISTOGRAM_BINS)
+        stats.update(mean_cm=results['mean_cm'], std_cm=results['std_dev_cm'],
+                     counts=counts, edges=edges)
+
+    else:
+        if 'grid_mean_cm' in results:
+            grid = np.asarray(results['grid_mean_cm'], dtype=np.float64)
+        else:
+            cells = results['grid_data']
+            grid = np.full(tuple(results['grid_size']), np.nan)
+            for cell in cells:
+                grid[cell['row'], cell['col']] = np.nan if cell['mean_cm'] is None else cell['mean_cm']
+        stats['grid'] = grid
+        if results.get('mean_cm') is not None and np.ndim(results['mean_cm']) == 2:
+            stats['pixel_map'] = _block_mean(np.asarray(results['mean_cm'], dtype=np.float32), PIXEL_MAP_WIDTH)
+
+    return stats
+
+
+def _save_stats(path, stats):
+    np.savez(path, **{key: np.asarray(value) for key, value in stats.items()})
+
+
+def _load_stats(path):
+    with np.load(path, allow_pickle=False) as data:
+        return {key: data[key].item() if data[key].ndim == 0 else data[key] for key in data.files}
+
+
+# ---------------------------------------------------------------------------
+# Rendering (runs in worker processes)
+# ---------------------------------------------------------------------------
+
+def _pyplot():
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def render_error_vs_distance(distance_stats, path):
+    """
+    Size of the absolute and relative error against ground truth distance (all runs and the mean per distance).
+
+    Args:
+        distance_stats: List of distance run statistics
+        path: Output image path
+    """
+    plt = _pyplot()
+    ground_truth = np.array([s['ground_truth_cm'] for s in distance_stats])
+    abs_error = np.abs([s['absolute_error_cm'] for s in distance_stats])
+    rel_error = np.abs([s['relative_error_pct'] for s in distance_stats])
+    distances = np.unique(ground_truth)
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
+
+    for ax, errors, ylabel, title in ((ax1, abs_error, 'Absolute Error (cm)', 'Absolute Error vs. Distance'),
+                                      (ax2, rel_error, 'Relative Error (%)', 'Relative Error vs. Distance')):
+        means = [errors[ground_truth == d].mean() for d in distances]
+        ax.plot(ground_truth, errors, 'o', color='gray', alpha=0.5, label=f'Runs ({len(errors)})')
+        ax.plot(distances, means, 'bo-', linewidth=2, markersize=8, label='Mean')
+        ax.set_xlabel('Distance (cm)', fontsize=12)
+        ax.set_ylabel(ylabel, fontsize=12)
+        ax.set_title(title)
+        ax.grid(True, alpha=0.3)
+
+    # D435 spec: 2% of distance
+    spec_x = np.linspace(0, distances.max() * 1.05, 2)
+    ax1.plot(spec_x, spec_x * 0.02, 'r--', label='2% Spec')
+    ax2.axhline(y=2, color='r', linestyle='--', label='2% Spec')
+    ax1.legend()
+    ax2.legend()
+
+    fig.tight_layout()
+    fig.savefig(path, dpi=150, bbox_inches='tight')
+    plt.close(fig)
+
+
+def render_histogram(stats, path):
+    """
+    Measurement histogram of a repeatability run.
+
+    Args:
+        stats: Repeatability run statistics
+        path: Output image path
+    """
+    plt = _pyplot()
+    mean, std = stats['mean_cm'], stats['std_cm']
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    edges = stats['edges']
+    ax.hist(edges[:-1], bins=edges, weights=stats['counts'], edgecolor='black', alpha=0.7)
+    ax.axvline(mean, color='r', linestyle='--', linewidth=2, label=f"Mean: {mean:.2f} cm")
+    ax.axvline(mean - std, color='g', linestyle=':', linewidth=1.5, label=f"±1 Std Dev: {std:.2f} cm")
+    ax.axvline(mean + std, color='g', linestyle=':', linewidth=1.5)
+
+    ax.set_xlabel('Measured Depth (cm)', fontsize=12)
+    ax.set_ylabel('Frequency', fontsize=12)
+    ax.set_title(f"Depth Measurement Distribution - Repeatability Test ({stats['timestamp'][:10]})", fontsize=14)
+    ax.legend()
+    ax.grid(alpha=0.3)
+
+    fig.savefig(path, dpi=150, bbox_inches='tight')
+    plt.close(fig)
+
+
+def _position_ticks(count, labels):
+    """Tick labels for first, center and last cells ('' elsewhere)."""
+    ticks = [''] * count
+    ticks[0], ticks[count // 2], ticks[-1] = labels
+    return ticks
+
+
+def render_heatmap(stats, path):
+    """
+    Spatial uniformity heatmap of a grid (plus the per-pixel map, if any).
+
+    Args:
+        stats: Uniformity run statistics
+        path: Output image path
+    """
+    plt = _pyplot()
+    grid = stats['grid']
+    rows, cols = grid.shape
+    pixel_map = stats.get('pixel_map')
+
+    if pixel_map is None:
+        fig, ax = plt.subplots(figsize=(10, 8))
+    else:
+        fig, (ax, map_ax) = plt.subplots(1, 2, figsize=(18, 7))
+    im = ax.imshow(grid, cmap='RdYlGn_r', aspect='auto')
+
+    cbar = fig.colorbar(im, ax=ax)
+    cbar.set_label('Depth (cm)', rotation=270, labelpad=20, fontsize=12)
+
+    for i in range(rows):
+        for j in range(cols):
+            if np.isfinite(grid[i, j]):
+                ax.text(j, i, f'{grid[i, j]:.1f}', ha="center", va="center", color="black", fontsize=10)
+
+    ax.set_xticks(np.arange(cols))
+    ax.set_yticks(np.arange(rows))
+    ax.set_xticklabels(_position_ticks(cols, ('Left', 'Center', 'Right')))
+    ax.set_yticklabels(_position_ticks(rows, ('Top', 'Center', 'Bottom')))
+    ax.set_xlabel('Horizontal Position', fontsize=12)
+    ax.set_ylabel('Vertical Position', fontsize=12)
+    center = grid[rows // 2, cols // 2]
+    ax.set_title(f"Spatial Uniformity - {rows}x{cols} Depth Map (center {center:.0f} cm)", fontsize=14)
+
+    if pixel_map is not None:
+        im = map_ax.imshow(pixel_map, cmap='RdYlGn_r', vmin=np.nanmin(grid), vmax=np.nanmax(grid))
+        fig.colorbar(im, ax=map_ax).set_label('Depth (cm)', rotation=270, labelpad=20, fontsize=12)
+        map_ax.set_title('Per-Pixel Mean Depth', fontsize=14)
+        map_ax.axis('off')
+
+    fig.tight_layout()
+    fig.savefig(path, dpi=150, bbox_inches='tight')
+    plt.close(fig)
+
+
+_RENDERERS = {
+    'distance': render_error_vs_distance,
+    'repeatability': render_histogram,
+    'spatial_uniformity': render_heatmap,
+}
+
+
+def _render(task):
+    """Pool entry point: (kind, stats, path) -> path."""
+    kind, stats, path = task
+    _RENDERERS[kind](stats, path)
+    return path
+
+
+# ---------------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------------
+
+def generate_report(results_dir="results/depth_accuracy", report_dir="results/figures",
+                    kinds=REPORT_KINDS, workers=None, force=False):
+    """
+    Render every figure whose runs changed since the last report.
+
+    Args:
+        results_dir: Directory with the accuracy results
+        report_dir: Directory for the figures (and the statistics cache)
+        kinds: Figure kinds to render (subset of REPORT_KINDS)
+        workers: Render processes (None = one per CPU, 1 = render inline)
+        force: Render every figure even if it is up to date
+
+    Returns:
+        dict {'runs', 'computed', 'rendered', 'up_to_date', 'figures'}
+    """
+    report_dir = Path(report_dir)
+    cache_dir = report_dir / CACHE_DIR
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    index_path = cache_dir / INDEX_NAME
+    index = json.loads(index_path.read_text()) if index_path.exists() else {}
+
+    runs = scan_runs(results_dir)
+    computed = 0
+    distance_runs = []
+    tasks, keys = [], {}
+
+    for run in runs:
+        stats_path = cache_dir / f"{run['hash']}.npz"
+        if stats_path.exists():
+            stats = _load_stats(stats_path)
+        else:
+            stats = run_statistics(run['load']())
+            # An empty marker for runs with nothing to plot, so they are not reloaded
+            _save_stats(stats_path, stats or {})
+            computed += 1
+        if not stats or stats['test_type'] not in kinds:
+            continue
+
+        if stats['test_type'] == 'distance':
+            distance_runs.append((run['hash'], stats))
+            continue
+
+        name = run['name']
+        if not name.endswith(stats['test_type']):
+            name = f"{name}_{stats['test_type']}"
+        figure = f"{name}.png"
+        keys[figure] = run['hash']
+        tasks.append((stats['test_type'], stats, figure))
+
+    if distance_runs:
+        figure = 'error_vs_distance.png'
+        keys[figure] = hashlib.sha1(''.join(h for h, _ in distance_runs).encode()).hexdigest()
+        tasks.append(('distance', [stats for _, stats in distance_runs], figure))
+
+    # Only figures whose runs changed (or that are missing) are rendered
+    tasks = [(kind, stats, str(report_dir / figure)) for kind, stats, figure in tasks
+             if force or index.get(figure) != keys[figure] or not (report_dir / figure).exists()]
+
+    if workers == 1 or len(tasks) <= 1:
+        rendered = [_render(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rendered = list(pool.map(_render, tasks))
+
+    # Keep index entries for kinds not rendered this time
+    index.update(keys)
+    index_path.write_text(json.dumps(index, indent=2))
+
+    # Drop statistics of runs that no longer exist
+    current = {f"{run['hash']}.npz" for run in runs}
+    for path in cache_dir.glob('*.npz'):
+        if path.name not in current:
+            path.unlink()
+
+    return {'runs': len(runs), 'computed': computed, 'rendered': rendered,
+            'up_to_date': len(keys) - len(rendered), 'figures': sorted(keys)}
+
+
+def print_report_summary(summary, report_dir):
+    """Print what generate_report() did."""
+    print(f"\n{summary['runs']} runs, {summary['computed']} new or changed")
+    print(f"✓ Rendered {len(summary['rendered'])} figures, {summary['up_to_date']} up to date, in {report_dir}")
+    for path in summary['rendered']:
+        print(f"  {Path(path).name}")
@@ -0,0 +1,338 @@
+"""
+Overhead Perception System Command Line
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: One entry point for the processing, calibration and accuracy tools
+
+Each subcommand imports the modules it needs only when it runs, so e.g.
+'intrinsics' never loads Open3D and 'filters' never loads matplotlib.
+
+Usage:
+    python -m src.cli filters [--duration 10]
+    python -m src.cli pointcloud [--view] [--max-distance 3.0]
+    python -m src.cli intrinsics
+    python -m src.cli coords
+    python -m src.cli workspace
+    python -m src.cli calibrate [--height 2.21 --pitch 3 --roll 0 --yaw 0]
+    python -m src.cli accuracy [--test distance --distance 150]
+    python -m src.cli results import results/depth_accuracy
+    python -m src.cli results summary [--test distance --since 2026-01-24]
+    python -m src.cli report [--workers 4 --force]
+
+Common options (before the subcommand):
+    --source SPEC            'synthetic' or a recording path (default: live camera)
+    --profile                Save per-stage timings on exit
+    --roi L T R B            Only process this rectangle (fractions, e.g. 0.1 0.1 0.9 0.9)
+    --startup-report PATH    Stop after the first frame and write startup timings as JSON
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+_START = time.perf_counter()
+
+# Make the repository root importable when run as a script
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+
+class StartupTimer:
+    """Splits startup into import, open (camera start + warm-up) and first frame."""
+
+    def __init__(self):
+        self.marks = {}
+        self._last = _START
+
+    def mark(self, name):
+        """
+        Record the time since the previous mark.
+
+        Args:
+            name: Phase name
+        """
+        now = time.perf_counter()
+        self.marks[f"{name}_ms"] = (now - self._last) * 1000
+        self._last = now
+
+    def report(self, command):
+        """Startup timings as a dict (total is measured from CLI module load)."""
+        return {'command': command, **self.marks, 'total_ms': (self._last - _START) * 1000}
+
+
+# ---------------------------------------------------------------------------
+# Openers: import what the command needs, start the source, and return
+# (app, read_first_frame, close)
+# ---------------------------------------------------------------------------
+
+def _open_processor(args, timer):
+    from src.data.frame_source import open_frame_source
+    from src.week3_data_processing_FINAL import RealSenseDataProcessor
+    timer.mark('import')
+
+    roi = None
+    if args.roi:
+        from src.utils.roi import ProcessingROI
+        roi = ProcessingROI.rectangle(*args.roi)
+
+    processor = RealSenseDataProcessor(source=open_frame_source(args.source), profile=args.profile, roi=roi)
+    return processor, lambda: processor.get_frames(aligned=True, apply_filters=True), processor.shutdown
+
+
+def _open_calibration(args, timer):
+    sys.path.insert(0, str(REPO_ROOT / 'xy_transform'))
+    from src.data.frame_source import open_frame_source
+    from calibration_click_tool import CalibrationClickTool
+    timer.mark('import')
+
+    tool = CalibrationClickTool(camera_height_m=args.height, pitch_deg=args.pitch,
+                                roll_deg=args.roll, yaw_deg=args.yaw,
+                                source=open_frame_source(args.source, 848, 480, 30))
+    # run() stops the source itself
+    return tool, lambda: tool.source.read(aligned=True), lambda: tool.source.stop()
+
+
+def _open_accuracy(args, timer):
+    sys.path.insert(0, str(REPO_ROOT / 'camera_accuracy'))
+    from src.data.frame_source import open_frame_source
+    from depth_accuracy_test_v2 import DepthAccuracyTester
+    timer.mark('import')
+
+    tester = DepthAccuracyTester(source=open_frame_source(args.source, 640, 480, 30))
+    return tester, tester._get_depth_image, tester.shutdown
+
+
+def _open_results(args, timer):
+    from src.data.results_store import ResultsStore
+    timer.mark('import')
+
+    # No camera: there is no first frame to read
+    store = ResultsStore(args.dir)
+    return store, lambda: None, store.close
+
+
+def _open_report(args, timer):
+    from src.accuracy_report import generate_report
+    timer.mark('import')
+
+    # Nothing to open: matplotlib is only imported by the render workers
+    return generate_report, lambda: None, lambda: None
+
+
+# ---------------------------------------------------------------------------
+# Runners
+# ---------------------------------------------------------------------------
+
+def _run_filters(processor, args):
+    processor.compare_filtering_methods(duration_sec=args.duration)
+
+
+def _run_pointcloud(processor, args):
+    frames = processor.get_frames(aligned=True, apply_filters=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    save_path = processor.output_dir / f"pointcloud_{timestamp}.{args.format}"
+
+    try:
+        pcd = processor.generate_point_cloud(frames['depth'], frames['color'], save_path=save_path,
+                                             max_distance_m=args.max_distance)
+    except ValueError as e:
+        print(f"\n⚠ {e}")
+        return
+
+    print(f"\n✓ Generated point cloud with {len(pcd.points)} points")
+    if args.view:
+        processor.visualize_point_cloud(pcd)
+
+
+def _run_intrinsics(processor, args):
+    processor.get_frames()
+    processor.get_camera_intrinsics_info()
+
+
+def _run_coords(processor, args):
+    processor.demonstrate_coordinate_transform()
+
+
+def _run_workspace(processor, args):
+    processor.measure_workspace_guide()
+
+
+def _run_calibration(tool, args):
+    from calibration_click_tool import collect_ground_truth
+
+    tool.run()
+    collect_ground_truth(tool)
+    print("\nCalibration session complete!")
+
+
+def _run_accuracy(tester, args):
+    from depth_accuracy_test_v2 import run_test_menu
+
+    if args.test == 'distance':
+        if args.distance is None:
+            print("--distance is required for the distance test")
+            return
+        tester.test_distance_accuracy(args.distance, num_frames=args.frames)
+    elif args.test == 'uniformity':
+        tester.test_spatial_uniformity(num_frames=args.frames, grid_size=tuple(args.grid),
+                                       pixel_maps=args.pixel_maps)
+    elif args.test == 'repeatability':
+        tester.test_repeatability(num_frames=args.frames)
+    else:
+        run_test_menu(tester)
+
+
+def _run_results(store, args):
+    if args.action == 'import':
+        run_ids = store.import_json(args.paths or [args.dir], resolution=tuple(args.resolution or (640, 480)))
+        print(f"✓ Imported {len(run_ids)} runs into {store.root / 'results.sqlite'}")
+        return
+
+    filters = {'test_type': args.test, 'distance_cm': args.distance, 'since': args.since,
+               'until': args.until, 'resolution': tuple(args.resolution) if args.resolution else None}
+
+    if args.action == 'list':
+        runs = store.find_runs(**filters, metrics=('measured_depth_cm', 'mean_cm', 'std_dev_cm'))
+        for run in runs:
+            distance = f"{run['ground_truth_cm']:6.1f} cm" if run['ground_truth_cm'] is not None else " " * 9
+            mean = run.get('measured_depth_cm', run.get('mean_cm'))
+            measured = f"{mean:8.2f} ± {run['std_dev_cm']:.2f} cm" if mean is not None else ""
+            print(f"{run['id']:5d}  {run['timestamp'][:19]}  {run['test_type']:<19}{distance}  "
+                  f"{run['resolution'][0]}x{run['resolution'][1]}  {measured}")
+        print(f"{len(runs)} runs")
+    else:
+        print(f"\n{'Distance':>10}{'Runs':>6}{'Mean err':>10}{'RMS err':>10}{'Min err':>10}{'Max err':>10}  (cm)")
+        print("-" * 56)
+        for group in store.summarize('absolute_error_cm', **filters):
+            print(f"{group['ground_truth_cm']:>10.1f}{group['runs']:>6}{group['mean']:>10.2f}"
+                  f"{group['rms']:>10.2f}{group['min']:>10.2f}{group['max']:>10.2f}")
+
+
+def _run_report(generate_report, args):
+    from src.accuracy_report import print_report_summary
+
+    summary = generate_report(args.dir, args.output, kinds=args.kinds, workers=args.workers, force=args.force)
+    print_report_summary(summary, args.output)
+
+
+# name -> (help, opener, runner)
+COMMANDS = {
+    'filters': ("Compare raw vs filtered depth", _open_processor, _run_filters),
+    'pointcloud': ("Capture and save a colored point cloud", _open_processor, _run_pointcloud),
+    'intrinsics': ("Display camera intrinsics", _open_processor, _run_intrinsics),
+    'coords': ("Interactive pixel -> 3D coordinate demo", _open_processor, _run_coords),
+    'workspace': ("Workspace measurement guide", _open_processor, _run_workspace),
+    'calibrate': ("Click tool for checking world-frame calibration", _open_calibration, _run_calibration),
+    'accuracy': ("Depth accuracy tests", _open_accuracy, _run_accuracy),
+    'results': ("Import, list and summarize accuracy results", _open_results, _run_results),
+    'report': ("Render accuracy figures from the saved results (headless)", _open_report, _run_report),
+}
+
+
+def build_parser():
+    """
+    Build the argument parser.
+
+    Returns:
+        argparse.ArgumentParser
+    """
+    parser = argparse.ArgumentParser(prog="python -m src.cli",
+                                     description="Overhead Perception System tools")
+    parser.add_argument('--source', default=None,
+                        help="'synthetic' or a recording path (default: live camera)")
+    parser.add_argument('--profile', action='store_true', help="Save per-stage timings on exit")
+    parser.add_argument('--roi', type=float, nargs=4, default=None, metavar=('LEFT', 'TOP', 'RIGHT', 'BOTTOM'),
+                        help="Only process this rectangle, as fractions of the image (processing commands)")
+    parser.add_argument('--startup-report', default=None, metavar='PATH',
+                        help="Stop after the first frame and write startup timings as JSON")
+
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    commands = {name: subparsers.add_parser(name, help=help_text)
+                for name, (help_text, _, _) in COMMANDS.items()}
+
+    commands['filters'].add_argument('--duration', type=float, default=10, help="Seconds to display")
+
+    commands['pointcloud'].add_argument('--view', action='store_true', help="Open the Open3D viewer")
+    commands['pointcloud'].add_argument('--max-distance', type=float, default=None,
+                                        help="Drop points farther than this (meters)")
+    commands['pointcloud'].add_argument('--format', choices=('ply', 'pcd'), default='ply')
+
+    commands['calibrate'].add_argument('--height', type=float, default=2.21, help="Camera height (meters)")
+    commands['calibrate'].add_argument('--pitch', type=float, default=3.0, help="Pitch (degrees)")
+    commands['calibrate'].add_argument('--roll', type=float, default=0.0, help="Roll (degrees)")
+    commands['calibrate'].add_argument('--yaw', type=float, default=0.0, help="Yaw (degrees)")
+
+    commands['accuracy'].add_argument('--test', choices=('menu', 'distance', 'uniformity', 'repeatability'),
+                                      default='menu')
+    commands['accuracy'].add_argument('--distance', type=float, default=None,
+                                      help="Ground truth distance (cm) for the distance test")
+    commands['accuracy'].add_argument('--frames', type=int, default=100, help="Frames per test")
+    commands['accuracy'].add_argument('--grid', type=int, nargs=2, default=[5, 5], metavar=('ROWS', 'COLS'),
+                                      help="Uniformity test grid size")
+    commands['accuracy'].add_argument('--pixel-maps', action='store_true',
+                                      help="Also save per-pixel uniformity maps")
+
+    commands['results'].add_argument('action', choices=('import', 'list', 'summary'))
+    commands['results'].add_argument('paths', nargs='*', help="JSON files or directories to import (default: --dir)")
+    commands['results'].add_argument('--dir', default='results/depth_accuracy', help="Results directory")
+    commands['results'].add_argument('--test', choices=('distance', 'spatial_uniformity', 'repeatability'),
+                                     default=None)
+    commands['results'].add_argument('--distance', type=float, default=None, help="Ground truth distance (cm)")
+    commands['results'].add_argument('--since', default=None, help="Earliest date/time (ISO, e.g. 2026-01-24)")
+    commands['results'].add_argument('--until', default=None, help="Latest date/time, exclusive (ISO)")
+    commands['results'].add_argument('--resolution', type=int, nargs=2, default=None, metavar=('WIDTH', 'HEIGHT'))
+
+    commands['report'].add_argument('--dir', default='results/depth_accuracy', help="Results directory")
+    commands['report'].add_argument('--output', default='results/figures', help="Figure directory")
+    commands['report'].add_argument('--kinds', nargs='+', choices=('distance', 'repeatability', 'spatial_uniformity'),
+                                    default=('distance', 'repeatability', 'spatial_uniformity'))
+    commands['report'].add_argument('--workers', type=int, default=None, help="Render processes (default: CPUs)")
+    commands['report'].add_argument('--force', action='store_true', help="Render every figure again")
+
+    return parser
+
+
+def main(argv=None):
+    """
+    Run one subcommand.
+
+    Args:
+        argv: Arguments (default: sys.argv[1:])
+    """
+    args = build_parser().parse_args(argv)
+    _, opener, runner = COMMANDS[args.command]
+    timer = StartupTimer()
+
+    try:
+        app, read_first_frame, close = opener(args, timer)
+    except RuntimeError as e:
+        print(e)
+        sys.exit(1)
+    timer.mark('open')
+
+    try:
+        if args.startup_report:
+            read_first_frame()
+            timer.mark('first_frame')
+
+            report = timer.report(args.command)
+            report['modules_loaded'] = sorted(name for name in ('cv2', 'open3d', 'matplotlib', 'pyrealsense2')
+                                              if name in sys.modules)
+            with open(args.startup_report, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"Startup timings saved to: {args.startup_report}")
+        else:
+            runner(app, args)
+
+    except KeyboardInterrupt:
+        print("\n\nInterrupted by user.")
+
+    finally:
+        close()
+
+
+if __name__ == "__main__":
+    main()
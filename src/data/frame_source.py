@@ -0,0 +1,588 @@
+"""
+Frame Sources
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: Pluggable camera input so every pipeline can run with or without a D435i
+
+All sources return the same frame dict from read():
+    color_image:      HxWx3 uint8 BGR image
+    depth_image:      HxW uint16 depth (depth units, see depth_scale)
+    depth_frame:      rs.depth_frame (None for non-SDK sources)
+    color_frame:      rs.video_frame (None for non-SDK sources)
+    depth_intrinsics: rs.intrinsics matching depth_image
+    color_intrinsics: rs.intrinsics matching color_image
+    frame_number:     Camera frame counter
+    timestamp:        Capture time in milliseconds
+
+Sources:
+- RealSenseFrameSource: Live camera through rs.pipeline
+- ReplayFrameSource:    Recorded .bag file (real-time or as fast as possible)
+- RecordingFrameSource: Raw .opsrec recording made with src.data.recorder
+- SyntheticFrameSource: Generated overhead scene (floor plus moving boxes)
+"""
+
+import time
+from collections import deque
+
+import pyrealsense2 as rs
+import numpy as np
+
+from src.utils.intrinsics import default_intrinsics
+from src.utils.profiling import get_profiler
+from src.data.recorder import DepthRecording, RECORDING_SUFFIX
+
+
+# Adaptive warm-up: the sensor has settled once, over the last WARMUP_WINDOW
+# frames, auto-exposure changed by at most WARMUP_EXPOSURE_TOLERANCE (relative)
+# and the valid depth fraction by at most WARMUP_FILL_TOLERANCE (absolute)
+WARMUP_WINDOW = 10
+WARMUP_EXPOSURE_TOLERANCE = 0.05
+WARMUP_FILL_TOLERANCE = 0.01
+
+
+class FrameSource:
+    """
+    Base class for frame sources.
+
+    Subclasses implement start(), _read() and stop(). Attributes
+    depth_scale, depth_intrinsics and color_intrinsics are valid after start().
+    """
+
+    # Live sources need their sensors to settle; offline sources do not
+    is_live = False
+
+    def __init__(self, width=1280, height=720, fps=30):
+        """
+        Initialize the source.
+
+        Args:
+            width: Frame width
+            height: Frame height
+            fps: Frames per second
+        """
+        self.width = width
+        self.height = height
+        self.fps = fps
+
+        self.depth_scale = None
+        self.depth_intrinsics = None   # Native depth stream intrinsics
+        self.color_intrinsics = None   # Color stream intrinsics (= aligned depth intrinsics)
+
+        self.frames_read = 0
+        self.finished = False
+        self.started = False
+
+        # Result of the last warmup() call
+        self.warmup_stats = None
+
+    def start(self):
+        """Start producing frames."""
+        self.started = True
+
+    def read(self, aligned=True):
+        """
+        Get the next frame.
+
+        Args:
+            aligned: If True, depth is aligned to color
+
+        Returns:
+            Frame dict (see module docstring) or None if no frame is available
+        """
+        if not self.started:
+            self.start()
+
+        with get_profiler().stage('read'):
+            frame = self._read(aligned)
+        if frame is not None:
+            self.frames_read += 1
+        return frame
+
+    def _read(self, aligned):
+        raise NotImplementedError
+
+    def warmup(self, max_frames, adaptive=True):
+        """
+        Discard frames while the sensor settles (no-op for offline sources).
+
+        Adaptive warm-up stops as soon as auto-exposure and the fraction of
+        valid depth pixels are stable over a sliding window of frames.
+
+        Args:
+            max_frames: Upper bound on frames to discard
+            adaptive: If False, always discard max_frames frames
+
+        Returns:
+            dict with frames (discarded), seconds and settled (True if
+            stability was detected before max_frames)
+        """
+        if not self.is_live:
+            self.warmup_stats = {'frames': 0, 'seconds': 0.0, 'settled': True}
+            return self.warmup_stats
+
+        start = time.perf_counter()
+        history = deque(maxlen=WARMUP_WINDOW)
+        frames = 0
+        settled = False
+
+        while frames < max_frames:
+            frame = self._read(aligned=False)
+            frames += 1
+            if not adaptive or frame is None:
+                continue
+
+            history.append(self._settle_signals(frame))
+            if len(history) == WARMUP_WINDOW and _signals_settled(history):
+                settled = True
+                break
+
+        self.warmup_stats = {'frames': frames, 'seconds': time.perf_counter() - start, 'settled': settled}
+        status = "settled" if settled else "stopped at limit"
+        print(f"Warm-up {status} after {frames} frames ({self.warmup_stats['seconds']:.2f} s)")
+        return self.warmup_stats
+
+    def _settle_signals(self, frame):
+        """
+        Values that change while the sensor is still settling.
+
+        Args:
+            frame: Frame dict from _read()
+
+        Returns:
+            dict of signal name -> value (None if not available)
+        """
+        # Every 4th pixel is plenty for a fill rate
+        depth = frame['depth_image'][::4, ::4]
+        return {'fill': np.count_nonzero(depth) / depth.size}
+
+    def stop(self):
+        """Stop producing frames."""
+        self.started = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+def _signals_settled(history):
+    """
+    Check whether warm-up signals stopped changing over a window of frames.
+
+    Args:
+        history: Sequence of _settle_signals() dicts
+
+    Returns:
+        bool
+    """
+    fills = [signals['fill'] for signals in history]
+    # An empty depth image is not a settled one
+    if min(fills) == 0 or max(fills) - min(fills) > WARMUP_FILL_TOLERANCE:
+        return False
+
+    for name in history[0]:
+        if name == 'fill':
+            continue
+        values = [signals[name] for signals in history if signals[name] is not None]
+        if values and max(values) - min(values) > WARMUP_EXPOSURE_TOLERANCE * max(values):
+            return False
+    return True
+
+
+class RealSenseFrameSource(FrameSource):
+    """
+    Live RealSense camera.
+    """
+
+    is_live = True
+
+    def __init__(self, width=1280, height=720, fps=30):
+        super().__init__(width, height, fps)
+
+        self.pipeline = rs.pipeline()
+        self.config = rs.config()
+
+        # Configure color and depth streams
+        self.config.enable_stream(rs.stream.depth, width, height, rs.format.z16, fps)
+        self.config.enable_stream(rs.stream.color, width, height, rs.format.bgr8, fps)
+
+        self.profile = None
+        self.depth_sensor = None
+
+        # Create alignment object (align depth to color)
+        self.align = rs.align(rs.stream.color)
+
+    def start(self):
+        """
+        Start the camera pipeline.
+
+        Raises:
+            RuntimeError: If no camera is connected or the pipeline cannot start
+        """
+        if self.started:
+            return
+
+        print(f"Starting RealSense camera ({self.width}x{self.height} @ {self.fps}fps)...")
+        try:
+            self.profile = self.pipeline.start(self.config)
+        except RuntimeError as e:
+            if "No device connected" in str(e):
+                raise RuntimeError("Camera not found. Check if camera is connected and try again.") from e
+            raise RuntimeError(f"Camera runtime error: {e}") from e
+
+        self._read_stream_info()
+        super().start()
+
+    def _read_stream_info(self):
+        """Read depth scale and stream intrinsics from the active profile."""
+        self.depth_sensor = self.profile.get_device().first_depth_sensor()
+        self.depth_scale = self.depth_sensor.get_depth_scale()
+
+        depth_stream = self.profile.get_stream(rs.stream.depth)
+        color_stream = self.profile.get_stream(rs.stream.color)
+        self.depth_intrinsics = depth_stream.as_video_stream_profile().get_intrinsics()
+        self.color_intrinsics = color_stream.as_video_stream_profile().get_intrinsics()
+
+    def _wait_for_frames(self):
+        return self.pipeline.wait_for_frames()
+
+    def _settle_signals(self, frame):
+        signals = super()._settle_signals(frame)
+
+        # Auto-exposure from frame metadata (not every backend reports it)
+        for name in ('depth_frame', 'color_frame'):
+            sdk_frame = frame[name]
+            exposure = None
+            if sdk_frame.supports_frame_metadata(rs.frame_metadata_value.actual_exposure):
+                exposure = sdk_frame.get_frame_metadata(rs.frame_metadata_value.actual_exposure)
+            signals[name.replace('_frame', '_exposure')] = exposure
+        return signals
+
+    def _read(self, aligned):
+        profiler = get_profiler()
+
+        with profiler.stage('wait_for_frames'):
+            frames = self._wait_for_frames()
+        if frames is None:
+            return None
+
+        # Align depth to color
+        if aligned:
+            with profiler.stage('align'):
+                frames = self.align.process(frames)
+
+        depth_frame = frames.get_depth_frame()
+        color_frame = frames.get_color_frame()
+
+        if not depth_frame or not color_frame:
+            return None
+
+        with profiler.stage('asanyarray'):
+            color_image = np.asanyarray(color_frame.get_data())
+            depth_image = np.asanyarray(depth_frame.get_data())
+
+        return {
+            'color_image': color_image,
+            'depth_image': depth_image,
+            'depth_frame': depth_frame,
+            'color_frame': color_frame,
+            'depth_intrinsics': self.color_intrinsics if aligned else self.depth_intrinsics,
+            'color_intrinsics': self.color_intrinsics,
+            'frame_number': depth_frame.get_frame_number(),
+            'timestamp': depth_frame.get_timestamp(),
+        }
+
+    def stop(self):
+        """Stop the camera pipeline."""
+        if self.started:
+            self.pipeline.stop()
+        super().stop()
+
+
+class ReplayFrameSource(RealSenseFrameSource):
+    """
+    Replay a recording made with the RealSense SDK (.bag).
+
+    Frames come back as real SDK frames, so filters, alignment and point
+    clouds work exactly as with the live camera.
+    """
+
+    is_live = False
+
+    def __init__(self, path, real_time=True, loop=False):
+        """
+        Initialize the replay source.
+
+        Args:
+            path: Path to the recording
+            real_time: If True, pace frames at the recorded rate.
+                       If False, deliver frames as fast as they can be processed
+            loop: If True, restart from the beginning at end of file
+        """
+        # Stream size and rate come from the file, not the config
+        super().__init__()
+        self.path = str(path)
+        self.real_time = real_time
+        self.loop = loop
+
+        self.config = rs.config()
+        rs.config.enable_device_from_file(self.config, self.path, repeat_playback=loop)
+        self.playback = None
+
+    def start(self):
+        """
+        Open the recording.
+
+        Raises:
+            RuntimeError: If the file cannot be opened
+        """
+        if self.started:
+            return
+
+        print(f"Replaying {self.path} ({'real-time' if self.real_time else 'as fast as possible'})...")
+        try:
+            self.profile = self.pipeline.start(self.config)
+        except RuntimeError as e:
+            raise RuntimeError(f"Could not open recording {self.path}: {e}") from e
+
+        self.playback = self.profile.get_device().as_playback()
+        self.playback.set_real_time(self.real_time)
+
+        self._read_stream_info()
+        color_intrinsics = self.color_intrinsics
+        self.width, self.height = color_intrinsics.width, color_intrinsics.height
+        self.fps = self.profile.get_stream(rs.stream.color).fps()
+        FrameSource.start(self)
+
+    def _wait_for_frames(self):
+        # End of a non-looping file shows up as a wait timeout
+        success, frames = self.pipeline.try_wait_for_frames(1000)
+        if not success:
+            self.finished = True
+            return None
+        return frames
+
+
+class RecordingFrameSource(FrameSource):
+    """
+    Replay a raw depth + color recording (.opsrec) made with DepthRecorder.
+
+    Depth values are exactly what the camera produced. No SDK frames are
+    available, so depth_frame and color_frame are None.
+    """
+
+    def __init__(self, path, real_time=True, loop=False):
+        """
+        Initialize the replay source.
+
+        Args:
+            path: Path to the .opsrec recording
+            real_time: If True, pace frames by their recorded timestamps.
+                       If False, deliver frames as fast as they can be processed
+            loop: If True, restart from the beginning at end of file
+        """
+        super().__init__()
+        self.path = str(path)
+        self.real_time = real_time
+        self.loop = loop
+
+        self.recording = None
+        self._position = 0
+        self._playback_start = None
+
+    def start(self):
+        """
+        Open the recording.
+
+        Raises:
+            RuntimeError: If the file cannot be opened
+        """
+        if self.started:
+            return
+
+        print(f"Replaying {self.path} ({'real-time' if self.real_time else 'as fast as possible'})...")
+        try:
+            self.recording = DepthRecording(self.path)
+        except (OSError, ValueError) as e:
+            raise RuntimeError(f"Could not open recording {self.path}: {e}") from e
+
+        if not self.recording.complete:
+            print(f"Warning: recording was not closed cleanly, {len(self.recording)} frames recovered")
+
+        self.width = self.recording.width
+        self.height = self.recording.height
+        self.fps = self.recording.fps
+        self.depth_scale = self.recording.depth_scale
+        self.depth_intrinsics = self.recording.depth_intrinsics
+        self.color_intrinsics = self.recording.color_intrinsics
+        super().start()
+
+    def _read(self, aligned):
+        if self._position >= len(self.recording):
+            if not self.loop or len(self.recording) == 0:
+                self.finished = True
+                return None
+            self._position = 0
+            self._playback_start = None
+
+        frame = self.recording.read_frame(self._position)
+        self._position += 1
+
+        # Real-time pacing from the recorded timestamps
+        if self.real_time:
+            now = time.perf_counter()
+            if self._playback_start is None:
+                self._playback_start = now - frame['timestamp'] / 1000.0
+            delay = self._playback_start + frame['timestamp'] / 1000.0 - now
+            if delay > 0:
+                time.sleep(delay)
+
+        # Depth is returned as recorded; alignment cannot be changed after the fact
+        frame['depth_frame'] = None
+        frame['color_frame'] = None
+        frame['depth_intrinsics'] = self.depth_intrinsics
+        frame['color_intrinsics'] = self.color_intrinsics
+        return frame
+
+    def stop(self):
+        """Close the recording."""
+        if self.recording is not None:
+            self.recording.close()
+            self.recording = None
+        super().stop()
+
+
+class SyntheticFrameSource(FrameSource):
+    """
+    Synthetic overhead scene: flat floor seen from above with boxes moving across it.
+
+    Depth includes sensor-like noise and dropouts so downstream code sees
+    realistic data. The same seed always produces the same sequence.
+    """
+
+    def __init__(self, width=1280, height=720, fps=30, camera_height_m=2.2, num_objects=4,
+                 noise_pct=0.2, dropout_pct=1.0, real_time=False, num_frames=None, seed=0):
+        """
+        Initialize the synthetic scene.
+
+        Args:
+            width, height: Frame size in pixels
+            fps: Frame rate used for timestamps and real-time pacing
+            camera_height_m: Distance from camera to floor (meters)
+            num_objects: Number of moving boxes
+            noise_pct: Depth noise standard deviation (% of distance)
+            dropout_pct: Percentage of depth pixels set to zero (invalid)
+            real_time: If True, pace frames at fps. If False, as fast as possible
+            num_frames: Stop after this many frames (None = endless)
+            seed: Random seed
+        """
+        super().__init__(width, height, fps)
+        self.camera_height_m = camera_height_m
+        self.num_objects = num_objects
+        self.noise_pct = noise_pct
+        self.dropout_pct = dropout_pct
+        self.real_time = real_time
+        self.num_frames = num_frames
+
+        self.rng = np.random.default_rng(seed)
+        self.depth_scale = 0.001  # 1 mm per unit, same as the D435
+        self.color_intrinsics = default_intrinsics(width, height)
+        self.depth_intrinsics = self.color_intrinsics
+
+        # Boxes: pixel position, velocity, size, height above floor, color
+        self.obj_pos = self.rng.uniform([0, 0], [width, height], size=(num_objects, 2))
+        self.obj_vel = self.rng.uniform(-4, 4, size=(num_objects, 2)) * (width / 640)
+        self.obj_size = self.rng.uniform(0.04, 0.10, size=(num_objects, 1)) * width
+        self.obj_height_m = self.rng.uniform(0.05, 0.40, size=num_objects)
+        self.obj_color = self.rng.integers(40, 255, size=(num_objects, 3))
+
+        # Static background
+        self.floor_units = int(round(camera_height_m / self.depth_scale))
+        self.floor_color = np.full((height, width, 3), 90, dtype=np.uint8)
+        grid_step = max(width // 16, 1)
+        self.floor_color[:, ::grid_step] = 140
+        self.floor_color[::grid_step, :] = 140
+
+        # Pre-generated noisy floors (noise + dropouts) so frames are cheap to produce
+        self.floor_bank = []
+        for _ in range(8):
+            floor = np.full((height, width), self.floor_units, dtype=np.float32)
+            if noise_pct > 0:
+                floor += self.rng.standard_normal((height, width), dtype=np.float32) * (
+                    self.floor_units * noise_pct / 100)
+            if dropout_pct > 0:
+                floor[self.rng.random((height, width), dtype=np.float32) < dropout_pct / 100] = 0
+            self.floor_bank.append(np.clip(floor, 0, 65535).astype(np.uint16))
+
+        self._next_frame_time = None
+
+    def _read(self, aligned):
+        if self.num_frames is not None and self.frames_read >= self.num_frames:
+            self.finished = True
+            return None
+
+        # Real-time pacing
+        if self.real_time:
+            now = time.perf_counter()
+            if self._next_frame_time is None:
+                self._next_frame_time = now
+            if self._next_frame_time > now:
+                time.sleep(self._next_frame_time - now)
+            self._next_frame_time += 1.0 / self.fps
+
+        depth_image = self.floor_bank[self.frames_read % len(self.floor_bank)].copy()
+        color_image = self.floor_color.copy()
+
+        # Move and bounce boxes
+        self.obj_pos += self.obj_vel
+        limits = np.array([self.width, self.height])
+        bounced = (self.obj_pos < 0) | (self.obj_pos > limits)
+        self.obj_vel[bounced] *= -1
+        self.obj_pos = np.clip(self.obj_pos, 0, limits)
+
+        for i in range(self.num_objects):
+            half = self.obj_size[i, 0] / 2
+            x0, y0 = np.maximum((self.obj_pos[i] - half).astype(int), 0)
+            x1, y1 = (self.obj_pos[i] + half).astype(int)
+            # Box top is closer to the camera by its height; keep the floor noise and dropouts
+            box = depth_image[y0:y1, x0:x1]
+            offset = np.uint16(round(self.obj_height_m[i] / self.depth_scale))
+            np.subtract(box, offset, out=box, where=box > offset)
+            color_image[y0:y1, x0:x1] = self.obj_color[i]
+
+        frame_number = self.frames_read + 1
+
+        return {
+            'color_image': color_image,
+            'depth_image': depth_image,
+            'depth_frame': None,
+            'color_frame': None,
+            'depth_intrinsics': self.depth_intrinsics,
+            'color_intrinsics': self.color_intrinsics,
+            'frame_number': frame_number,
+            'timestamp': frame_number * 1000.0 / self.fps,
+        }
+
+
+def open_frame_source(spec=None, width=1280, height=720, fps=30, real_time=True):
+    """
+    Create a frame source from a short description.
+
+    Args:
+        spec: None or 'camera' for the live camera, 'synthetic' for the
+              generated scene, or a path to a recording (.bag or .opsrec)
+        width, height, fps: Stream settings for live/synthetic sources
+        real_time: Pacing for recordings and synthetic scenes
+
+    Returns:
+        FrameSource (not started)
+    """
+    if spec is None or spec == 'camera':
+        return RealSenseFrameSource(width, height, fps)
+    if spec == 'synthetic':
+        return SyntheticFrameSource(width, height, fps, real_time=real_time)
+    if str(spec).endswith(RECORDING_SUFFIX):
+        return RecordingFrameSource(spec, real_time=real_time)
+    return ReplayFrameSource(spec, real_time=real_time)
@@ -0,0 +1,256 @@
+"""
+Point Cloud Writer
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: Save point clouds as binary PLY / PCD straight from NumPy, off the UI thread
+
+Points are written in fixed-size chunks: each chunk is packed into one
+reusable byte buffer (xyz float32 + rgb uint8 per point) and handed to the
+file in a single write, so no Open3D object is built and memory stays flat
+no matter how large the cloud is.
+
+PointCloudWriter runs the writes on a background thread. It can save
+individual files or append frames to a numbered sequence with an index.
+"""
+
+import json
+import queue
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+# Points packed per write
+CHUNK_POINTS = 1 << 18
+
+
+def _as_arrays(cloud):
+    """Accept a PointCloud or a (points, colors) tuple."""
+    if isinstance(cloud, tuple):
+        return cloud
+    return cloud.points, cloud.colors
+
+
+def _write_chunks(f, points, colors, record_size, color_slice):
+    """
+    Pack xyz (+ color bytes) into records and write them chunk by chunk.
+
+    Args:
+        f: Binary file
+        points: Nx3 float32
+        colors: Nx3 uint8 (already in file byte order) or None
+        record_size: Bytes per point
+        color_slice: Where color bytes go inside a record
+    """
+    points = np.ascontiguousarray(points, dtype='<f4')
+
+    # xyz only: the array already has the file layout
+    if colors is None:
+        f.write(memoryview(points).cast('B'))
+        return
+
+    n = len(points)
+    buffer = np.zeros((min(n, CHUNK_POINTS), record_size), dtype=np.uint8)
+    point_bytes = points.view(np.uint8).reshape(n, 12)
+
+    for start in range(0, n, CHUNK_POINTS):
+        end = min(start + CHUNK_POINTS, n)
+        chunk = buffer[:end - start]
+        chunk[:, 0:12] = point_bytes[start:end]
+        chunk[:, color_slice] = colors[start:end]
+        f.write(memoryview(chunk).cast('B'))
+
+
+def write_ply(path, points, colors=None):
+    """
+    Write a binary little-endian PLY file.
+
+    Args:
+        path: Output path
+        points: Nx3 float32 points (meters)
+        colors: Nx3 uint8 RGB colors, or None
+    """
+    n = len(points)
+    header = [
+        "ply",
+        "format binary_little_endian 1.0",
+        "comment Overhead Perception System",
+        f"element vertex {n}",
+        "property float x",
+        "property float y",
+        "property float z",
+    ]
+    if colors is not None:
+        header += ["property uchar red", "property uchar green", "property uchar blue"]
+    header.append("end_header\n")
+
+    with open(path, 'wb') as f:
+        f.write("\n".join(header).encode('ascii'))
+        _write_chunks(f, points, colors, 15, slice(12, 15))
+
+
+def write_pcd(path, points, colors=None):
+    """
+    Write a binary PCD (v0.7) file.
+
+    Colors are stored PCL-style as one packed 'rgb' field (0x00RRGGBB).
+
+    Args:
+        path: Output path
+        points: Nx3 float32 points (meters)
+        colors: Nx3 uint8 RGB colors, or None
+    """
+    n = len(points)
+    if colors is None:
+        fields, size, types, count = "x y z", "4 4 4", "F F F", "1 1 1"
+    else:
+        fields, size, types, count = "x y z rgb", "4 4 4 4", "F F F F", "1 1 1 1"
+
+    header = [
+        "# .PCD v0.7 - Point Cloud Data file format",
+        "VERSION 0.7",
+        f"FIELDS {fields}",
+        f"SIZE {size}",
+        f"TYPE {types}",
+        f"COUNT {count}",
+        f"WIDTH {n}",
+        "HEIGHT 1",
+        "VIEWPOINT 0 0 0 1 0 0 0",
+        f"POINTS {n}",
+        "DATA binary\n",
+    ]
+
+    with open(path, 'wb') as f:
+        f.write("\n".join(header).encode('ascii'))
+        # Little-endian 0x00RRGGBB is stored as B, G, R, 0
+        rgb_bytes = None if colors is None else colors[:, ::-1]
+        _write_chunks(f, points, rgb_bytes, 16, slice(12, 15))
+
+
+def write_point_cloud(path, cloud):
+    """
+    Write a point cloud, choosing PLY or PCD from the file extension.
+
+    Args:
+        path: Output path (.ply or .pcd)
+        cloud: PointCloud or (points, colors) tuple
+    """
+    points, colors = _as_arrays(cloud)
+    suffix = Path(path).suffix.lower()
+    if suffix == '.ply':
+        write_ply(path, points, colors)
+    elif suffix == '.pcd':
+        write_pcd(path, points, colors)
+    else:
+        raise ValueError(f"Unsupported point cloud format '{suffix}' (use .ply or .pcd)")
+
+
+class PointCloudWriter(threading.Thread):
+    """
+    Background thread that writes point clouds so the UI loop never waits on disk.
+
+    Clouds are copied when submitted (engine buffers are reused every frame).
+    If max_pending writes are already queued, submit() waits for one to finish.
+    """
+
+    def __init__(self, sequence_dir=None, sequence_format='ply', max_pending=4, verbose=True):
+        """
+        Start the writer thread.
+
+        Args:
+            sequence_dir: Directory for append() frames (None = no sequence)
+            sequence_format: 'ply' or 'pcd' for sequence frames
+            max_pending: Maximum queued clouds
+            verbose: Print a line for every file written
+        """
+        super().__init__(name="PointCloudWriter", daemon=True)
+        self.sequence_dir = Path(sequence_dir) if sequence_dir else None
+        self.sequence_format = sequence_format
+        self.verbose = verbose
+
+        self.sequence_index = []
+        self.files_written = 0
+        self.bytes_written = 0
+        self.errors = []
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self.start()
+
+    def submit(self, path, cloud, copy=True):
+        """
+        Queue a cloud to be written to path.
+
+        Args:
+            path: Output path (.ply or .pcd)
+            cloud: PointCloud or (points, colors) tuple
+            copy: Copy the arrays first (set False if the caller won't reuse them)
+        """
+        points, colors = _as_arrays(cloud)
+        if copy:
+            points = points.copy()
+            colors = None if colors is None else colors.copy()
+        self._queue.put((Path(path), points, colors))
+
+    def append(self, cloud, timestamp=None, copy=True):
+        """
+        Add a frame to the sequence (sequence_dir/frame_000000.ply, ...).
+
+        Args:
+            cloud: PointCloud or (points, colors) tuple
+            timestamp: Frame timestamp in ms (default: wall clock)
+            copy: Copy the arrays first
+
+        Returns:
+            Path the frame will be written to
+        """
+        if self.sequence_dir is None:
+            raise ValueError("No sequence_dir given to PointCloudWriter")
+
+        self.sequence_dir.mkdir(parents=True, exist_ok=True)
+        frame = len(self.sequence_index)
+        path = self.sequence_dir / f"frame_{frame:06d}.{self.sequence_format}"
+        self.sequence_index.append({
+            'frame': frame,
+            'file': path.name,
+            'points': len(_as_arrays(cloud)[0]),
+            'timestamp': timestamp if timestamp is not None else time.time() * 1000,
+        })
+        self.submit(path, cloud, copy=copy)
+        return path
+
+    def run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                path, points, colors = item
+                try:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    write_point_cloud(path, (points, colors))
+                    self.files_written += 1
+                    self.bytes_written += path.stat().st_size
+                    if self.verbose:
+                        print(f"Point cloud saved to: {path} ({len(points)} points)")
+                except (OSError, ValueError) as e:
+                    self.errors.append((path, e))
+                    print(f"Could not save point cloud to {path}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """Wait until everything queued so far is on disk."""
+        self._queue.join()
+
+    def close(self):
+        """Finish all pending writes, write the sequence index and stop the thread."""
+        if not self.is_alive():
+            return
+        self._queue.put(None)
+        self.join()
+
+        if self.sequence_dir is not None and self.sequence_index:
+            with open(self.sequence_dir / 'sequence.json', 'w') as f:
+                json.dump({'format': self.sequence_format, 'frames': self.sequence_index}, f, indent=2)
@@ -0,0 +1,353 @@
+"""
+Lossless RGB-D Recorder
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: Record raw z16 depth and color so recordings can be re-measured later
+
+Unlike the mp4v VideoWriter (which stores a lossy colorized depth image),
+this container keeps the exact uint16 depth values together with the stream
+intrinsics and depth scale needed to turn them back into 3D points.
+
+File layout (.opsrec, little-endian):
+    Header:  MAGIC | uint32 header length | header JSON
+    Chunks:  CHUNK_MAGIC | uint32 frame count | uint64 payload bytes |
+             frame table (FRAME_DTYPE x count) | payload (depth, color, depth, color, ...)
+    Index:   INDEX_MAGIC | uint64 frame count | frame table (FRAME_DTYPE x count)
+    Trailer: uint64 index offset | END_MAGIC
+
+Frames are written as they arrive, a chunk at a time. Depth is stored raw
+by default; depth_codec='rvl' stores it losslessly compressed instead
+(see src.data.depth_codec). Color is always stored raw.
+The index is only written on close(); if a recording was cut short, the
+reader rebuilds it by walking the chunk headers.
+"""
+
+import json
+import struct
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from src.utils.intrinsics import intrinsics_to_dict, intrinsics_from_dict
+from src.data.depth_codec import encode_depth, decode_depth
+
+
+MAGIC = b'OPSREC01'
+CHUNK_MAGIC = b'CHNK'
+INDEX_MAGIC = b'INDX'
+END_MAGIC = b'OPSEND01'
+
+RECORDING_SUFFIX = '.opsrec'
+
+DEPTH_CODECS = ('raw', 'rvl')
+
+# Per-frame table entry (offsets are absolute file positions)
+FRAME_DTYPE = np.dtype([
+    ('frame_number', '<i8'),
+    ('timestamp', '<f8'),
+    ('depth_offset', '<u8'),
+    ('depth_nbytes', '<u4'),
+    ('color_nbytes', '<u4'),
+])
+
+_CHUNK_HEADER = struct.Struct('<4sIQ')
+_INDEX_HEADER = struct.Struct('<4sQ')
+_TRAILER = struct.Struct('<Q8s')
+
+
+class DepthRecorder:
+    """
+    Append-only writer for raw depth + color recordings.
+    """
+
+    def __init__(self, path, width, height, depth_scale, depth_intrinsics=None, color_intrinsics=None,
+                 fps=30, aligned=True, chunk_frames=16, depth_codec='raw'):
+        """
+        Create a new recording.
+
+        Args:
+            path: Output file path (.opsrec)
+            width, height: Frame size in pixels
+            depth_scale: Meters per depth unit
+            depth_intrinsics: rs.intrinsics of the recorded depth image
+            color_intrinsics: rs.intrinsics of the recorded color image
+            fps: Nominal frame rate
+            aligned: True if depth is aligned to color
+            chunk_frames: Frames buffered per chunk write
+            depth_codec: 'raw' (no encoding) or 'rvl' (lossless compression)
+        """
+        if depth_codec not in DEPTH_CODECS:
+            raise ValueError(f"Unknown depth codec '{depth_codec}' (use one of {DEPTH_CODECS})")
+
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.width = width
+        self.height = height
+        self.chunk_frames = chunk_frames
+        self.depth_codec = depth_codec
+
+        self.header = {
+            'version': 1,
+            'created': datetime.now().isoformat(),
+            'width': width,
+            'height': height,
+            'fps': fps,
+            'depth_scale': depth_scale,
+            'aligned': aligned,
+            'depth_dtype': 'uint16',
+            'color_dtype': 'uint8',
+            'color_channels': 3,
+            'depth_codec': depth_codec,
+            'chunk_frames': chunk_frames,
+            'depth_intrinsics': intrinsics_to_dict(depth_intrinsics) if depth_intrinsics else None,
+            'color_intrinsics': intrinsics_to_dict(color_intrinsics) if color_intrinsics else None,
+        }
+
+        self._file = open(self.path, 'wb')
+        header_bytes = json.dumps(self.header).encode('utf-8')
+        self._file.write(MAGIC)
+        self._file.write(struct.pack('<I', len(header_bytes)))
+        self._file.write(header_bytes)
+
+        # Pending chunk and the index of everything written so far
+        self._pending = []
+        self._index_chunks = []
+        self.frame_count = 0
+        self.bytes_written = 0
+        self.raw_bytes = 0
+        self.closed = False
+
+    @classmethod
+    def for_source(cls, path, source, aligned=True, **kwargs):
+        """
+        Create a recorder matching a started FrameSource.
+
+        Args:
+            path: Output file path
+            source: Started FrameSource
+            aligned: True if the recorded frames are read with aligned=True
+            **kwargs: Passed to DepthRecorder()
+
+        Returns:
+            DepthRecorder
+        """
+        depth_intrinsics = source.color_intrinsics if aligned else source.depth_intrinsics
+        return cls(path, source.width, source.height, source.depth_scale,
+                   depth_intrinsics=depth_intrinsics, color_intrinsics=source.color_intrinsics,
+                   fps=source.fps, aligned=aligned, **kwargs)
+
+    def add_frame(self, depth_image, color_image, frame_number=None, timestamp=None):
+        """
+        Append one frame.
+
+        Args:
+            depth_image: HxW uint16 depth image (stored exactly as given)
+            color_image: HxWx3 uint8 color image
+            frame_number: Camera frame counter (default: running count)
+            timestamp: Capture time in milliseconds (default: wall clock)
+        """
+        if self.closed:
+            raise ValueError("Recording is closed")
+        if depth_image.dtype != np.uint16:
+            raise ValueError(f"Depth must be uint16 (z16), got {depth_image.dtype}")
+
+        if frame_number is None:
+            frame_number = self.frame_count
+        if timestamp is None:
+            timestamp = datetime.now().timestamp() * 1000
+
+        # Copy now so SDK frame buffers are released right away
+        depth_bytes = self._encode_depth(depth_image)
+        color_bytes = np.ascontiguousarray(color_image).tobytes()
+        self.raw_bytes += depth_image.nbytes + len(color_bytes)
+        self._pending.append((frame_number, timestamp, depth_bytes, color_bytes))
+        self.frame_count += 1
+
+        if len(self._pending) >= self.chunk_frames:
+            self._write_chunk()
+
+    def add(self, frame):
+        """
+        Append a frame dict as returned by FrameSource.read().
+
+        Args:
+            frame: dict with depth_image, color_image, frame_number, timestamp
+        """
+        self.add_frame(frame['depth_image'], frame['color_image'],
+                       frame.get('frame_number'), frame.get('timestamp'))
+
+    def _encode_depth(self, depth_image):
+        """Depth bytes for the configured codec."""
+        if self.depth_codec == 'rvl':
+            return encode_depth(depth_image)
+        return np.ascontiguousarray(depth_image).tobytes()
+
+    def _write_chunk(self):
+        """Write all pending frames as one chunk."""
+        if not self._pending:
+            return
+
+        count = len(self._pending)
+        table = np.zeros(count, dtype=FRAME_DTYPE)
+        payload_bytes = sum(len(d) + len(c) for _, _, d, c in self._pending)
+
+        # Payload starts after the chunk header and frame table
+        offset = self._file.tell() + _CHUNK_HEADER.size + table.nbytes
+        for i, (frame_number, timestamp, depth_bytes, color_bytes) in enumerate(self._pending):
+            table[i] = (frame_number, timestamp, offset, len(depth_bytes), len(color_bytes))
+            offset += len(depth_bytes) + len(color_bytes)
+
+        self._file.write(_CHUNK_HEADER.pack(CHUNK_MAGIC, count, payload_bytes))
+        self._file.write(table.tobytes())
+        for _, _, depth_bytes, color_bytes in self._pending:
+            self._file.write(depth_bytes)
+            self._file.write(color_bytes)
+
+        self._index_chunks.append(table)
+        self.bytes_written += payload_bytes
+        self._pending = []
+
+    def close(self):
+        """Flush the last chunk and write the index."""
+        if self.closed:
+            return
+
+        self._write_chunk()
+
+        index = np.concatenate(self._index_chunks) if self._index_chunks else np.zeros(0, dtype=FRAME_DTYPE)
+        index_offset = self._file.tell()
+        self._file.write(_INDEX_HEADER.pack(INDEX_MAGIC, len(index)))
+        self._file.write(index.tobytes())
+        self._file.write(_TRAILER.pack(index_offset, END_MAGIC))
+        self._file.close()
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class DepthRecording:
+    """
+    Random-access reader for .opsrec recordings.
+
+    Frames are read through a copy-on-write memory map, so raw depth and
+    color come back as views without copying. Drawing on them never
+    modifies the file.
+    """
+
+    def __init__(self, path):
+        """
+        Open a recording.
+
+        Args:
+            path: Path to the .opsrec file
+        """
+        self.path = Path(path)
+        self._data = np.memmap(self.path, dtype=np.uint8, mode='c')
+
+        if bytes(self._data[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{self.path} is not an .opsrec recording")
+
+        header_len = struct.unpack_from('<I', self._data, len(MAGIC))[0]
+        header_start = len(MAGIC) + 4
+        self.header = json.loads(bytes(self._data[header_start:header_start + header_len]).decode('utf-8'))
+        self._first_chunk = header_start + header_len
+
+        self.width = self.header['width']
+        self.height = self.header['height']
+        self.fps = self.header['fps']
+        self.depth_scale = self.header['depth_scale']
+        self.aligned = self.header['aligned']
+        self.depth_codec = self.header.get('depth_codec', 'raw')
+
+        self.depth_intrinsics = None
+        self.color_intrinsics = None
+        if self.header['depth_intrinsics']:
+            self.depth_intrinsics = intrinsics_from_dict(self.header['depth_intrinsics'])
+        if self.header['color_intrinsics']:
+            self.color_intrinsics = intrinsics_from_dict(self.header['color_intrinsics'])
+
+        self.index = self._read_index()
+        self.complete = self._has_trailer()
+
+    def _has_trailer(self):
+        return (len(self._data) >= _TRAILER.size and
+                bytes(self._data[-len(END_MAGIC):]) == END_MAGIC)
+
+    def _read_index(self):
+        """Load the index from the trailer, or rebuild it from the chunk headers."""
+        if self._has_trailer():
+            index_offset = _TRAILER.unpack_from(self._data, len(self._data) - _TRAILER.size)[0]
+            magic, count = _INDEX_HEADER.unpack_from(self._data, index_offset)
+            if magic == INDEX_MAGIC:
+                start = index_offset + _INDEX_HEADER.size
+                return np.frombuffer(self._data, dtype=FRAME_DTYPE, count=count, offset=start)
+
+        # Truncated recording: walk the chunks that were fully written
+        tables = []
+        position = self._first_chunk
+        while position + _CHUNK_HEADER.size <= len(self._data):
+            magic, count, payload_bytes = _CHUNK_HEADER.unpack_from(self._data, position)
+            table_start = position + _CHUNK_HEADER.size
+            chunk_end = table_start + count * FRAME_DTYPE.itemsize + payload_bytes
+            if magic != CHUNK_MAGIC or chunk_end > len(self._data):
+                break
+            tables.append(np.frombuffer(self._data, dtype=FRAME_DTYPE, count=count, offset=table_start))
+            position = chunk_end
+
+        return np.concatenate(tables) if tables else np.zeros(0, dtype=FRAME_DTYPE)
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def frame_numbers(self):
+        """Camera frame counter of every frame."""
+        return self.index['frame_number']
+
+    @property
+    def timestamps(self):
+        """Capture time of every frame (milliseconds)."""
+        return self.index['timestamp']
+
+    def _decode_depth(self, entry):
+        """Depth image for an index entry (a view into the file when stored raw)."""
+        if self.depth_codec == 'rvl':
+            start = int(entry['depth_offset'])
+            return decode_depth(self._data[start:start + int(entry['depth_nbytes'])])
+        return np.frombuffer(self._data, dtype=np.uint16, count=self.width * self.height,
+                             offset=int(entry['depth_offset'])).reshape(self.height, self.width)
+
+    def read_frame(self, i):
+        """
+        Read one frame.
+
+        Args:
+            i: Frame index (0 to len-1)
+
+        Returns:
+            dict with depth_image, color_image, frame_number, timestamp
+        """
+        entry = self.index[i]
+        color_offset = int(entry['depth_offset']) + int(entry['depth_nbytes'])
+        color_image = np.frombuffer(self._data, dtype=np.uint8, count=int(entry['color_nbytes']),
+                                    offset=color_offset).reshape(self.height, self.width, -1)
+
+        return {
+            'depth_image': self._decode_depth(entry),
+            'color_image': color_image,
+            'frame_number': int(entry['frame_number']),
+            'timestamp': float(entry['timestamp']),
+        }
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.read_frame(i)
+
+    def close(self):
+        """Release the memory map."""
+        self._data = None
@@ -0,0 +1,438 @@
+"""
+Accuracy Results Store
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: Indexed storage for depth accuracy runs (SQLite metadata + .npy sample arrays)
+
+Each run is one row in results.sqlite with the columns runs are searched by
+(test type, ground truth distance, timestamp, resolution). Every scalar
+result goes into the metrics table, and every array (per-frame
+measurements, uniformity grids, per-pixel maps) is saved as an .npy file
+under arrays/ and loaded only when asked for, memory-mapped by default.
+Listing or aggregating hundreds of runs is a single indexed query and never
+touches the sample arrays.
+
+Layout (inside the results directory):
+    results.sqlite
+    arrays/<run id>_<name>.npy
+
+The per-run JSON files written by older versions of the accuracy tests can
+be imported with import_json().
+"""
+
+import json
+import sqlite3
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+
+DATABASE_NAME = 'results.sqlite'
+ARRAYS_DIR = 'arrays'
+
+TEST_TYPES = ('distance', 'spatial_uniformity', 'repeatability')
+
+# Ground truth distances closer than this (cm) count as the same distance
+DISTANCE_TOLERANCE_CM = 0.05
+
+# Keys of a results dict stored as run columns rather than metrics
+_RUN_KEYS = ('test_name', 'timestamp', 'ground_truth_cm', 'num_samples', 'num_frames', 'resolution')
+
+# Per-cell keys of a uniformity 'grid_data' list, stored as rows x cols arrays
+_GRID_KEYS = ('mean_cm', 'std_cm', 'noise_cm', 'fill_rate', 'p5_cm', 'p50_cm', 'p95_cm')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    test_type TEXT NOT NULL,
+    test_name TEXT,
+    timestamp TEXT NOT NULL,
+    ground_truth_cm REAL,
+    width INTEGER,
+    height INTEGER,
+    num_samples INTEGER,
+    info TEXT,
+    source TEXT UNIQUE
+);
+CREATE INDEX IF NOT EXISTS runs_by_type ON runs (test_type, ground_truth_cm);
+CREATE INDEX IF NOT EXISTS runs_by_time ON runs (timestamp);
+CREATE INDEX IF NOT EXISTS runs_by_resolution ON runs (width, height);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (run_id, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS metrics_by_name ON metrics (name, run_id);
+CREATE TABLE IF NOT EXISTS arrays (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    path TEXT NOT NULL,
+    PRIMARY KEY (run_id, name)
+) WITHOUT ROWID;
+"""
+
+
+def infer_test_type(results):
+    """
+    Test type of a results dict.
+
+    Args:
+        results: Results dict from DepthAccuracyTester
+
+    Returns:
+        One of TEST_TYPES
+    """
+    test_name = results.get('test_name', '')
+    if test_name in TEST_TYPES:
+        return test_name
+    if 'ground_truth_cm' in results:
+        return 'distance'
+    if 'grid_data' in results:
+        return 'spatial_uniformity'
+    if 'measurements_cm' in results:
+        return 'repeatability'
+    raise ValueError(f"Cannot tell the test type of results '{test_name}'")
+
+
+def _split_results(results):
+    """
+    Split a results dict into run columns, scalar metrics, arrays and other info.
+
+    Returns:
+        (columns dict, metrics dict, arrays dict, info dict)
+    """
+    columns, metrics, arrays, info = {}, {}, {}, {}
+    for key, value in results.items():
+        if key in _RUN_KEYS:
+            columns[key] = value
+        elif key == 'grid_data':
+            rows = max(cell['row'] for cell in value) + 1
+            cols = max(cell['col'] for cell in value) + 1
+            for name in _GRID_KEYS:
+                if name in value[0]:
+                    grid = np.full((rows, cols), np.nan)
+                    for cell in value:
+                        cell_value = cell.get(name)
+                        grid[cell['row'], cell['col']] = np.nan if cell_value is None else cell_value
+                    arrays[f"grid_{name}"] = grid
+        elif isinstance(value, np.ndarray):
+            arrays[key] = value
+        elif isinstance(value, list) and value and all(isinstance(v, (int, float)) for v in value):
+            if key == 'grid_size':
+                info[key] = value
+            else:
+                # raw_measurements_cm (distance) and measurements_cm (repeatability) are the same thing
+                name = 'measurements_cm' if key == 'raw_measurements_cm' else key
+                arrays[name] = np.asarray(value, dtype=np.float64)
+        elif isinstance(value, (bool, str)) or value is None:
+            info[key] = value
+        elif isinstance(value, (int, float, np.number)):
+            metrics[key] = float(value)
+        else:
+            info[key] = value
+    return columns, metrics, arrays, info
+
+
+def _time_bound(value, end=False):
+    """ISO string for a since/until filter (a date as 'until' includes that whole day)."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, date):
+        return (value + timedelta(days=1) if end else value).isoformat()
+    return str(value)
+
+
+class ResultsStore:
+    """
+    SQLite index of accuracy runs with their sample arrays stored alongside as .npy files.
+    """
+
+    def __init__(self, root="results/depth_accuracy"):
+        """
+        Open (or create) the store in a results directory.
+
+        Args:
+            root: Directory holding results.sqlite and arrays/
+        """
+        self.root = Path(root)
+        self.arrays_dir = self.root / ARRAYS_DIR
+        self.arrays_dir.mkdir(parents=True, exist_ok=True)
+
+        self.db = sqlite3.connect(self.root / DATABASE_NAME)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.executescript(_SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def add_run(self, results, arrays=None, resolution=None, source=None):
+        """
+        Store one test run.
+
+        Args:
+            results: Results dict from DepthAccuracyTester. Lists of numbers
+                     and uniformity 'grid_data' are stored as arrays
+            arrays: Optional dict of extra NumPy arrays (e.g. per-pixel maps)
+            resolution: (width, height) of the depth stream, if not in results
+            source: Unique name of where the run came from (e.g. the imported
+                    file), so importing it again is skipped
+
+        Returns:
+            Run id
+        """
+        columns, metrics, run_arrays, info = _split_results(results)
+        run_arrays.update(arrays or {})
+        width, height = columns.get('resolution') or resolution or (None, None)
+        num_samples = columns.get('num_samples', columns.get('num_frames'))
+
+        written = []
+        try:
+            with self.db:
+                run_id = self.db.execute(
+                    "INSERT INTO runs (test_type, test_name, timestamp, ground_truth_cm, width, height, "
+                    "num_samples, info, source) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (infer_test_type(results), columns.get('test_name') or None,
+                     columns.get('timestamp') or datetime.now().isoformat(), columns.get('ground_truth_cm'),
+                     width, height, num_samples, json.dumps(info) if info else None, source)
+                ).lastrowid
+                self.db.executemany("INSERT INTO metrics (run_id, name, value) VALUES (?, ?, ?)",
+                                    [(run_id, name, value) for name, value in metrics.items()])
+
+                for name, values in run_arrays.items():
+                    path = Path(ARRAYS_DIR) / f"{run_id:06d}_{name}.npy"
+                    np.save(self.root / path, np.asarray(values))
+                    written.append(self.root / path)
+                    self.db.execute("INSERT INTO arrays (run_id, name, path) VALUES (?, ?, ?)",
+                                    (run_id, name, path.as_posix()))
+        except Exception:
+            # The rows were rolled back; don't leave orphaned array files
+            for path in written:
+                path.unlink(missing_ok=True)
+            raise
+
+        return run_id
+
+    def import_json(self, paths, resolution=(640, 480)):
+        """
+        Import per-run JSON files written by the accuracy tests.
+
+        Files already imported are skipped. An .npz named in a file's
+        'arrays_file' entry is imported with it.
+
+        Args:
+            paths: JSON file paths, or directories to import every *.json from
+            resolution: (width, height) for files that don't record it
+                        (the accuracy tests ran at 640x480)
+
+        Returns:
+            List of new run ids
+        """
+        files = []
+        for path in map(Path, paths):
+            files.extend(sorted(path.glob('*.json')) if path.is_dir() else [path])
+
+        run_ids = []
+        for path in files:
+            source = str(path.resolve())
+            if self.db.execute("SELECT 1 FROM runs WHERE source = ?", (source,)).fetchone():
+                continue
+
+            with open(path, 'r') as f:
+                results = json.load(f)
+            if not isinstance(results, dict) or 'timestamp' not in results:
+                print(f"⚠ Skipping {path.name}: not an accuracy results file")
+                continue
+
+            arrays = None
+            arrays_file = results.pop('arrays_file', None)
+            if arrays_file and (path.parent / arrays_file).exists():
+                with np.load(path.parent / arrays_file) as data:
+                    arrays = {name: data[name] for name in data.files}
+
+            try:
+                run_ids.append(self.add_run(results, arrays, resolution=resolution, source=source))
+            except ValueError as e:
+                print(f"⚠ Skipping {path.name}: {e}")
+
+        return run_ids
+
+    def delete_run(self, run_id):
+        """
+        Remove a run and its array files.
+
+        Args:
+            run_id: Run id
+        """
+        paths = [self.root / row['path'] for row in
+                 self.db.execute("SELECT path FROM arrays WHERE run_id = ?", (run_id,))]
+        with self.db:
+            self.db.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+        for path in paths:
+            path.unlink(missing_ok=True)
+
+    # ------------------------------------------------------------------
+    # Querying
+    # ------------------------------------------------------------------
+
+    def _where(self, test_type=None, distance_cm=None, since=None, until=None, resolution=None):
+        """SQL WHERE clause and parameters for the run filters."""
+        clauses, params = [], []
+        if test_type is not None:
+            clauses.append("runs.test_type = ?")
+            params.append(test_type)
+        if distance_cm is not None:
+            clauses.append("ABS(runs.ground_truth_cm - ?) < ?")
+            params += [distance_cm, DISTANCE_TOLERANCE_CM]
+        if since is not None:
+            clauses.append("runs.timestamp >= ?")
+            params.append(_time_bound(since))
+        if until is not None:
+            clauses.append("runs.timestamp < ?")
+            params.append(_time_bound(until, end=True))
+        if resolution is not None:
+            clauses.append("runs.width = ? AND runs.height = ?")
+            params += list(resolution)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def find_runs(self, test_type=None, distance_cm=None, since=None, until=None, resolution=None,
+                  metrics=None):
+        """
+        Runs matching all the given filters, oldest first.
+
+        Args:
+            test_type: One of TEST_TYPES
+            distance_cm: Ground truth distance (cm)
+            since: Earliest timestamp (datetime, date or ISO string), inclusive
+            until: Latest timestamp, exclusive (a date includes that whole day)
+            resolution: (width, height)
+            metrics: Metric names to include in each row (None = all)
+
+        Returns:
+            List of dicts: run columns, 'resolution' and the metrics
+        """
+        where, params = self._where(test_type, distance_cm, since, until, resolution)
+        runs = {row['id']: dict(row) for row in
+                self.db.execute(f"SELECT * FROM runs{where} ORDER BY timestamp, id", params)}
+        if not runs:
+            return []
+
+        metric_query = f"SELECT metrics.* FROM metrics JOIN runs ON runs.id = metrics.run_id{where}"
+        if metrics is not None:
+            metric_query += (" AND " if where else " WHERE ") + \
+                f"metrics.name IN ({', '.join('?' * len(metrics))})"
+            params = params + list(metrics)
+        for row in self.db.execute(metric_query, params):
+            runs[row['run_id']][row['name']] = row['value']
+
+        for run in runs.values():
+            run['resolution'] = (run.pop('width'), run.pop('height'))
+            run['info'] = json.loads(run['info']) if run['info'] else {}
+        return list(runs.values())
+
+    def summarize(self, metric, by='ground_truth_cm', **filters):
+        """
+        Aggregate one metric over matching runs, grouped by a run column.
+
+        Args:
+            metric: Metric name (e.g. 'absolute_error_cm')
+            by: Run column to group by ('ground_truth_cm', 'test_type', 'width', ...)
+            **filters: Same filters as find_runs()
+
+        Returns:
+            List of dicts {by, 'runs', 'mean', 'min', 'max', 'rms'}
+        """
+        if by not in ('ground_truth_cm', 'test_type', 'test_name', 'width', 'height', 'num_samples'):
+            raise ValueError(f"Cannot group runs by '{by}'")
+        where, params = self._where(**filters)
+        where += (" AND " if where else " WHERE ") + "metrics.name = ?"
+        query = (f"SELECT runs.{by} AS {by}, COUNT(*) AS runs, AVG(value) AS mean, MIN(value) AS min, "
+                 f"MAX(value) AS max, AVG(value * value) AS mean_square "
+                 f"FROM metrics JOIN runs ON runs.id = metrics.run_id{where} "
+                 f"GROUP BY runs.{by} ORDER BY runs.{by}")
+        groups = []
+        for row in self.db.execute(query, params + [metric]):
+            group = dict(row)
+            group['rms'] = float(np.sqrt(group.pop('mean_square')))
+            groups.append(group)
+        return groups
+
+    def metric_values(self, metric, **filters):
+        """
+        One metric for every matching run, as arrays.
+
+        Args:
+            metric: Metric name
+            **filters: Same filters as find_runs()
+
+        Returns:
+            (run ids, ground truth cm, values) as NumPy arrays, oldest first
+        """
+        where, params = self._where(**filters)
+        where += (" AND " if where else " WHERE ") + "metrics.name = ?"
+        rows = self.db.execute(f"SELECT runs.id, runs.ground_truth_cm, metrics.value FROM metrics "
+                               f"JOIN runs ON runs.id = metrics.run_id{where} "
+                               f"ORDER BY runs.timestamp, runs.id", params + [metric]).fetchall()
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0), np.empty(0)
+        run_ids, distances, values = zip(*rows)
+        return (np.array(run_ids, dtype=np.int64), np.array(distances, dtype=np.float64),
+                np.array(values, dtype=np.float64))
+
+    def array_names(self, run_id):
+        """Names of the arrays stored for a run."""
+        return [row['name'] for row in
+                self.db.execute("SELECT name FROM arrays WHERE run_id = ? ORDER BY name", (run_id,))]
+
+    def load_array(self, run_id, name, mmap=True):
+        """
+        Load one array of a run.
+
+        Args:
+            run_id: Run id
+            name: Array name (e.g. 'measurements_cm', 'grid_mean_cm')
+            mmap: Memory-map the file instead of reading it
+
+        Returns:
+            NumPy array
+        """
+        row = self.db.execute("SELECT path FROM arrays WHERE run_id = ? AND name = ?", (run_id, name)).fetchone()
+        if row is None:
+            raise KeyError(f"Run {run_id} has no array '{name}'")
+        return np.load(self.root / row['path'], mmap_mode='r' if mmap else None)
+
+    def load_run(self, run_id, arrays=True):
+        """
+        One run as a results dict (columns, metrics, info and optionally arrays).
+
+        Args:
+            run_id: Run id
+            arrays: Also load the run's arrays (memory-mapped)
+
+        Returns:
+            dict
+        """
+        row = self.db.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"No run {run_id}")
+        run = dict(row)
+        run['resolution'] = (run.pop('width'), run.pop('height'))
+        run.update(json.loads(run.pop('info') or '{}'))
+        for metric in self.db.execute("SELECT name, value FROM metrics WHERE run_id = ?", (run_id,)):
+            run[metric['name']] = metric['value']
+        if arrays:
+            for name in self.array_names(run_id):
+                run[name] = self.load_array(run_id, name)
+        return run
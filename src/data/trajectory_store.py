@@ -0,0 +1,498 @@
+"""
+Trajectory Store
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: Append-only columnar storage for hours of tracked world positions, with time and floor-area queries
+
+Every stored point is one row of five typed columns (track id, timestamp,
+x, y, z), each column its own raw little-endian file that is memory-mapped
+for reading. Rows are appended in fixed-size chunks. When a chunk is
+sealed, its zone map is appended to the chunk index: row range, time
+range, track id range, floor bounding box, and the floor cells it touches
+(a cell_m grid). A query reads the small index first, then scans only the
+chunks whose time range, ids and cells can match. A query over a few
+minutes of an hours-long store touches a few chunks, not the whole file.
+
+Optional online simplification (tolerance_m) drops a track's points that
+lie within tolerance of the straight line between the stored points around
+them, deciding one frame at a time with constant state per track. A
+standing object keeps one point per keep_every_s, so it does not grow the
+store at frame rate and still shows up in time queries.
+
+Layout (one directory):
+    meta.json            column dtypes, chunk size, cell size
+    <column>.bin         track_id (int64), timestamp (float64 s), x, y, z (float32 m)
+    chunks.bin           CHUNK_DTYPE per sealed chunk (written last, so it commits the chunk)
+    cells.bin            CELL_DTYPE floor cells of every chunk
+
+If the writer stopped without closing, rows past the last committed chunk
+are discarded when the store is opened again.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+
+META_NAME = 'meta.json'
+CHUNKS_NAME = 'chunks.bin'
+CELLS_NAME = 'cells.bin'
+
+# One row per stored point
+POINT_DTYPE = np.dtype([
+    ('track_id', '<i8'),
+    ('timestamp', '<f8'),   # Seconds
+    ('x', '<f4'),           # World position (meters)
+    ('y', '<f4'),
+    ('z', '<f4'),
+])
+
+# Zone map of one sealed chunk
+CHUNK_DTYPE = np.dtype([
+    ('start', '<u8'),        # First row
+    ('count', '<u4'),        # Rows
+    ('t_min', '<f8'),
+    ('t_max', '<f8'),
+    ('id_min', '<i8'),
+    ('id_max', '<i8'),
+    ('x_min', '<f4'),
+    ('x_max', '<f4'),
+    ('y_min', '<f4'),
+    ('y_max', '<f4'),
+    ('cells_start', '<u8'),  # This chunk's entries in cells.bin
+    ('cells_count', '<u4'),
+])
+
+# Floor cell (cell_m grid) touched by a chunk
+CELL_DTYPE = np.dtype([('cx', '<i4'), ('cy', '<i4')])
+
+
+class TrajectoryStore:
+    """
+    Append-only, chunked, memory-mapped store of track positions.
+
+    Usage:
+        with TrajectoryStore('data/trajectories', tolerance_m=0.02) as store:
+            store.append(tracks['id'], timestamp_s, positions)         # every frame
+        points = TrajectoryStore('data/trajectories').query(t0, t1, rect=(x0, y0, x1, y1))
+    """
+
+    def __init__(self, root, chunk_rows=65536, cell_m=0.5, tolerance_m=None, keep_every_s=1.0):
+        """
+        Open (or create) a store.
+
+        Args:
+            root: Store directory
+            chunk_rows: Rows per chunk (an existing store keeps its own)
+            cell_m: Floor cell size of the chunk index (an existing store keeps its own)
+            tolerance_m: Online simplification tolerance (meters), None to store every point
+            keep_every_s: With simplification, longest gap between a track's stored points (seconds)
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.tolerance_m = tolerance_m
+        self.keep_every_s = keep_every_s
+
+        meta_path = self.root / META_NAME
+        if meta_path.exists():
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta.get('columns') != {name: POINT_DTYPE[name].str for name in POINT_DTYPE.names}:
+                raise ValueError(f"{self.root} has a different column layout")
+            chunk_rows, cell_m = meta['chunk_rows'], meta['cell_m']
+        else:
+            with open(meta_path, 'w') as f:
+                json.dump({'version': 1, 'columns': {name: POINT_DTYPE[name].str for name in POINT_DTYPE.names},
+                           'chunk_rows': chunk_rows, 'cell_m': cell_m}, f, indent=2)
+        self.chunk_rows = chunk_rows
+        self.cell_m = cell_m
+
+        # Committed chunks; drop anything written after the last one
+        self.chunks = self._read_records(CHUNKS_NAME, CHUNK_DTYPE)
+        self.rows = int(self.chunks['start'][-1] + self.chunks['count'][-1]) if len(self.chunks) else 0
+        cell_count = int(self.chunks['cells_start'][-1] + self.chunks['cells_count'][-1]) if len(self.chunks) else 0
+        self._truncate(CELLS_NAME, cell_count * CELL_DTYPE.itemsize)
+        for name in POINT_DTYPE.names:
+            self._truncate(f"{name}.bin", self.rows * POINT_DTYPE[name].itemsize)
+        self._cells = self._read_records(CELLS_NAME, CELL_DTYPE)
+        self._cell_chunk = np.repeat(np.arange(len(self.chunks)), self.chunks['cells_count'].astype(np.intp))
+        self._maps = None
+
+        # Chunk being filled (in memory until sealed)
+        self._buffer = np.empty(chunk_rows, dtype=POINT_DTYPE)
+        self._buffered = 0
+
+        # Simplification state per live track, sorted by id: last stored point and latest unstored point
+        self._track_ids = np.empty(0, dtype=np.int64)
+        self._anchor = np.empty(0, dtype=POINT_DTYPE)
+        self._pending = np.empty(0, dtype=POINT_DTYPE)
+        self._has_pending = np.empty(0, dtype=bool)
+        # Direction cone from the anchor (center angle and half width, radians), and how far
+        # from the anchor the unstored points reach
+        self._center = np.empty(0)
+        self._half = np.empty(0)
+        self._reach = np.empty(0)
+
+        self.points_received = 0
+        self.closed = False
+
+    def _read_records(self, name, dtype):
+        path = self.root / name
+        if not path.exists() or path.stat().st_size < dtype.itemsize:
+            return np.zeros(0, dtype=dtype)
+        return np.fromfile(path, dtype=dtype, count=path.stat().st_size // dtype.itemsize)
+
+    def _truncate(self, name, size):
+        path = self.root / name
+        if path.exists() and path.stat().st_size > size:
+            with open(path, 'r+b') as f:
+                f.truncate(size)
+
+    def __len__(self):
+        """Stored rows (sealed and buffered)."""
+        return self.rows + self._buffered
+
+    @property
+    def max_track_id(self):
+        """
+        Largest track id in the store (sealed, buffered or held back by simplification), 0 if empty.
+
+        Track ids are only unique within a store, so a writer that reopens it
+        should number new tracks from max_track_id + 1.
+        """
+        candidates = [0]
+        if len(self.chunks):
+            candidates.append(int(self.chunks['id_max'].max()))
+        if self._buffered:
+            candidates.append(int(self._buffer['track_id'][:self._buffered].max()))
+        if len(self._track_ids):
+            candidates.append(int(self._track_ids.max()))
+        return max(candidates)
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def append(self, track_ids, timestamp, positions):
+        """
+        Add one frame of track positions.
+
+        Args:
+            track_ids: N track ids
+            timestamp: Frame time (seconds)
+            positions: Nx3 world positions (meters); Nx2 stores z = 0
+        """
+        if self.closed:
+            raise ValueError("Trajectory store is closed")
+        points = np.zeros(len(track_ids), dtype=POINT_DTYPE)
+        points['track_id'] = track_ids
+        points['timestamp'] = timestamp
+        positions = np.asarray(positions)
+        points['x'], points['y'] = positions[:, 0], positions[:, 1]
+        if positions.shape[1] > 2:
+            points['z'] = positions[:, 2]
+        self.points_received += len(points)
+
+        if self.tolerance_m is None:
+            self._write(points)
+        else:
+            self._simplify(points)
+
+    def _simplify(self, points):
+        """
+        Online simplification of one frame, for all tracks at once.
+
+        Each track keeps its last stored point (anchor), its latest unstored
+        point (pending) and the cone of directions from the anchor whose
+        line passes within tolerance_m of every point dropped since (floor
+        x/y). A new point inside the cone lets the pending point go. A new
+        point outside it, closer to the anchor than an unstored point (so
+        none would lie past the segment's end), or keep_every_s after the
+        anchor stores the pending point, which becomes the new anchor. Every
+        dropped point is then within tolerance of the segment between the
+        stored points around it.
+        """
+        points = points[np.argsort(points['track_id'])]
+        ids = points['track_id']
+
+        # Tracks that are gone: their last position ends the trajectory
+        ended = ~np.isin(self._track_ids, ids, assume_unique=True)
+        self._write(self._pending[ended & self._has_pending])
+        live = ~ended
+        track_ids, anchor, pending = self._track_ids[live], self._anchor[live], self._pending[live]
+        has_pending, center, half = self._has_pending[live], self._center[live], self._half[live]
+        reach = self._reach[live]
+
+        # Existing tracks of this frame
+        slot = np.searchsorted(track_ids, ids)
+        known = slot < len(track_ids)
+        known[known] = track_ids[slot[known]] == ids[known]
+        slot = slot[known]
+        new = points[known]
+
+        # Pending points that must be stored: the new point leaves the cone, falls short of the
+        # unstored points, or the anchor is too old
+        direction, distance = _direction(anchor[slot], new)
+        far = distance > self.tolerance_m
+        outside = far & (np.abs(_wrap(direction - center[slot])) > half[slot])
+        short = distance < reach[slot]
+        stale = new['timestamp'] - anchor[slot]['timestamp'] > self.keep_every_s
+        store = has_pending[slot] & (outside | short | stale)
+        self._write(pending[slot[store]])
+        anchor[slot[store]] = pending[slot[store]]
+        center[slot[store]], half[slot[store]] = 0.0, np.pi
+
+        # Narrow each cone to the directions that also pass near the new point
+        direction[store], distance[store] = _direction(anchor[slot[store]], new[store])
+        center[slot], half[slot] = _narrow(center[slot], half[slot], direction, distance, self.tolerance_m)
+        # Points within tolerance of the anchor are near the segment whatever its length
+        reach[slot] = np.where(store, 0.0, reach[slot])
+        reach[slot] = np.where(distance > self.tolerance_m, np.maximum(reach[slot], distance), reach[slot])
+        pending[slot] = new
+        has_pending[slot] = True
+
+        # New tracks: the first point is stored right away
+        first = points[~known]
+        self._write(first)
+
+        self._track_ids = np.concatenate([track_ids, first['track_id']])
+        self._anchor = np.concatenate([anchor, first])
+        self._pending = np.concatenate([pending, first])
+        self._has_pending = np.concatenate([has_pending, np.zeros(len(first), dtype=bool)])
+        self._center = np.concatenate([center, np.zeros(len(first))])
+        self._half = np.concatenate([half, np.full(len(first), np.pi)])
+        self._reach = np.concatenate([reach, np.zeros(len(first))])
+        if len(first) and len(track_ids) and first['track_id'][0] < track_ids[-1]:
+            order = np.argsort(self._track_ids)
+            self._track_ids, self._anchor, self._pending = \
+                self._track_ids[order], self._anchor[order], self._pending[order]
+            self._has_pending, self._center, self._half, self._reach = \
+                self._has_pending[order], self._center[order], self._half[order], self._reach[order]
+
+    def _write(self, points):
+        """Buffer rows, sealing chunks as they fill."""
+        while len(points):
+            k = min(len(points), self.chunk_rows - self._buffered)
+            self._buffer[self._buffered:self._buffered + k] = points[:k]
+            self._buffered += k
+            points = points[k:]
+            if self._buffered == self.chunk_rows:
+                self._seal()
+
+    def _seal(self):
+        """Write the buffered rows as a chunk: columns and cells first, then the chunk record."""
+        if self._buffered == 0:
+            return
+        rows = self._buffer[:self._buffered]
+        for name in POINT_DTYPE.names:
+            with open(self.root / f"{name}.bin", 'ab') as f:
+                f.write(np.ascontiguousarray(rows[name]).tobytes())
+
+        cells = np.unique(self._cell_keys(rows['x'], rows['y']))
+        cell_records = np.empty(len(cells), dtype=CELL_DTYPE)
+        cell_records['cx'], cell_records['cy'] = np.divmod(cells, 1 << 32)
+        cell_records['cx'] -= 1 << 30
+        cell_records['cy'] -= 1 << 30
+        with open(self.root / CELLS_NAME, 'ab') as f:
+            f.write(cell_records.tobytes())
+
+        record = np.zeros(1, dtype=CHUNK_DTYPE)
+        record['start'], record['count'] = self.rows, len(rows)
+        record['t_min'], record['t_max'] = rows['timestamp'].min(), rows['timestamp'].max()
+        record['id_min'], record['id_max'] = rows['track_id'].min(), rows['track_id'].max()
+        record['x_min'], record['x_max'] = rows['x'].min(), rows['x'].max()
+        record['y_min'], record['y_max'] = rows['y'].min(), rows['y'].max()
+        record['cells_start'], record['cells_count'] = len(self._cells), len(cell_records)
+        with open(self.root / CHUNKS_NAME, 'ab') as f:
+            f.write(record.tobytes())
+
+        self.chunks = np.concatenate([self.chunks, record])
+        self._cells = np.concatenate([self._cells, cell_records])
+        self._cell_chunk = np.concatenate([self._cell_chunk, np.full(len(cell_records), len(self.chunks) - 1)])
+        self.rows += len(rows)
+        self._buffered = 0
+
+    def _cell_keys(self, x, y):
+        """One int64 per floor cell (offset so negative cells pack too)."""
+        cx = np.floor(x / self.cell_m).astype(np.int64) + (1 << 30)
+        cy = np.floor(y / self.cell_m).astype(np.int64) + (1 << 30)
+        return cx * (1 << 32) + cy
+
+    def flush(self):
+        """
+        Write the buffered rows to disk now (as a short chunk).
+
+        Points still held back by simplification are kept until their track
+        moves, ends, or the store is closed.
+        """
+        self._seal()
+
+    def close(self):
+        """Store every track's last position and seal the final chunk."""
+        if self.closed:
+            return
+        self._write(self._pending[self._has_pending])
+        self._track_ids = self._track_ids[:0]
+        self._seal()
+        self._maps = None
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def _columns(self):
+        """Memory maps of the sealed columns (remapped when chunks were added)."""
+        if self._maps is None or len(self._maps['track_id']) != self.rows:
+            self._maps = {name: np.memmap(self.root / f"{name}.bin", dtype=POINT_DTYPE[name], mode='r',
+                                          shape=(self.rows,)) if self.rows else np.zeros(0, POINT_DTYPE[name])
+                          for name in POINT_DTYPE.names}
+        return self._maps
+
+    def candidate_chunks(self, t0=None, t1=None, rect=None, track_ids=None):
+        """
+        Chunks whose zone map can match a query (the chunk index only, no rows read).
+
+        Args:
+            t0, t1: Time range (seconds, inclusive; None = open)
+            rect: Floor rectangle (x0, y0, x1, y1) in meters, or None
+            track_ids: Track ids, or None for all
+
+        Returns:
+            Indices into self.chunks
+        """
+        chunks = self.chunks
+        match = np.ones(len(chunks), dtype=bool)
+        if t0 is not None:
+            match &= chunks['t_max'] >= t0
+        if t1 is not None:
+            match &= chunks['t_min'] <= t1
+        if track_ids is not None:
+            track_ids = np.asarray(track_ids)
+            match &= (chunks['id_max'] >= track_ids.min()) & (chunks['id_min'] <= track_ids.max())
+        if rect is not None:
+            x0, y0, x1, y1 = rect
+            match &= (chunks['x_max'] >= x0) & (chunks['x_min'] <= x1) & \
+                     (chunks['y_max'] >= y0) & (chunks['y_min'] <= y1)
+
+            # Then the floor cells each remaining chunk touches
+            cx0, cy0 = int(np.floor(x0 / self.cell_m)), int(np.floor(y0 / self.cell_m))
+            cx1, cy1 = int(np.floor(x1 / self.cell_m)), int(np.floor(y1 / self.cell_m))
+            cells = self._cells
+            inside = (cells['cx'] >= cx0) & (cells['cx'] <= cx1) & (cells['cy'] >= cy0) & (cells['cy'] <= cy1)
+            touched = np.zeros(len(chunks), dtype=bool)
+            touched[self._cell_chunk[inside]] = True
+            match &= touched
+        return np.flatnonzero(match)
+
+    def query(self, t0=None, t1=None, rect=None, track_ids=None):
+        """
+        Stored points in a time range and floor rectangle.
+
+        Args:
+            t0, t1: Time range (seconds, inclusive; None = open)
+            rect: Floor rectangle (x0, y0, x1, y1) in meters, or None
+            track_ids: Track ids, or None for all
+
+        Returns:
+            POINT_DTYPE array sorted by timestamp
+        """
+        columns = self._columns()
+        parts = []
+        for chunk in self.candidate_chunks(t0, t1, rect, track_ids):
+            rows = slice(int(self.chunks['start'][chunk]), int(self.chunks['start'][chunk] + self.chunks['count'][chunk]))
+            chunk_columns = {name: columns[name][rows] for name in POINT_DTYPE.names}
+            parts.append(_select(chunk_columns, t0, t1, rect, track_ids))
+
+        # Rows not sealed yet
+        buffered = self._buffer[:self._buffered]
+        parts.append(_select({name: buffered[name] for name in POINT_DTYPE.names}, t0, t1, rect, track_ids))
+
+        points = np.concatenate(parts)
+        return points[np.argsort(points['timestamp'], kind='stable')]
+
+    def tracks_in(self, t0=None, t1=None, rect=None):
+        """
+        Ids of the tracks seen in a floor rectangle during a time range.
+
+        Args:
+            t0, t1: Time range (seconds, inclusive; None = open)
+            rect: Floor rectangle (x0, y0, x1, y1) in meters, or None
+
+        Returns:
+            Sorted array of track ids
+        """
+        return np.unique(self.query(t0, t1, rect)['track_id'])
+
+    def trajectory(self, track_id, t0=None, t1=None):
+        """
+        One track's stored points.
+
+        Args:
+            track_id: Track id
+            t0, t1: Time range (seconds, inclusive; None = open)
+
+        Returns:
+            POINT_DTYPE array sorted by timestamp
+        """
+        return self.query(t0, t1, track_ids=[track_id])
+
+
+def _select(columns, t0, t1, rect, track_ids):
+    """Rows of one chunk's columns that match a query, as a POINT_DTYPE array."""
+    match = np.ones(len(columns['timestamp']), dtype=bool)
+    if t0 is not None:
+        match &= columns['timestamp'] >= t0
+    if t1 is not None:
+        match &= columns['timestamp'] <= t1
+    if rect is not None:
+        x0, y0, x1, y1 = rect
+        x, y = columns['x'], columns['y']
+        match &= (x >= x0) & (x <= x1) & (y >= y0) & (y <= y1)
+    if track_ids is not None:
+        match &= np.isin(columns['track_id'], track_ids)
+
+    index = np.flatnonzero(match)
+    points = np.empty(len(index), dtype=POINT_DTYPE)
+    for name in POINT_DTYPE.names:
+        points[name] = columns[name][index]
+    return points
+
+
+def _wrap(angle):
+    """Angles wrapped to [-pi, pi)."""
+    return (angle + np.pi) % (2 * np.pi) - np.pi
+
+
+def _direction(origin, points):
+    """Floor direction (radians) and distance from origin to points (POINT_DTYPE arrays)."""
+    dx = points['x'].astype(np.float64) - origin['x']
+    dy = points['y'].astype(np.float64) - origin['y']
+    return np.arctan2(dy, dx), np.hypot(dx, dy)
+
+
+def _narrow(center, half, direction, distance, tolerance):
+    """
+    Intersect direction cones with the cones of lines passing within tolerance of new points.
+
+    Points within tolerance of the anchor leave their cone unchanged.
+
+    Returns:
+        (center, half width) of the narrowed cones
+    """
+    constrains = distance > tolerance
+    width = np.arcsin(np.minimum(tolerance / np.maximum(distance, tolerance), 1.0))
+    offset = _wrap(direction - center)
+    low = np.maximum(-half, offset - width)
+    high = np.minimum(half, offset + width)
+    # An empty intersection only happens for points outside the cone, which were just made anchors
+    high = np.maximum(high, low)
+    return (np.where(constrains, center + (low + high) / 2, center),
+            np.where(constrains, (high - low) / 2, half))
@@ -7,105 +7,482 @@ Date: February 9, 2026
 Purpose: Build Overhead Camera class. Demonstrate world coordinate system transformation
 """
 import sys
+import time
+from pathlib import Path
 
-import pyrealsense2 as rs
 import numpy as np
 import cv2
 
+# Make the repository root importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'xy_transform'))
+from src.utils.frame_buffer import FrameRingBuffer, CaptureThread
+from src.data.frame_source import RealSenseFrameSource, open_frame_source
+from src.utils.deprojection import get_ray_table, get_cropped_ray_table
+from src.utils.profiling import get_profiler
+from src.utils.roi import BEST_ACCURACY_ROI
+from src.utils.foreground import FloorBackground, camera_pose
+from src.utils.blobs import BlobExtractor, draw_blobs
+from src.utils.tracker import MultiObjectTracker
+from src.data.trajectory_store import TrajectoryStore
+from src.utils.zones import ZoneMap, load_zones
+
 """SET DESIRED RESOLUTION"""
 """Suggested: 640x480, 848x480, 1280x720"""
 resolution_width = 1280
 resolution_height = 720
 
+"""SET FRAME SOURCE"""
+"""None: live camera, 'synthetic': generated scene, or path to a recording"""
+frame_source = None
+
+"""SET CAPTURE MODE"""
+"""True: background thread captures into a ring buffer, False: capture inline"""
+"""Buffer policy: 'latest' (latest-wins) or 'keep_n' (keep last buffer_size frames)"""
+capture_threaded = False
+buffer_policy = 'latest'
+buffer_size = 1
+
+"""SET STAGE PROFILING"""
+"""True: time each stage (read, align, overlay, imshow...) and save p50/p95/p99 on shutdown"""
+profile_stages = False
+
+"""SET CAMERA POSE"""
+"""Height above the floor (meters) and tilt (degrees), as measured for xy_transform/calibration_click_tool.py"""
+camera_height_m = 2.21
+camera_pitch_deg = 3.0
+camera_roll_deg = 0.0
+camera_yaw_deg = 0.0
+
+"""SET FOREGROUND SEGMENTATION"""
+"""Learn the empty floor for background_frames frames (0 = off), then highlight anything"""
+"""more than foreground_threshold_m above it. Keep the workspace empty while learning"""
+background_frames = 0
+foreground_threshold_m = 0.05
+
+"""SET OBJECT TRACKING"""
+"""Follow segmented objects over frames (needs foreground segmentation). A detection joins a track"""
+"""within track_gate_m of its predicted position; tracks end after track_max_missed frames unseen"""
+track_objects = True
+track_gate_m = 0.5
+track_max_missed = 15
+
+"""SET TRAJECTORY RECORDING"""
+"""Directory to append confirmed tracks to (None = off), e.g. 'data/trajectories'. Points within"""
+"""trajectory_tolerance_m of a straight path are dropped (None = keep every frame)"""
+trajectory_dir = None
+trajectory_tolerance_m = 0.02
+
+"""SET ZONES"""
+"""JSON file of floor polygons in world meters to watch (None = off), see src/utils/zones.py."""
+"""Needs foreground segmentation; an alert is printed when an object enters a zone"""
+zones_file = None
+
 
 class OverheadPerceptor:
 
 
-    def __init__(self):
-
-        # Initialize d435i camera
-        self.pipeline = rs.pipeline()
-        self.config = rs.config()
-
-        # Configure color and depth streams - resolution_width x resolution_height
-        self.config.enable_stream(rs.stream.depth, resolution_width, resolution_height, rs.format.z16, 30)
-        self.config.enable_stream(rs.stream.color, resolution_width, resolution_height, rs.format.bgr8, 30)
-
-        '''
-        Attempts to start the pipeline
-        Catch exceptions (e.g., Camera not connected, camera not initialized)
-        Exit program if unable to start the pipeline
-        '''
-        try:
-            self.profile = self.pipeline.start(self.config)
-            print("Camera initialized")
-        except RuntimeError as e:
-            if "No device connected" in str(e):
-                print("Camera not found.")
-                print("Check if camera is connected and try again.")
-                print("Closing program...")
-                sys.exit(1)
-            else:
-                print(f"Camera runtime error: {e}")
-                print("Closing program...")
-                sys.exit(1)
-        except Exception as e:
-            print(f"Camera not initialized. Error: {e}")
-            print("Closing program...")
-            sys.exit(1)
+    def __init__(self, source=None, threaded=False, policy='latest', capacity=1, profile=False,
+                 max_warmup_frames=90, roi=BEST_ACCURACY_ROI):
+        """
+        Initialize camera.
+
+        Args:
+            source: FrameSource to read from (None = live d435i camera)
+            threaded: If True, capture on a background thread into a ring buffer
+            policy: Ring buffer policy ('latest' or 'keep_n')
+            capacity: Number of frames held by the ring buffer
+            profile: If True, record per-stage timings (saved on shutdown)
+            max_warmup_frames: Upper bound on warm-up frames (stops early once exposure and depth settle)
+            roi: ProcessingROI of the area to process (default: 10%-90% area of best accuracy);
+                 segmentation and blobs only see depth inside it (None = full frame)
+
+        Raises:
+            RuntimeError: If the frame source cannot be started (e.g., camera not connected)
+        """
+
+        # Initialize d435i camera unless another source was given
+        if source is None:
+            source = RealSenseFrameSource(resolution_width, resolution_height, 30)
+        self.source = source
 
+        # Start the source (raises RuntimeError if the camera is not connected)
+        self.source.start()
+        print("Camera initialized")
 
-        # Get device and sensors
-        self.device = self.profile.get_device()
-        self.depth_sensor = self.device.first_depth_sensor()
-        self.depth_scale = self.depth_sensor.get_depth_scale()
+        self.depth_scale = self.source.depth_scale
 
         # Get intrinsics (will populate after first frame)
         self.depth_intrinsics = None
         self.color_intrinsics = None
 
-        # Create alignment object (align depth to color)
-        self.align = rs.align(rs.stream.color)
+        # Area of the image to process (resolved to a window once the image size is known)
+        self.roi = roi
+        self.roi_window = None
 
         # Allow camera to warm up
-        print("Warming up camera for 3 seconds")
-        for _ in range (90):
-            self.pipeline.wait_for_frames()
+        if self.source.is_live:
+            print(f"Warming up camera (up to {max_warmup_frames} frames)")
+        self.source.warmup(max_warmup_frames)
+
+        # Load (or build and save) the ray table for aligned depth
+        get_ray_table(self.source.color_intrinsics)
+
+        # Stage timings (enabled after warm-up so warm-up frames are not counted)
+        self.profiler = get_profiler()
+        if profile:
+            self.profiler.enable()
+
+        # Foreground segmentation (off until enable_segmentation())
+        self.transformer = None
+        self.background = None
+        self.blob_extractor = None
+        self.tracker = None
+        self.trajectories = None
+        self.zone_map = None
+        self._zone_occupied = None
+        self._zone_entries = set()
+
+        # Background capture (started after warm-up so it only sees good frames)
+        self.frame_buffer = None
+        self.capture_thread = None
+        if threaded:
+            self.start_capture_thread(policy=policy, capacity=capacity)
+
         print("Ready!")
 
+    def start_capture_thread(self, policy='latest', capacity=1):
+        """
+        Start a producer thread that captures, aligns and converts frames into a ring buffer.
+        After this, get_frame() reads from the buffer and never waits on the camera.
+
+        Args:
+            policy: 'latest' (latest-wins) or 'keep_n' (keep last N frames in order)
+            capacity: Number of frames held by the ring buffer.
+                      Held frames keep their SDK buffers alive, so keep this small (<= 8)
+        """
+        if self.capture_thread is not None:
+            return
+
+        self.frame_buffer = FrameRingBuffer(capacity=capacity, policy=policy)
+        self.capture_thread = CaptureThread(self._capture_frame, self.frame_buffer,
+                                            finished_fn=lambda: self.source.finished)
+        self.capture_thread.start()
+        print(f"Capture thread started ({policy}, {capacity} frame buffer)")
+
+    def stop_capture_thread(self):
+        """Stop the producer thread and print its drop counters."""
+        if self.capture_thread is None:
+            return
+
+        self.capture_thread.stop()
+        stats = self.capture_thread.get_stats()
+        print(f"Capture thread stopped: {stats['produced']} captured ({stats['capture_fps']:.1f} FPS), "
+              f"{stats['consumed']} used, {stats['dropped']} dropped in buffer, "
+              f"{stats['sdk_frame_gaps']} lost by SDK")
+        self.capture_thread = None
+
+    def get_capture_stats(self):
+        """
+        Get capture thread counters (drops, sequence numbers, capture FPS).
+
+        Returns:
+            dict of counters or None if not running threaded
+        """
+        if self.capture_thread is None:
+            return None
+        return self.capture_thread.get_stats()
+
     def get_frame(self):
         """
         Capture and process frames.
+        In threaded mode, returns a buffered frame without blocking: the most
+        recent one under policy 'latest', the oldest unread one under 'keep_n'
+        (or the last one read again when all have been read).
+        Returns:
+            dict with color_image, depth_image, depth_frame, color_frame,
+            frame_number, timestamp and sequence (threaded mode only), or
+            None when no frame is available (e.g. the recording has ended
+            and every buffered frame has been read)
+        """
+        if self.capture_thread is not None:
+            if self.capture_thread.error is not None:
+                raise RuntimeError(f"Capture thread failed: {self.capture_thread.error}")
+
+            # End of a recording: hand out what is still buffered, then nothing
+            if self.capture_thread.finished and self.frame_buffer.unread_count() == 0:
+                return None
+
+            buffered = None
+            if self.frame_buffer.policy == 'keep_n':
+                buffered = self.frame_buffer.get_next()
+            if buffered is None:
+                buffered = self.frame_buffer.get_latest()
+            if buffered is None:
+                return None
+            return buffered[1]
+
+        with self.profiler.stage('get_frame'):
+            return self._capture_frame()
+
+    def _capture_frame(self):
+        """
+        Read one aligned frame from the source.
         Returns:
-            dict with color_image, depth_image, depth_frame, color_frame
+            dict with color_image, depth_image, depth_frame, color_frame, frame_number, timestamp
         """
 
-        frames = self.pipeline.wait_for_frames()
+        # Depth is aligned to color by the source
+        frame = self.source.read(aligned=True)
+        if frame is None:
+            return None
+
+        # Store intrinsics on first frame
+        if self.depth_intrinsics is None:
+            self.depth_intrinsics = frame['depth_intrinsics']
+            self.color_intrinsics = frame['color_intrinsics']
 
-        # Align depth to color
-        aligned_frame = self.align.process(frames)
+        return frame
 
-        depth_frame = aligned_frame.get_depth_frame()
-        color_frame = aligned_frame.get_color_frame()
+    def enable_segmentation(self, transformer, learn_frames=30, threshold_m=0.05):
+        """
+        Learn the empty floor and segment everything above it from then on.
 
-        if not depth_frame or not color_frame:
+        Args:
+            transformer: CoordinateTransformer with the camera pose (intrinsics
+                         are set from the aligned stream if missing)
+            learn_frames: Frames of the empty workspace to learn from
+            threshold_m: Minimum height above the floor to count as foreground
+        """
+        print(f"Learning empty floor ({learn_frames} frames) - keep the workspace clear...")
+        frames = []
+        while len(frames) < learn_frames:
+            frame = self.get_frame()
+            if frame is None:
+                if self.source.finished:
+                    break
+                continue
+            # Threaded mode can return the same buffered frame again
+            if frames and frame['frame_number'] == frames[-1]['frame_number']:
+                continue
+            frames.append(frame)
+            if transformer.intrinsics is None:
+                # Depth is aligned to color
+                transformer.set_intrinsics(self.color_intrinsics)
+
+        if not frames:
+            print("No frames to learn the floor from; segmentation is off")
+            return
+
+        self.transformer = transformer
+        intrinsics, rotation, position = camera_pose(transformer)
+        if self.roi is not None:
+            # Cropped intrinsics; the ray table is cut from the full one
+            self.roi_window = self.roi.window((intrinsics.height, intrinsics.width))
+            window = self.roi_window
+            intrinsics = get_cropped_ray_table(intrinsics, window.x, window.y, window.width, window.height).intrinsics
+        self.background = FloorBackground(intrinsics, rotation, position[2], self.depth_scale, threshold_m=threshold_m)
+        for frame in frames:
+            self.background.learn(self.crop_to_roi(frame['depth_image']))
+        self.background.finish_learning()
+        self.blob_extractor = BlobExtractor(intrinsics, rotation, position, self.depth_scale)
+        print(f"Floor learned from {len(frames)} frames; foreground = more than {threshold_m * 100:.0f} cm above it")
+
+    def crop_to_roi(self, depth_image):
+        """
+        Depth inside the processing ROI, the image the per-frame stages work on.
+
+        Args:
+            depth_image: HxW uint16 aligned depth image
+
+        Returns:
+            Crop to the ROI window (a view; a zeroed-outside copy for polygons),
+            or depth_image itself before segmentation is enabled or without a ROI
+        """
+        window = self.roi_window
+        if window is None:
+            return depth_image
+        depth_image = window.crop(depth_image)
+        if window.mask is not None:
+            depth_image = depth_image.copy()
+            window.clear_outside(depth_image)
+        return depth_image
+
+    def roi_view(self, image):
+        """
+        The part of a full-size image (e.g. the display) that masks of the ROI crop line up with.
+
+        Args:
+            image: HxW or HxWxC full-size image
+
+        Returns:
+            View of image
+        """
+        return image if self.roi_window is None else self.roi_window.crop(image)
+
+    def segment_foreground(self, depth_image):
+        """
+        Foreground mask of an aligned depth image (and update the floor model with it).
+
+        Args:
+            depth_image: Aligned depth image cropped with crop_to_roi()
+
+        Returns:
+            Bool mask of the crop, or None if segmentation is off
+        """
+        if self.background is None:
             return None
+        with self.profiler.stage('segment'):
+            return self.background.process(depth_image)
 
-        # Store intrinsics on first frame
-        if self.depth_intrinsics is None:
-            self.depth_intrinsics = depth_frame.profile.as_video_stream_profile().intrinsics
-            self.color_intrinsics = color_frame.profile.as_video_stream_profile().intrinsics
+    def extract_blobs(self, depth_image, foreground):
+        """
+        World-space blobs (objects) of a foreground mask.
 
-        # Convert to numpy arrays
-        depth_image = np.asanyarray(depth_frame.get_data())
-        color_image = np.asanyarray(color_frame.get_data())
+        Args:
+            depth_image: Aligned depth image cropped with crop_to_roi()
+            foreground: Mask from segment_foreground()
 
-        return {
-            "color_frame": color_frame,
-            "depth_frame": depth_frame,
-            "color_image": color_image,
-            "depth_image": depth_image,
-        }
+        Returns:
+            BLOB_DTYPE structured array (one row per blob, bboxes in full image
+            pixels), or None if segmentation is off
+        """
+        if self.blob_extractor is None or foreground is None:
+            return None
+        with self.profiler.stage('blobs'):
+            blobs = self.blob_extractor.extract(foreground, depth_image)
+            if self.roi_window is not None:
+                blobs['bbox'][:, :2] += (self.roi_window.x, self.roi_window.y)
+        return blobs
+
+    def enable_tracking(self, gate_m=0.5, max_missed=15, capacity=256):
+        """
+        Track extracted blobs over frames (constant-velocity Kalman filter per object).
+
+        Args:
+            gate_m: Maximum distance between a track's predicted position and its detection (meters)
+            max_missed: Frames a track survives without a detection
+            capacity: Maximum number of simultaneous tracks
+        """
+        self.tracker = MultiObjectTracker(capacity=capacity, gate_m=gate_m, max_missed=max_missed)
+        self._continue_track_ids()
+
+    def _continue_track_ids(self):
+        """Number new tracks after the ones already in the trajectory store (ids restart at 1 per session)."""
+        if self.tracker is not None and self.trajectories is not None:
+            self.tracker.next_id = max(self.tracker.next_id, self.trajectories.max_track_id + 1)
+
+    def track_blobs(self, blobs, timestamp_ms):
+        """
+        Update the tracks with a frame's blobs.
+
+        Args:
+            blobs: BLOB_DTYPE array from extract_blobs()
+            timestamp_ms: Frame timestamp (milliseconds)
+
+        Returns:
+            TRACK_DTYPE array of confirmed tracks, or None if tracking is off.
+            self.tracker.detection_ids gives the track id of each blob
+        """
+        if self.tracker is None or blobs is None:
+            return None
+        with self.profiler.stage('track'):
+            tracks = self.tracker.step(blobs['centroid'][:, :2], timestamp_ms / 1000.0, heights=blobs['max_height'])
+        if self.trajectories is not None:
+            with self.profiler.stage('trajectories'):
+                positions = np.column_stack([tracks['position'], tracks['height']])
+                self.trajectories.append(tracks['id'], timestamp_ms / 1000.0, positions)
+        return tracks
+
+    def enable_trajectory_recording(self, root, tolerance_m=0.02):
+        """
+        Append every frame's confirmed tracks to a trajectory store.
+
+        Rows are (track id, timestamp in seconds, x, y, object height), all in meters.
+        Track ids continue after the largest id already stored, so a reopened
+        store never merges objects of different sessions into one track.
+
+        Args:
+            root: Store directory (appended to if it exists)
+            tolerance_m: Simplification tolerance (meters), None to keep every frame
+        """
+        self.trajectories = TrajectoryStore(root, tolerance_m=tolerance_m)
+        self._continue_track_ids()
+        print(f"Recording trajectories to {self.trajectories.root} ({len(self.trajectories)} points stored, "
+              f"new tracks from id {self.trajectories.max_track_id + 1})")
+
+    def enable_zones(self, zones, plane_height_m=0.0):
+        """
+        Watch floor zones (needs enable_segmentation() first, for the camera pose).
+
+        The zone label maps follow the transformer: they are rebuilt when its
+        pose changes (e.g. update_tilt).
+
+        Args:
+            zones: List of Zone (world-frame floor polygons)
+            plane_height_m: Height of the plane pixels are mapped through (0 = floor)
+        """
+        if self.transformer is None:
+            print("⚠ Zones need foreground segmentation (camera pose); zones are off")
+            return
+        self.zone_map = ZoneMap(zones, self.transformer, plane_height_m=plane_height_m)
+        self._zone_occupied = np.zeros(len(zones), dtype=bool)
+        print(f"Watching {len(zones)} zones: {', '.join(self.zone_map.names)}")
+
+    def check_zones(self, blobs, tracks=None):
+        """
+        Zone occupancy of this frame's objects, printing an alert for each entry.
+
+        With tracking, each track is alerted once per entry into a zone;
+        without it, a zone alerts when it becomes occupied.
+
+        Args:
+            blobs: BLOB_DTYPE array from extract_blobs()
+            tracks: Optional TRACK_DTYPE array from track_blobs()
+
+        Returns:
+            Bool array (occupied per zone), or None if zones are off
+        """
+        if self.zone_map is None or blobs is None:
+            return None
+        with self.profiler.stage('zones'):
+            if tracks is not None:
+                labels = self.zone_map.lookup(tracks['position'])
+                entries = {(int(track_id), int(label)) for track_id, label in zip(tracks['id'], labels) if label}
+                for track_id, label in sorted(entries - self._zone_entries):
+                    print(f"⚠ Zone '{self.zone_map.names[label - 1]}': object #{track_id} entered")
+                self._zone_entries = entries
+            else:
+                labels = self.zone_map.lookup(blobs['centroid'])
+
+            occupied = np.zeros(len(self.zone_map), dtype=bool)
+            occupied[labels[labels > 0] - 1] = True
+            if tracks is None:
+                for index in np.flatnonzero(occupied & ~self._zone_occupied):
+                    print(f"⚠ Zone '{self.zone_map.names[index]}': occupied")
+            self._zone_occupied = occupied
+        return occupied
+
+    def zone_pixels(self, blobs):
+        """
+        Pixels of the objects standing in a zone, for display.
+
+        Membership is the zone under each blob's measured centroid; the zone
+        pixel map would give the top of a tall object the zone of the floor
+        behind it.
+
+        Args:
+            blobs: BLOB_DTYPE array from extract_blobs()
+
+        Returns:
+            Bool mask of the ROI crop, or None if zones are off
+        """
+        if self.zone_map is None or blobs is None:
+            return None
+        labels = self.blob_extractor.labels
+        in_zone = np.zeros(int(labels.max()) + 1, dtype=bool)
+        in_zone[blobs['label'][self.zone_map.lookup(blobs['centroid']) > 0]] = True
+        return in_zone[labels]
 
     def pixel_to_3d_point(self, pixel_x, pixel_y, depth_value):
         """
@@ -119,12 +496,8 @@ class OverheadPerceptor:
 
         depth_m = depth_value * self.depth_scale
 
-        # Use intrinsic parameters to deproject
-        point_3d = rs.rs2_deproject_pixel_to_point(
-            self.depth_intrinsics,
-            [pixel_x, pixel_y],
-            depth_m
-        )
+        # Use the cached ray table for these intrinsics to deproject
+        point_3d = get_ray_table(self.depth_intrinsics).deproject_pixel(pixel_x, pixel_y, depth_m)
 
         return point_3d
 
@@ -134,9 +507,16 @@ class OverheadPerceptor:
         print("\n")
         print("="*60)
         print("Click in image to view world coordinates")
-        print("Red border defines area of best accuracy")
+        print("Red border defines area of best accuracy (processing ROI; objects are only detected inside it)")
         print("Red crosshairs are center of image")
-        print(f"Current resolution: {resolution_width}x{resolution_height}")
+        print(f"Current resolution: {self.source.width}x{self.source.height}")
+        if self.background is not None:
+            print("Green: foreground (above the learned floor)")
+            print("Yellow boxes: objects, labeled with world (x, y) and height in cm")
+            if self.zone_map is not None:
+                print("Red outlines: zones (thick when occupied); objects standing in a zone turn yellow")
+            if self.tracker is not None:
+                print("#N: track id (stays with the object while it is followed)")
         print("="*60)
 
         # Mouse callback
@@ -152,18 +532,56 @@ class OverheadPerceptor:
         cv2.namedWindow('World Coordinates')
         cv2.setMouseCallback('World Coordinates', mouse_callback)
 
+        last_sequence = None
+        # Frame the perception results below belong to (a click redraws it without re-running them)
+        processed_key = None
+
         while True:
 
             frames_data = self.get_frame()
             if frames_data is None:
+                if self.source.finished:
+                    print("\nEnd of recording.")
+                    break
                 continue
 
+            # Threaded mode: don't redraw the same buffered frame, just service the window
+            if frames_data.get('sequence') is not None and not clicked_point['new']:
+                if frames_data['sequence'] == last_sequence:
+                    if cv2.waitKey(1) & 0xFF == ord('q'):
+                        break
+                    continue
+                last_sequence = frames_data['sequence']
+
             depth_image = frames_data['depth_image']
             color_image = frames_data['color_image']
 
+            # Everything standing above the floor, once per frame: tracks and trajectories
+            # must not see the same frame twice
+            frame_key = (frames_data.get('sequence'), frames_data['timestamp'])
+            if frame_key != processed_key:
+                roi_depth = self.crop_to_roi(depth_image)
+                foreground = self.segment_foreground(roi_depth)
+                blobs = self.extract_blobs(roi_depth, foreground)
+                tracks = self.track_blobs(blobs, frames_data['timestamp'])
+                occupied = self.check_zones(blobs, tracks)
+                track_ids = None if tracks is None else self.tracker.detection_ids
+                zone_pixels = self.zone_pixels(blobs)
+                processed_key = frame_key
+
+            overlay_start = time.perf_counter()
+
             # Copy image for visualization
             vis = color_image.copy()
 
+            if foreground is not None:
+                # The mask covers the processing ROI only
+                roi_vis = self.roi_view(vis)
+                roi_vis[..., 1][foreground] = 255
+                if zone_pixels is not None:
+                    roi_vis[..., 2][zone_pixels] = 255
+                draw_blobs(vis, blobs, track_ids=track_ids)
+
             # Show coordinates when image clicked
             if clicked_point['x'] is not None:
                 px, py = clicked_point['x'], clicked_point['y']
@@ -225,19 +643,29 @@ class OverheadPerceptor:
             cv2.putText(vis, "Click to measure 3D coordinates | 'q' quit",
                         (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
 
+            # Show capture thread counters
+            stats = self.get_capture_stats()
+            if stats is not None:
+                cv2.putText(vis, f"Seq: {frames_data['sequence']} | Capture FPS: {stats['capture_fps']:.1f} | "
+                                 f"Dropped: {stats['dropped']} | SDK lost: {stats['sdk_frame_gaps']}",
+                            (10, 55), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+
             # Show center of image
-            center_x = int(resolution_width/2)
-            center_y = int(resolution_height/2)
+            frame_height, frame_width = vis.shape[:2]
+            center_x = int(frame_width/2)
+            center_y = int(frame_height/2)
             cv2.drawMarker(vis, (center_x, center_y), (0, 0, 255),
                            cv2.MARKER_CROSS, 20, 2)
 
-            # Show rectangle of best accuracy
-            start_pt1 = (int(resolution_width * .1), int(resolution_height * .1))
-            end_pt1 = (int(resolution_width * .9), int(resolution_height * .9))
-            cv2.rectangle(vis, start_pt1, end_pt1, (0, 0, 255), 2)
-
+            # Show area of best accuracy
+            if self.roi is not None:
+                self.roi.draw(vis)
+            if self.zone_map is not None:
+                self.zone_map.draw(vis, occupied=occupied)
+            self.profiler.record('overlay', time.perf_counter() - overlay_start)
 
-            cv2.imshow('World Coordinates', vis)
+            with self.profiler.stage('imshow'):
+                cv2.imshow('World Coordinates', vis)
 
             key = cv2.waitKey(1) & 0xFF
             if key == ord('q'):
@@ -248,7 +676,13 @@ class OverheadPerceptor:
     def shutdown(self):
         """Stop camera pipeline."""
         print("\nShutting down camera...")
-        self.pipeline.stop()
+        self.stop_capture_thread()
+        self.source.stop()
+        if self.trajectories is not None:
+            self.trajectories.close()
+            print(f"Trajectories: {self.trajectories.points_received} track points received, "
+                  f"{len(self.trajectories)} stored in {self.trajectories.root}")
+        self.profiler.finish('overhead_perceptor')
         print("Done!")
 
 
@@ -258,9 +692,35 @@ if __name__=="__main__":
     print("="*60)
 
     print("Initializing camera...")
-    perceptor = OverheadPerceptor()
+    try:
+        perceptor = OverheadPerceptor(
+            source=open_frame_source(frame_source, resolution_width, resolution_height, 30),
+            threaded=capture_threaded,
+            policy=buffer_policy,
+            capacity=buffer_size,
+            profile=profile_stages
+        )
+    except RuntimeError as e:
+        print(e)
+        print("Closing program...")
+        sys.exit(1)
 
     try:
+        if background_frames > 0:
+            from coordinate_transform import CoordinateTransformer
+            perceptor.enable_segmentation(
+                CoordinateTransformer(camera_height_m, pitch_deg=camera_pitch_deg,
+                                      roll_deg=camera_roll_deg, yaw_deg=camera_yaw_deg),
+                learn_frames=background_frames,
+                threshold_m=foreground_threshold_m
+            )
+            if track_objects:
+                perceptor.enable_tracking(gate_m=track_gate_m, max_missed=track_max_missed)
+                if trajectory_dir is not None:
+                    perceptor.enable_trajectory_recording(trajectory_dir, tolerance_m=trajectory_tolerance_m)
+            if zones_file is not None:
+                perceptor.enable_zones(load_zones(zones_file))
+
         perceptor.coordinate_transformation()
 
     except KeyboardInterrupt:
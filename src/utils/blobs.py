@@ -0,0 +1,165 @@
+"""
+World-Space Blob Extraction
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: Turn a foreground mask into per-object world measurements in one vectorized pass
+
+Connected components of the mask (cv2, 8-connected) are measured from the
+depth of their pixels, deprojected straight into the world frame with
+per-pixel world rays (the camera rotation folded into the ray table, as in
+WorldFrameCalibrator.depth_image_to_world_points). Every per-blob value is a
+grouped reduction over the foreground pixels (reduceat sums, minima and
+maxima over pixels sorted by blob), so the cost does not depend on how
+many blobs there are.
+
+Each frame's blobs are one structured array (BLOB_DTYPE), one row per blob.
+"""
+
+import cv2
+import numpy as np
+
+from src.utils.deprojection import get_ray_table
+from src.utils.foreground import camera_pose
+
+
+BLOB_DTYPE = np.dtype([
+    ('label', np.int32),         # Component label in the label image
+    ('pixel_count', np.int32),   # Foreground pixels with valid depth
+    ('centroid', np.float32, 3), # Mean world point (x, y, z), meters
+    ('min_xy', np.float32, 2),   # Floor footprint bounding box (meters)
+    ('max_xy', np.float32, 2),
+    ('max_height', np.float32),  # Highest world Z (meters)
+    ('bbox', np.int16, 4),       # Image bounding box of those pixels (x, y, width, height)
+])
+
+
+class BlobExtractor:
+    """
+    Connected-component blobs of a foreground mask, measured in the world frame.
+    """
+
+    def __init__(self, intrinsics, rotation, position, depth_scale, min_pixels=50, connectivity=8):
+        """
+        Set up world rays for one camera pose.
+
+        Args:
+            intrinsics: rs.intrinsics of the (aligned) depth image
+            rotation: 3x3 camera -> world rotation
+            position: Camera position in the world frame (meters)
+            depth_scale: Meters per depth unit
+            min_pixels: Smaller components are ignored (noise)
+            connectivity: 4 or 8
+        """
+        self.depth_scale = depth_scale
+        self.min_pixels = min_pixels
+        self.connectivity = connectivity
+
+        # World point = depth (units) * world_rays[:, v, u] + position; depth scale folded in
+        ray_table = get_ray_table(intrinsics)
+        A = np.asarray(rotation, dtype=np.float64) * depth_scale
+        self.world_rays = np.empty((3, intrinsics.height, intrinsics.width), dtype=np.float32)
+        for axis in range(3):
+            self.world_rays[axis] = ray_table.x * A[axis, 0] + ray_table.y * A[axis, 1] + A[axis, 2]
+        self._flat_rays = self.world_rays.reshape(3, -1)
+        self.position = np.asarray(position, dtype=np.float32)
+
+        self.labels = None
+
+    @classmethod
+    def from_transformer(cls, transformer, depth_scale, **kwargs):
+        """
+        Extractor for the pose of a CoordinateTransformer or WorldFrameCalibrator.
+
+        Args:
+            transformer: CoordinateTransformer (intrinsics set) or calibrated WorldFrameCalibrator
+            depth_scale: Meters per depth unit
+            **kwargs: Other BlobExtractor options
+
+        Returns:
+            BlobExtractor
+        """
+        intrinsics, rotation, position = camera_pose(transformer)
+        return cls(intrinsics, rotation, position, depth_scale, **kwargs)
+
+    def extract(self, mask, depth):
+        """
+        Measure every blob of a frame.
+
+        Args:
+            mask: HxW bool foreground mask
+            depth: HxW uint16 aligned depth image (zeros are excluded)
+
+        Returns:
+            Structured array of BLOB_DTYPE, one row per blob with at least
+            min_pixels valid pixels. self.labels holds the label image
+        """
+        # Labels only: cv2's per-component stats cost more than the reductions below
+        count, labels = cv2.connectedComponents(mask.view(np.uint8), connectivity=self.connectivity,
+                                                ltype=cv2.CV_32S)
+        self.labels = labels
+
+        pixels = np.flatnonzero(mask)
+        label = labels.ravel()[pixels]
+
+        # Component -> blob index (-1 = background or too small)
+        keep = np.bincount(label, minlength=count) >= self.min_pixels
+        keep[0] = False
+        num_blobs = int(np.count_nonzero(keep))
+        # int16 indices sort with radix sort, several times faster than int64
+        blob_of_label = np.full(count, -1, dtype=np.int16 if num_blobs < 32767 else np.int32)
+        blob_of_label[keep] = np.arange(num_blobs)
+
+        blob = blob_of_label[label]
+        z = depth.ravel()[pixels]
+        inside = (blob >= 0) & (z != 0)
+        pixels, blob, z = pixels[inside], blob[inside], z[inside].astype(np.float32)
+
+        # Sort pixels by blob so min/max are contiguous reductions
+        order = np.argsort(blob, kind='stable')
+        pixels, blob, z = pixels[order], blob[order], z[order]
+        points = self._flat_rays.take(pixels, axis=1)  # Several times faster than [:, pixels]
+        points *= z
+        points += self.position[:, None]
+
+        pixel_count = np.bincount(blob, minlength=num_blobs)
+        has_pixels = pixel_count > 0
+        blobs = np.zeros(int(np.count_nonzero(has_pixels)), dtype=BLOB_DTYPE)
+        if not len(blobs):
+            return blobs
+
+        counts = pixel_count[has_pixels]
+        starts = np.cumsum(counts) - counts
+        blobs['label'] = np.flatnonzero(keep)[has_pixels]
+        blobs['pixel_count'] = counts
+        for axis in range(3):
+            blobs['centroid'][:, axis] = np.add.reduceat(points[axis], starts, dtype=np.float64) / counts
+        blobs['min_xy'] = np.minimum.reduceat(points[:2], starts, axis=1).T
+        blobs['max_xy'] = np.maximum.reduceat(points[:2], starts, axis=1).T
+        blobs['max_height'] = np.maximum.reduceat(points[2], starts)
+
+        v, u = np.divmod(pixels, mask.shape[1])
+        u_min, v_min = np.minimum.reduceat(u, starts), np.minimum.reduceat(v, starts)
+        blobs['bbox'] = np.stack([u_min, v_min, np.maximum.reduceat(u, starts) - u_min + 1,
+                                  np.maximum.reduceat(v, starts) - v_min + 1], axis=1)
+        return blobs
+
+
+def draw_blobs(image, blobs, color=(0, 255, 255), track_ids=None):
+    """
+    Draw blob image boxes with world position and height, in place.
+
+    Args:
+        image: HxWx3 BGR image (same size as the mask)
+        blobs: BLOB_DTYPE array
+        color: BGR color
+        track_ids: Optional track id per blob, shown as #id (negative = not tracked)
+    """
+    if track_ids is None:
+        track_ids = np.full(len(blobs), -1)
+    for x, y, w, h, (cx, cy, _), height, track_id in zip(*blobs['bbox'].T, blobs['centroid'], blobs['max_height'],
+                                                         track_ids):
+        label = f"({cx * 100:.0f}, {cy * 100:.0f}) h{height * 100:.0f} cm"
+        if track_id >= 0:
+            label = f"#{track_id} {label}"
+        cv2.rectangle(image, (int(x), int(y)), (int(x + w), int(y + h)), color, 2)
+        cv2.putText(image, label, (int(x), max(int(y) - 5, 10)), cv2.FONT_HERSHEY_SIMPLEX, 0.45, color, 1)
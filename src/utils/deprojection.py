@@ -0,0 +1,342 @@
+"""
+Vectorized Deprojection
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: Deproject pixels with a cached per-pixel ray table instead of the SDK
+
+rs2_deproject_pixel_to_point() computes the same ray for a pixel every time
+it is called. For a fixed set of intrinsics, each pixel's ray (x/z, y/z)
+never changes, so a RayTable computes it once for the whole image.
+Deprojecting a pixel is then a table read plus a multiply by depth.
+
+Tables are keyed by a fingerprint of the intrinsics and saved as .npy files
+in data/processed/ray_tables, so after the first run they load instantly.
+
+Distortion is handled the same way as the SDK's rs2_deproject_pixel_to_point()
+(librealsense 2.5x): inverse Brown-Conrady and Brown-Conrady (10 fixed-point
+iterations each), Kannala-Brandt4 and F-Theta.
+"""
+
+import hashlib
+from pathlib import Path
+
+import pyrealsense2 as rs
+import numpy as np
+
+from src.utils.intrinsics import crop_intrinsics
+
+
+# Where ray tables are persisted
+RAY_TABLE_DIR = Path(__file__).resolve().parent.parent.parent / 'data' / 'processed' / 'ray_tables'
+
+# In-memory cache of ray tables keyed by intrinsics
+_ray_tables = {}
+
+
+def intrinsics_key(intrinsics):
+    """
+    Hashable key identifying a set of intrinsics.
+
+    Args:
+        intrinsics: rs.intrinsics
+
+    Returns:
+        tuple
+    """
+    return (intrinsics.width, intrinsics.height, intrinsics.fx, intrinsics.fy,
+            intrinsics.ppx, intrinsics.ppy, str(intrinsics.model), tuple(intrinsics.coeffs))
+
+
+def intrinsics_fingerprint(intrinsics):
+    """
+    Short stable hash of a set of intrinsics (used in ray table file names).
+
+    Args:
+        intrinsics: rs.intrinsics
+
+    Returns:
+        16 character hex string
+    """
+    key = intrinsics_key(intrinsics)
+    return hashlib.sha1(repr(key).encode('utf-8')).hexdigest()[:16]
+
+
+def undistort_normalized(x, y, intrinsics):
+    """
+    Map normalized image coordinates to ray coordinates (x/z, y/z).
+
+    Mirrors the distortion handling of rs2_deproject_pixel_to_point().
+
+    Args:
+        x, y: Arrays of (pixel - principal point) / focal length
+        intrinsics: rs.intrinsics
+
+    Returns:
+        (x, y) ray coordinates
+    """
+    model = intrinsics.model
+    c = [float(k) for k in intrinsics.coeffs]
+
+    if model == rs.distortion.inverse_brown_conrady:
+        # No closed form; the SDK runs 10 fixed-point iterations
+        xo, yo = x, y
+        for _ in range(10):
+            r2 = x * x + y * y
+            icdist = 1 / (1 + ((c[4] * r2 + c[1]) * r2 + c[0]) * r2)
+            xq = x / icdist
+            yq = y / icdist
+            delta_x = 2 * c[2] * xq * yq + c[3] * (r2 + 2 * xq * xq)
+            delta_y = 2 * c[3] * xq * yq + c[2] * (r2 + 2 * yq * yq)
+            x = (xo - delta_x) * icdist
+            y = (yo - delta_y) * icdist
+
+    elif model == rs.distortion.brown_conrady:
+        # Same as OpenCV undistortPoints(), 10 iterations
+        xo, yo = x, y
+        for _ in range(10):
+            r2 = x * x + y * y
+            icdist = 1 / (1 + ((c[4] * r2 + c[1]) * r2 + c[0]) * r2)
+            delta_x = 2 * c[2] * x * y + c[3] * (r2 + 2 * x * x)
+            delta_y = 2 * c[3] * x * y + c[2] * (r2 + 2 * y * y)
+            x = (xo - delta_x) * icdist
+            y = (yo - delta_y) * icdist
+
+    elif model == rs.distortion.kannala_brandt4:
+        rd = np.maximum(np.sqrt(x * x + y * y), np.finfo(np.float32).eps)
+        theta = rd.copy()
+        theta2 = rd * rd
+        for _ in range(4):
+            f = theta * (1 + theta2 * (c[0] + theta2 * (c[1] + theta2 * (c[2] + theta2 * c[3])))) - rd
+            df = 1 + theta2 * (3 * c[0] + theta2 * (5 * c[1] + theta2 * (7 * c[2] + 9 * theta2 * c[3])))
+            theta = theta - f / df
+            theta2 = theta * theta
+        r = np.tan(theta)
+        x = x * r / rd
+        y = y * r / rd
+
+    elif model == rs.distortion.ftheta:
+        rd = np.maximum(np.sqrt(x * x + y * y), np.finfo(np.float32).eps)
+        r = np.tan(c[0] * rd) / np.arctan(2 * np.tan(c[0] / 2))
+        x = x * r / rd
+        y = y * r / rd
+
+    return x, y
+
+
+def compute_pixel_rays(intrinsics):
+    """
+    Compute the ray (x/z, y/z) of every pixel.
+
+    Args:
+        intrinsics: rs.intrinsics
+
+    Returns:
+        HxWx2 float32 array
+    """
+    u = np.arange(intrinsics.width, dtype=np.float64)
+    v = np.arange(intrinsics.height, dtype=np.float64)
+    x = np.broadcast_to((u - intrinsics.ppx) / intrinsics.fx, (intrinsics.height, intrinsics.width))
+    y = np.broadcast_to(((v - intrinsics.ppy) / intrinsics.fy)[:, None], (intrinsics.height, intrinsics.width))
+
+    x, y = undistort_normalized(x, y, intrinsics)
+
+    rays = np.empty((intrinsics.height, intrinsics.width, 2), dtype=np.float32)
+    rays[..., 0] = x
+    rays[..., 1] = y
+    return rays
+
+
+class RayTable:
+    """
+    Per-pixel ray table for one set of intrinsics.
+
+    rays[v, u] holds (x/z, y/z) for pixel (u, v), so the camera-frame point
+    for that pixel is depth * (rays[v, u, 0], rays[v, u, 1], 1).
+    """
+
+    def __init__(self, intrinsics, rays=None):
+        """
+        Build a ray table.
+
+        Args:
+            intrinsics: rs.intrinsics
+            rays: Precomputed HxWx2 float32 rays (computed if None)
+        """
+        self.intrinsics = intrinsics
+        self.width = intrinsics.width
+        self.height = intrinsics.height
+        self.fingerprint = intrinsics_fingerprint(intrinsics)
+
+        if rays is None:
+            rays = compute_pixel_rays(intrinsics)
+        if rays.shape != (self.height, self.width, 2):
+            raise ValueError(f"Ray table shape {rays.shape} does not match {self.width}x{self.height}")
+
+        self.rays = rays
+        self.rays.flags.writeable = False
+
+        # Separate x/z and y/z planes for gathers
+        self.x = np.ascontiguousarray(rays[..., 0])
+        self.y = np.ascontiguousarray(rays[..., 1])
+
+    @staticmethod
+    def cache_path(intrinsics, cache_dir=RAY_TABLE_DIR):
+        """
+        File a ray table is persisted to.
+
+        Args:
+            intrinsics: rs.intrinsics
+            cache_dir: Directory of persisted tables
+
+        Returns:
+            Path
+        """
+        name = f"rays_{intrinsics.width}x{intrinsics.height}_{intrinsics_fingerprint(intrinsics)}.npy"
+        return Path(cache_dir) / name
+
+    @classmethod
+    def load(cls, intrinsics, cache_dir=RAY_TABLE_DIR, persist=True):
+        """
+        Load a ray table from disk, or compute (and save) it.
+
+        Args:
+            intrinsics: rs.intrinsics
+            cache_dir: Directory of persisted tables
+            persist: If True, save newly computed tables
+
+        Returns:
+            RayTable
+        """
+        path = cls.cache_path(intrinsics, cache_dir)
+
+        if path.exists():
+            try:
+                rays = np.load(path)
+                return cls(intrinsics, rays)
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable ray table {path}: {e}")
+
+        table = cls(intrinsics)
+        if persist:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                # Write then rename so a concurrent reader never sees a partial file
+                tmp_path = path.with_suffix('.tmp.npy')
+                np.save(tmp_path, table.rays)
+                tmp_path.replace(path)
+            except OSError as e:
+                print(f"Could not save ray table to {path}: {e}")
+        return table
+
+    def deproject_pixel(self, pixel_x, pixel_y, depth_m):
+        """
+        Drop-in replacement for rs.rs2_deproject_pixel_to_point().
+
+        Integer pixels inside the image are a table read; anything else
+        (sub-pixel or out of bounds) is computed exactly.
+
+        Args:
+            pixel_x, pixel_y: Pixel coordinates
+            depth_m: Depth in meters
+
+        Returns:
+            [x, y, z] in camera frame (meters)
+        """
+        u, v = int(pixel_x), int(pixel_y)
+        if u == pixel_x and v == pixel_y and 0 <= u < self.width and 0 <= v < self.height:
+            ray_x, ray_y = self.x[v, u], self.y[v, u]
+        else:
+            x, y = undistort_normalized(np.float32((pixel_x - self.intrinsics.ppx) / self.intrinsics.fx),
+                                        np.float32((pixel_y - self.intrinsics.ppy) / self.intrinsics.fy),
+                                        self.intrinsics)
+            ray_x, ray_y = x, y
+
+        depth_m = float(depth_m)
+        return [float(ray_x) * depth_m, float(ray_y) * depth_m, depth_m]
+
+    def deproject_pixels(self, pixel_x, pixel_y, depth_m):
+        """
+        Deproject arrays of integer pixels.
+
+        Args:
+            pixel_x, pixel_y: Integer pixel coordinate arrays (inside the image)
+            depth_m: Depth array in meters
+
+        Returns:
+            Nx3 float32 array in camera frame (meters)
+        """
+        u = np.asarray(pixel_x, dtype=np.intp).ravel()
+        v = np.asarray(pixel_y, dtype=np.intp).ravel()
+        depth = np.asarray(depth_m, dtype=np.float32).ravel()
+
+        flat = v * self.width + u
+        points = np.empty((len(depth), 3), dtype=np.float32)
+        np.multiply(self.x.ravel().take(flat), depth, out=points[:, 0])
+        np.multiply(self.y.ravel().take(flat), depth, out=points[:, 1])
+        points[:, 2] = depth
+        return points
+
+    def deproject_image(self, depth_image, depth_scale):
+        """
+        Deproject a whole depth image (organized point cloud).
+
+        Args:
+            depth_image: HxW depth image in depth units
+            depth_scale: Meters per depth unit
+
+        Returns:
+            HxWx3 float32 array in camera frame (meters), zeros at invalid pixels
+        """
+        z = depth_image.astype(np.float32)
+        z *= np.float32(depth_scale)
+        points = np.empty(depth_image.shape + (3,), dtype=np.float32)
+        np.multiply(self.x, z, out=points[..., 0])
+        np.multiply(self.y, z, out=points[..., 1])
+        points[..., 2] = z
+        return points
+
+
+def get_ray_table(intrinsics, cache_dir=RAY_TABLE_DIR):
+    """
+    Shared ray table for a set of intrinsics (memory, then disk, then computed).
+
+    Args:
+        intrinsics: rs.intrinsics
+        cache_dir: Directory of persisted tables
+
+    Returns:
+        RayTable
+    """
+    key = intrinsics_key(intrinsics)
+    table = _ray_tables.get(key)
+    if table is None:
+        table = RayTable.load(intrinsics, cache_dir)
+        _ray_tables[key] = table
+    return table
+
+
+def get_cropped_ray_table(intrinsics, x, y, width, height, cache_dir=RAY_TABLE_DIR):
+    """
+    Ray table of a sub-image, cut from the full image's table.
+
+    The crop shares the full table's memory and is cached under the crop's
+    intrinsics, so get_ray_table() on those intrinsics returns it too
+    (nothing new is computed or written to disk).
+
+    Args:
+        intrinsics: rs.intrinsics of the full image
+        x, y: Top-left corner of the crop
+        width, height: Crop size
+        cache_dir: Directory of persisted tables (for the full table)
+
+    Returns:
+        RayTable whose intrinsics are the crop's
+    """
+    cropped = crop_intrinsics(intrinsics, x, y, width, height)
+    key = intrinsics_key(cropped)
+    table = _ray_tables.get(key)
+    if table is None:
+        full = get_ray_table(intrinsics, cache_dir)
+        table = RayTable(cropped, full.rays[y:y + height, x:x + width])
+        _ray_tables[key] = table
+    return table
@@ -0,0 +1,425 @@
+"""
+Depth Filters
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: NumPy versions of the RealSense depth post-processing filters, for
+         sources that do not produce SDK frames (recordings, synthetic scenes)
+
+Zero depth means "no data" everywhere, as in the SDK.
+"""
+
+import numpy as np
+
+
+def decimated_shape(shape, factor):
+    """
+    Size of a depth image after decimation (partial blocks at the edges are dropped).
+
+    Args:
+        shape: (height, width)
+        factor: Decimation factor
+
+    Returns:
+        (height, width)
+    """
+    return shape[0] // factor, shape[1] // factor
+
+
+def decimate_depth(depth, factor):
+    """
+    Downsample depth by factor x factor blocks, ignoring zeros (like rs.decimation_filter).
+
+    Factors 2 and 3 take the median of the valid pixels in each block,
+    larger factors take the mean. Blocks without valid pixels stay 0.
+
+    Args:
+        depth: HxW uint16 depth image
+        factor: Decimation factor (1 returns depth unchanged)
+
+    Returns:
+        (H // factor) x (W // factor) uint16 depth image
+    """
+    if factor == 1:
+        return depth
+
+    # One strided view per position inside the block (no copies)
+    height, width = decimated_shape(depth.shape, factor)
+    planes = [depth[i:height * factor:factor, j:width * factor:factor]
+              for i in range(factor) for j in range(factor)]
+    valid = sum((plane != 0).astype(np.uint8) for plane in planes)
+
+    if factor <= 3:
+        # Sort the planes elementwise (odd-even transposition network).
+        # Zeros sort first, so the median of the valid values sits at
+        # (zeros + valid // 2)
+        planes = [plane.copy() for plane in planes]
+        n = len(planes)
+        for round_index in range(n):
+            for k in range(round_index % 2, n - 1, 2):
+                low = np.minimum(planes[k], planes[k + 1])
+                np.maximum(planes[k], planes[k + 1], out=planes[k + 1])
+                planes[k] = low
+        index = (n - valid) + valid // 2
+        result = planes[n - 1].copy()
+        for k in range(n - 1):
+            np.copyto(result, planes[k], where=(index == k))
+    else:
+        total = np.zeros((height, width), dtype=np.uint32)
+        for plane in planes:
+            total += plane
+        result = (total // np.maximum(valid, 1)).astype(np.uint16)
+
+    result[valid == 0] = 0
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Spatial, temporal and hole-filling filters
+#
+# Array equivalents of rs.spatial_filter, rs.temporal_filter and
+# rs.hole_filling_filter with the same options. They reproduce the SDK
+# output exactly (same float32 arithmetic, scan order and edge handling;
+# see benchmarks/bench_depth_filters.py) but take any HxW uint16 array or
+# view, so they work on replayed frames and on a region of interest.
+# process() filters in place unless out is given.
+# ---------------------------------------------------------------------------
+
+# Temporal persistency modes (rs.option.holes_fill on the temporal filter):
+# mode -> (recent frames considered, valid frames needed). A hole keeps the
+# last valid depth when enough of the recent frames had data there.
+PERSISTENCE_MODES = {
+    0: None,      # Disabled
+    1: (8, 8),    # Valid in 8/8
+    2: (3, 2),    # Valid in 2/last 3
+    3: (4, 2),    # Valid in 2/last 4 (SDK default)
+    4: (8, 2),    # Valid in 2/8
+    5: (2, 1),    # Valid in 1/last 2
+    6: (5, 1),    # Valid in 1/last 5
+    7: (8, 1),    # Valid in 1/8
+    8: (0, 0),    # Always on
+}
+
+# Hole filling modes (rs.option.holes_fill on the hole filling filter)
+FILL_FROM_LEFT = 0
+FARTHEST_FROM_AROUND = 1
+NEAREST_FROM_AROUND = 2
+
+
+class SpatialFilter:
+    """
+    Edge-preserving smoothing (domain transform), like rs.spatial_filter.
+
+    Each iteration runs a recursive filter left-right, right-left, then
+    top-bottom, bottom-top. A pixel is blended with its already filtered
+    neighbor when both are valid and differ by at most delta.
+    """
+
+    def __init__(self, magnitude=2, alpha=0.5, delta=20):
+        """
+        Initialize the filter.
+
+        Args:
+            magnitude: Number of iterations (filter_magnitude, 1-5)
+            alpha: Weight of the current pixel (filter_smooth_alpha, 0.25-1)
+            delta: Step size boundary in depth units (filter_smooth_delta, 1-50)
+        """
+        self.magnitude = int(magnitude)
+        self.alpha = np.float32(alpha)
+        self.delta = np.float32(delta)
+        self._shape = None
+
+    def _allocate(self, shape):
+        """Working buffers: the image as float32 in both layouts, plus one scratch row set."""
+        height, width = shape
+        self._image = np.empty((height, width), dtype=np.float32)
+        self._image_t = np.empty((width, height), dtype=np.float32)
+        longest = max(height, width)
+        self._diff = np.empty(longest, dtype=np.float32)
+        self._blend = np.empty(longest, dtype=np.float32)
+        self._mask = np.empty(longest, dtype=bool)
+        self._shape = shape
+
+    def _recursive_pass(self, lines, update_last, strict):
+        """
+        Filter lines[k] against lines[k - 1] forward, then against lines[k + 1] backward.
+
+        The recursion runs along axis 0 so every step is one vectorized
+        operation over a contiguous line.
+
+        Args:
+            lines: NxM float32 image, filtered in place
+            update_last: Whether the forward pass reaches the last line
+            strict: Use diff < delta instead of diff <= delta
+        """
+        count, length = lines.shape
+        diff = self._diff[:length]
+        blend = self._blend[:length]
+        mask = self._mask[:length]
+        compare = np.less if strict else np.less_equal
+        beta = np.float32(1) - self.alpha
+
+        # Zero stays zero and valid stays valid, so this holds for the whole pass
+        nonzero = lines != 0
+        both_valid = nonzero[1:] & nonzero[:-1]
+
+        def step(current, neighbor, valid):
+            np.subtract(current, neighbor, out=diff)
+            np.abs(diff, out=diff)
+            compare(diff, self.delta, out=mask)
+            np.logical_and(mask, valid, out=mask)
+            # Same operation order as the SDK: cur*a + prev*(1-a) + 0.5, truncated
+            np.multiply(current, self.alpha, out=blend)
+            np.multiply(neighbor, beta, out=diff)
+            np.add(blend, diff, out=blend)
+            np.add(blend, np.float32(0.5), out=blend)
+            np.floor(blend, out=blend)
+            np.copyto(current, blend, where=mask)
+
+        last = count if update_last else count - 1
+        for k in range(1, last):
+            step(lines[k], lines[k - 1], both_valid[k - 1])
+        for k in range(count - 2, -1, -1):
+            step(lines[k], lines[k + 1], both_valid[k])
+
+    def process(self, depth, out=None):
+        """
+        Filter a depth image.
+
+        Args:
+            depth: HxW uint16 depth image (any view, e.g. a region of interest)
+            out: Output array (default: filter depth in place)
+
+        Returns:
+            The filtered uint16 image (out)
+        """
+        out = depth if out is None else out
+        if depth.shape != self._shape:
+            self._allocate(depth.shape)
+
+        image, image_t = self._image, self._image_t
+        np.copyto(image, depth)
+        for _ in range(self.magnitude):
+            # Horizontal passes on the transposed copy so lines are contiguous
+            np.copyto(image_t, image.T)
+            self._recursive_pass(image_t, update_last=False, strict=False)
+            np.copyto(image, image_t.T)
+            self._recursive_pass(image, update_last=True, strict=True)
+
+        np.copyto(out, image, casting='unsafe')
+        return out
+
+
+class TemporalFilter:
+    """
+    Smoothing over time with hole persistence, like rs.temporal_filter.
+
+    Keeps the last valid depth and an 8-frame validity history per pixel.
+    Valid pixels close to the last value are blended with it; holes are
+    filled from the last value when the persistence mode allows it.
+    """
+
+    def __init__(self, alpha=0.4, delta=20, persistence=3):
+        """
+        Initialize the filter.
+
+        Args:
+            alpha: Weight of the current frame (filter_smooth_alpha, 0-1)
+            delta: Step size boundary in depth units (filter_smooth_delta, 1-100)
+            persistence: Persistency mode 0-8 (holes_fill), see PERSISTENCE_MODES
+        """
+        if persistence not in PERSISTENCE_MODES:
+            raise ValueError(f"Persistence mode must be 0-8, got {persistence}")
+        self.alpha = np.float32(alpha)
+        self.delta = delta
+        self.persistence = persistence
+        self._persistent = self._persistence_table(persistence)
+        self._shape = None
+
+    @staticmethod
+    def _persistence_table(mode):
+        """
+        Lookup of whether a history byte allows filling a hole.
+
+        The history is a ring buffer written at bit (frame index % 8), so the
+        table is indexed by [current index][history].
+
+        Returns:
+            8x256 bool array
+        """
+        table = np.zeros((8, 256), dtype=bool)
+        if PERSISTENCE_MODES[mode] is None:
+            return table
+        recent, needed = PERSISTENCE_MODES[mode]
+
+        history = np.arange(256)
+        for index in range(8):
+            # Bit k of 'ordered' is the frame k + 1 frames ago
+            ordered = sum(((history >> ((index - 1 - k) % 8)) & 1) << k for k in range(8))
+            valid = sum((ordered >> k) & 1 for k in range(recent))
+            table[index] = valid >= needed
+        return table
+
+    def reset(self):
+        """Forget the history (the next frame starts fresh)."""
+        self._shape = None
+
+    def _allocate(self, shape):
+        """Per-pixel state plus scratch buffers for one image size."""
+        self._last = np.zeros(shape, dtype=np.uint16)
+        self._history = np.zeros(shape, dtype=np.uint8)
+        self._index = 0
+        self._current = np.empty(shape, dtype=np.float32)
+        self._previous = np.empty(shape, dtype=np.float32)
+        self._valid = np.empty(shape, dtype=bool)
+        self._close = np.empty(shape, dtype=bool)
+        self._fill = np.empty(shape, dtype=bool)
+        self._shape = shape
+
+    def process(self, depth, out=None):
+        """
+        Filter the next depth image of a sequence.
+
+        A change of image size resets the history, as in the SDK.
+
+        Args:
+            depth: HxW uint16 depth image (any view, e.g. a region of interest)
+            out: Output array (default: filter depth in place)
+
+        Returns:
+            The filtered uint16 image (out)
+        """
+        out = depth if out is None else out
+        if depth.shape != self._shape:
+            self._allocate(depth.shape)
+        last, history = self._last, self._history
+        current, previous = self._current, self._previous
+        valid, close, fill = self._valid, self._close, self._fill
+        bit = np.uint8(1 << self._index)
+
+        # Valid now and close to the last valid value -> blend
+        np.not_equal(depth, 0, out=valid)
+        np.copyto(current, depth)
+        np.copyto(previous, last)
+        np.subtract(current, previous, out=previous)
+        np.abs(previous, out=previous)
+        np.less(previous, self.delta, out=close)
+        close &= valid
+        close &= last != 0
+
+        # Same operation order as the SDK: a*cur + (1-a)*prev, truncated
+        np.copyto(previous, last)
+        current *= self.alpha
+        previous *= np.float32(1) - self.alpha
+        current += previous
+
+        if out is not depth:
+            np.copyto(out, depth)
+        np.copyto(out, current, where=close, casting='unsafe')
+
+        # History: blended pixels extend it, other valid pixels restart it
+        np.copyto(history, bit, where=valid & ~close)
+        np.bitwise_or(history, bit, out=history, where=close)
+        np.copyto(last, out, where=valid)
+
+        # Holes: keep the last value if the history is persistent enough
+        np.logical_not(valid, out=fill)
+        fill &= last != 0
+        fill &= self._persistent[self._index][history]
+        np.copyto(out, last, where=fill)
+        np.bitwise_and(history, ~bit, out=history, where=~valid)
+
+        self._index = (self._index + 1) % 8
+        return out
+
+
+class HoleFillingFilter:
+    """
+    Fill holes from neighboring pixels, like rs.hole_filling_filter.
+
+    Pixels are filled in raster order, so a filled pixel feeds the ones
+    after it. Modes 1 and 2 use the left, upper-left, upper, lower-left
+    and lower neighbors and leave the border rows and first column as is.
+    As in the SDK, mode 2 only fills a hole whose upper neighbor is valid.
+    """
+
+    def __init__(self, mode=FARTHEST_FROM_AROUND):
+        """
+        Initialize the filter.
+
+        Args:
+            mode: 0 = fill from left, 1 = farthest from around, 2 = nearest from around
+        """
+        if mode not in (FILL_FROM_LEFT, FARTHEST_FROM_AROUND, NEAREST_FROM_AROUND):
+            raise ValueError(f"Hole filling mode must be 0, 1 or 2, got {mode}")
+        self.mode = mode
+
+    def process(self, depth, out=None):
+        """
+        Fill the holes of a depth image.
+
+        Args:
+            depth: HxW uint16 depth image (any view, e.g. a region of interest)
+            out: Output array (default: fill depth in place)
+
+        Returns:
+            The filled uint16 image (out)
+        """
+        if out is None:
+            out = depth
+        elif out is not depth:
+            np.copyto(out, depth)
+
+        if self.mode == FILL_FROM_LEFT:
+            # Each hole takes the nearest valid pixel to its left
+            columns = np.arange(out.shape[1])
+            source = np.where(out != 0, columns, 0)
+            np.maximum.accumulate(source, axis=1, out=source)
+            out[...] = np.take_along_axis(out, source, axis=1)
+        elif self.mode == FARTHEST_FROM_AROUND:
+            self._fill_from_around(out, require_above=False)
+        else:
+            # Nearest nonzero is the farthest after negating (0 stays 0,
+            # d -> 65536 - d), so reuse the same scan
+            np.negative(out, out=out)
+            self._fill_from_around(out, require_above=True)
+            np.negative(out, out=out)
+        return out
+
+    @staticmethod
+    def _fill_from_around(image, require_above):
+        """
+        Fill each hole with the largest neighbor, in raster order, in place.
+
+        Row by row: the neighbors above are final and the ones below are not
+        filled yet, so only the left neighbor chains within a row. That is a
+        running maximum over each run of holes, started at the valid pixel
+        before it, done for the whole row at once with a segmented maximum.
+
+        Args:
+            image: HxW uint16 image
+            require_above: Leave holes with an empty upper neighbor at 0
+        """
+        height, width = image.shape
+        if height < 3 or width < 2:
+            return
+
+        # Rows change only where they had holes, and filling never adds any
+        rows = np.flatnonzero((image[1:-1, 1:] == 0).any(axis=1)) + 1
+        for row in rows:
+            above, below, line = image[row - 1], image[row + 1], image[row]
+
+            around = np.maximum(above[1:], above[:-1])
+            np.maximum(around, below[:-1], out=around)
+            np.maximum(around, below[1:], out=around)
+
+            # Runs start at the first column and at every valid pixel
+            # (and, when required, at holes that stay empty)
+            starts = line != 0
+            starts[0] = True
+            if require_above:
+                starts[1:] |= above[1:] == 0
+            values = line.astype(np.int64)
+            np.copyto(values[1:], around, where=~starts[1:])
+            keys = (np.cumsum(starts) << 16) | values
+            np.maximum.accumulate(keys, out=keys)
+            line[1:] = keys[1:] & 0xFFFF
@@ -0,0 +1,249 @@
+"""
+Foreground Segmentation
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: Mark depth pixels that stand above a learned background of the empty floor
+
+The background is the depth of the empty workspace per pixel, learned from
+a few frames (exact per-pixel median of the valid samples, so dropouts,
+noise and flying pixels in single frames don't matter) and then slowly
+updated where nothing is in front of it. A pixel is foreground when its
+point is more than threshold_m higher in world Z than the background point
+on the same ray.
+
+Both points are on the same ray, so the height difference is the depth
+difference times how fast that ray descends in world Z (from the camera
+rotation). That turns the height threshold into a per-pixel depth limit,
+and segmenting a frame is two uint16 comparisons against it, with no
+deprojection and no floats.
+"""
+
+import numpy as np
+
+from src.utils.deprojection import get_ray_table
+
+
+def camera_pose(transformer):
+    """
+    Intrinsics and camera -> world pose of a CoordinateTransformer or WorldFrameCalibrator.
+
+    Args:
+        transformer: CoordinateTransformer (intrinsics set) or calibrated
+                     WorldFrameCalibrator (camera_intrinsics set)
+
+    Returns:
+        (intrinsics, 3x3 rotation, camera position in the world frame (meters))
+    """
+    if hasattr(transformer, 'R_cam_to_world'):
+        intrinsics = transformer.intrinsics
+        rotation = transformer.R_cam_to_world
+        position = np.array([0.0, 0.0, transformer.camera_height])
+    else:
+        intrinsics = transformer.camera_intrinsics
+        rotation, position = transformer.T_world_camera[:3, :3], transformer.T_world_camera[:3, 3]
+    if intrinsics is None:
+        raise ValueError("Camera intrinsics not set on the transformer")
+    return intrinsics, np.asarray(rotation, dtype=np.float64), np.asarray(position, dtype=np.float64)
+
+
+def ray_descent(intrinsics, rotation):
+    """
+    World Z lost per meter of depth along each pixel's ray.
+
+    Args:
+        intrinsics: rs.intrinsics of the depth image
+        rotation: 3x3 camera -> world rotation (world Z up)
+
+    Returns:
+        HxW float32 array (about 1 for a camera looking straight down)
+    """
+    ray_table = get_ray_table(intrinsics)
+    r = np.asarray(rotation, dtype=np.float32)[2]
+    descent = ray_table.x * -r[0]
+    descent -= ray_table.y * r[1]
+    descent -= r[2]
+    return descent
+
+
+class FloorBackground:
+    """
+    Per-pixel background depth of the empty floor and a height-above-floor segmenter.
+
+    Usage:
+        background = FloorBackground.from_transformer(transformer, depth_scale)
+        for depth in empty_frames:
+            background.learn(depth)
+        mask = background.process(depth)   # segment and update, every frame
+    """
+
+    def __init__(self, intrinsics, rotation, camera_height_m, depth_scale, threshold_m=0.05,
+                 learning_rate=0.02, update_stride=4):
+        """
+        Set up the segmenter for one camera pose.
+
+        Args:
+            intrinsics: rs.intrinsics of the (aligned) depth image
+            rotation: 3x3 camera -> world rotation (world Z up, floor at Z = 0)
+            camera_height_m: Camera height above the floor (meters)
+            depth_scale: Meters per depth unit
+            threshold_m: Minimum height above the background to count as foreground
+            learning_rate: Weight of a new frame in the background update
+            update_stride: Update every Nth row per frame (rows take turns), to
+                           spread the update cost over frames
+        """
+        self.shape = (intrinsics.height, intrinsics.width)
+        self.depth_scale = depth_scale
+        self.threshold_m = threshold_m
+        self.learning_rate = np.float32(learning_rate)
+        self.update_stride = update_stride
+        self._phase = 0
+
+        descent = ray_descent(intrinsics, rotation)
+        upward = descent <= 0.05  # Rays that (nearly) never reach the floor
+
+        with np.errstate(divide='ignore'):
+            # Where each ray meets the floor: background for pixels never seen in learning
+            floor = np.where(upward, 0, camera_height_m / descent / depth_scale)
+            # Height threshold as a per-pixel depth difference
+            self._threshold_units = np.where(upward, np.inf, threshold_m / descent / depth_scale).astype(np.float32)
+        self.floor_units = np.clip(floor, 0, 65535).astype(np.uint16)
+
+        self.background = self.floor_units.astype(np.float32)
+        self.limit = np.zeros(self.shape, dtype=np.uint16)
+        self._learned = []
+        self.learned_frames = 0
+
+        self._mask = np.empty(self.shape, dtype=bool)
+        self._valid = np.empty(self.shape, dtype=bool)
+        self._rebuild_limit()
+
+    @classmethod
+    def from_transformer(cls, transformer, depth_scale, **kwargs):
+        """
+        Segmenter for the pose of a CoordinateTransformer or WorldFrameCalibrator.
+
+        Args:
+            transformer: CoordinateTransformer (intrinsics set) or calibrated
+                         WorldFrameCalibrator (camera_intrinsics set)
+            depth_scale: Meters per depth unit
+            **kwargs: Other FloorBackground options
+
+        Returns:
+            FloorBackground
+        """
+        intrinsics, rotation, position = camera_pose(transformer)
+        return cls(intrinsics, rotation, position[2], depth_scale, **kwargs)
+
+    def _rebuild_limit(self, rows=slice(None)):
+        """Depth limit (uint16) below which a pixel is foreground, for some rows."""
+        limit = self.background[rows] - self._threshold_units[rows]
+        np.clip(limit, 0, 65535, out=limit)
+        self.limit[rows] = limit
+
+    def learn(self, depth):
+        """
+        Add a frame of the empty workspace.
+
+        The frame is copied and held until finish_learning() (2 bytes per
+        pixel per frame, e.g. 55 MB for 30 frames at 1280x720).
+
+        Args:
+            depth: HxW uint16 depth image (zeros are dropouts)
+        """
+        self._learned.append(np.array(depth, dtype=np.uint16))
+        self.learned_frames += 1
+
+    def finish_learning(self):
+        """
+        Set the background to the exact per-pixel median of the learned frames' valid (non-zero) samples.
+
+        Pixels without a valid sample keep the floor plane depth.
+        """
+        if not self._learned:
+            return
+        # Sorting puts each pixel's zeros first; its valid samples follow
+        stack = np.sort(np.stack(self._learned), axis=0)
+        self._learned = []
+        total = len(stack)
+        valid = np.count_nonzero(stack, axis=0)
+        first = total - valid
+        lower = np.minimum(first + (valid - 1) // 2, total - 1)
+        upper = np.minimum(first + valid // 2, total - 1)
+        median = np.take_along_axis(stack, lower[None], axis=0)[0].astype(np.float32)
+        median += np.take_along_axis(stack, upper[None], axis=0)[0]
+        median *= 0.5
+        self.background = np.where(valid > 0, median, self.floor_units).astype(np.float32)
+        self._rebuild_limit()
+
+    def segment(self, depth, out=None):
+        """
+        Foreground mask of a frame.
+
+        Args:
+            depth: HxW uint16 depth image
+            out: Optional HxW bool array to write into
+
+        Returns:
+            HxW bool array (True = more than threshold_m above the background)
+        """
+        if self._learned:
+            self.finish_learning()
+        out = self._mask if out is None else out
+        np.less(depth, self.limit, out=out)
+        np.not_equal(depth, 0, out=self._valid)
+        out &= self._valid
+        return out
+
+    def update(self, depth, mask):
+        """
+        Blend a frame into the background where it is valid and not foreground.
+
+        Only every update_stride-th row is updated per call (rows take turns),
+        so the cost per frame stays small.
+
+        Args:
+            depth: HxW uint16 depth image
+            mask: Foreground mask of the frame (from segment())
+        """
+        rows = slice(self._phase, None, self.update_stride)
+        self._phase = (self._phase + 1) % self.update_stride
+
+        depth_rows = depth[rows]
+        update = (depth_rows != 0) & ~mask[rows]
+        background = self.background[rows]
+        step = depth_rows.astype(np.float32)
+        step -= background
+        step *= self.learning_rate
+        np.add(background, step, out=background, where=update)  # background is a view
+        self._rebuild_limit(rows)
+
+    def process(self, depth, update=True):
+        """
+        Segment a frame, then update the background with it.
+
+        Args:
+            depth: HxW uint16 depth image
+            update: If False, only segment
+
+        Returns:
+            HxW bool foreground mask (reused between calls; copy to keep)
+        """
+        mask = self.segment(depth)
+        if update:
+            self.update(depth, mask)
+        return mask
+
+    def heights(self, depth):
+        """
+        Height of every pixel above the background (meters, NaN at dropouts), for display and debugging.
+
+        Args:
+            depth: HxW uint16 depth image
+
+        Returns:
+            HxW float32 array
+        """
+        height = self.background - depth
+        height *= np.float32(self.threshold_m) / self._threshold_units
+        height[depth == 0] = np.nan
+        return height
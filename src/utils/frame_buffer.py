@@ -0,0 +1,276 @@
+"""
+Frame Ring Buffer and Background Capture Thread
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: Decouple camera acquisition from display/processing loops
+
+A CaptureThread pulls, aligns and converts frames on its own thread and pushes
+them into a bounded FrameRingBuffer. Consumers read the most recent frame
+without blocking, so a slow imshow/waitKey loop or click handler no longer
+stalls wait_for_frames() and causes the SDK queue to drop frames.
+
+Buffer policies:
+- 'latest': Only the newest frame matters. Readers always get the most
+            recent frame; unread frames passed over are counted as skipped.
+- 'keep_n': The last N frames are kept in order. Readers pop the oldest
+            unread frame first.
+
+In both policies unread frames overwritten by the producer are counted as
+overwritten. skipped + overwritten is the total number of dropped frames.
+"""
+
+import threading
+import time
+
+
+class FrameRingBuffer:
+    """
+    Bounded, thread-safe ring buffer of frames with sequence numbers.
+
+    The producer never blocks: when the buffer is full the oldest slot is
+    overwritten. Every frame put into the buffer is assigned a monotonically
+    increasing sequence number so consumers can see exactly which frames
+    they missed.
+    """
+
+    POLICIES = ('latest', 'keep_n')
+
+    def __init__(self, capacity=1, policy='latest'):
+        """
+        Initialize the ring buffer.
+
+        Args:
+            capacity: Number of frame slots (>= 1)
+            policy: 'latest' (latest-wins) or 'keep_n' (keep last N, FIFO reads)
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown buffer policy '{policy}'. Use one of {self.POLICIES}")
+        if capacity < 1:
+            raise ValueError("Buffer capacity must be at least 1")
+
+        self.capacity = capacity
+        self.policy = policy
+
+        self._slots = [None] * capacity
+        self._seqs = [-1] * capacity
+        self._lock = threading.Lock()
+        self._new_frame = threading.Condition(self._lock)
+
+        # Sequence of the next frame to be written and of the last frame read
+        self._next_seq = 0
+        self._last_read_seq = -1
+
+        # Counters
+        self.produced = 0      # Frames written by the producer
+        self.consumed = 0      # Distinct frames handed to consumers
+        self.overwritten = 0   # Unread frames overwritten in the ring
+        self.skipped = 0       # Unread frames passed over by get_latest()
+
+    def put(self, frame):
+        """
+        Write a frame into the ring, overwriting the oldest slot if full.
+
+        Dict frames get a 'sequence' key before they become visible to readers.
+
+        Args:
+            frame: Frame data (any object, typically a dict of images/frames)
+
+        Returns:
+            int: Sequence number assigned to this frame
+        """
+        with self._lock:
+            seq = self._next_seq
+            slot = seq % self.capacity
+
+            # Overwriting a frame nobody has read yet is a drop
+            old_seq = self._seqs[slot]
+            if old_seq > self._last_read_seq:
+                self.overwritten += 1
+
+            if isinstance(frame, dict):
+                frame['sequence'] = seq
+
+            self._slots[slot] = frame
+            self._seqs[slot] = seq
+            self._next_seq += 1
+            self.produced += 1
+
+            self._new_frame.notify_all()
+
+        return seq
+
+    def get_latest(self, timeout=None):
+        """
+        Get the most recent frame.
+
+        Never blocks by default. Once the first frame has arrived this always
+        returns a frame; compare sequence numbers to detect repeats.
+
+        Args:
+            timeout: Seconds to wait for the first frame (None = don't wait)
+
+        Returns:
+            (sequence, frame) or None if no frame has been produced yet
+        """
+        with self._lock:
+            if self._next_seq == 0 and timeout:
+                self._new_frame.wait_for(lambda: self._next_seq > 0, timeout)
+
+            if self._next_seq == 0:
+                return None
+
+            seq = self._next_seq - 1
+            frame = self._slots[seq % self.capacity]
+
+            if seq > self._last_read_seq:
+                # Unread frames still in the ring are passed over; older ones
+                # were already counted as overwritten
+                unread = seq - self._last_read_seq - 1
+                self.skipped += min(unread, self.capacity - 1)
+                self._last_read_seq = seq
+                self.consumed += 1
+
+            return seq, frame
+
+    def get_next(self, timeout=None):
+        """
+        Get the oldest frame that has not been read yet (keep_n reads).
+
+        Args:
+            timeout: Seconds to wait for a new frame (None = don't wait)
+
+        Returns:
+            (sequence, frame) or None if no unread frame is available
+        """
+        with self._lock:
+            if self._next_seq - 1 <= self._last_read_seq and timeout:
+                self._new_frame.wait_for(lambda: self._next_seq - 1 > self._last_read_seq, timeout)
+
+            if self._next_seq - 1 <= self._last_read_seq:
+                return None
+
+            # Oldest frame still held in the ring
+            oldest_seq = max(self._last_read_seq + 1, self._next_seq - self.capacity)
+            frame = self._slots[oldest_seq % self.capacity]
+            self._last_read_seq = oldest_seq
+            self.consumed += 1
+
+            return oldest_seq, frame
+
+    def unread_count(self):
+        """Number of frames currently held in the ring that have not been read."""
+        with self._lock:
+            return min(self.capacity, self._next_seq - 1 - self._last_read_seq)
+
+    def get_stats(self):
+        """
+        Get buffer counters.
+
+        Returns:
+            dict with produced, consumed, overwritten, skipped and dropped totals
+        """
+        with self._lock:
+            return {
+                'policy': self.policy,
+                'capacity': self.capacity,
+                'produced': self.produced,
+                'consumed': self.consumed,
+                'overwritten': self.overwritten,
+                'skipped': self.skipped,
+                'dropped': self.overwritten + self.skipped,
+                'last_sequence': self._next_seq - 1,
+            }
+
+
+class CaptureThread(threading.Thread):
+    """
+    Producer thread that repeatedly grabs frames and writes them into a ring buffer.
+
+    The grab function does the blocking work (wait_for_frames, align,
+    numpy conversion) and returns a frame dict, or None to skip. If the dict
+    contains a 'frame_number' key, gaps in the camera frame counter are
+    tracked as SDK-level drops (frames lost before they reached us).
+    """
+
+    # Wait after a failed grab, so a source that keeps returning None at once doesn't spin
+    RETRY_DELAY_S = 0.005
+
+    def __init__(self, grab_fn, buffer, name="CaptureThread", finished_fn=None):
+        """
+        Initialize the capture thread.
+
+        Args:
+            grab_fn: Callable returning a frame dict (or None)
+            buffer: FrameRingBuffer to write frames into
+            name: Thread name
+            finished_fn: Optional callable returning True once the source has no
+                         more frames (end of a recording); the loop then exits
+        """
+        super().__init__(name=name, daemon=True)
+        self.grab_fn = grab_fn
+        self.buffer = buffer
+        self.finished_fn = finished_fn
+
+        self._stop_event = threading.Event()
+        self.error = None
+        self.finished = False       # Set once every frame of a finished source is in the buffer
+
+        # Producer-side counters
+        self.grab_failures = 0      # grab_fn returned None
+        self.sdk_frame_gaps = 0     # Frames missing from the camera frame counter
+        self._last_frame_number = None
+        self.start_time = None
+
+    def run(self):
+        """Capture loop. Runs until stop() is called, the source is finished or the grab function raises."""
+        self.start_time = time.perf_counter()
+
+        while not self._stop_event.is_set():
+            try:
+                frame = self.grab_fn()
+            except Exception as e:
+                # Keep the error for the consumer and stop producing
+                self.error = e
+                break
+
+            if frame is None:
+                if self.finished_fn is not None and self.finished_fn():
+                    self.finished = True
+                    break
+                self.grab_failures += 1
+                self._stop_event.wait(self.RETRY_DELAY_S)
+                continue
+
+            frame_number = frame.get('frame_number') if isinstance(frame, dict) else None
+            if frame_number is not None:
+                if self._last_frame_number is not None and frame_number > self._last_frame_number + 1:
+                    self.sdk_frame_gaps += frame_number - self._last_frame_number - 1
+                self._last_frame_number = frame_number
+
+            self.buffer.put(frame)
+
+    def stop(self, timeout=2.0):
+        """
+        Stop the capture loop and wait for the thread to exit.
+
+        Args:
+            timeout: Seconds to wait for the thread to finish
+        """
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def get_stats(self):
+        """
+        Get producer and buffer counters combined.
+
+        Returns:
+            dict with buffer stats plus grab failures, SDK gaps and capture FPS
+        """
+        stats = self.buffer.get_stats()
+        elapsed = time.perf_counter() - self.start_time if self.start_time else 0.0
+        stats['grab_failures'] = self.grab_failures
+        stats['sdk_frame_gaps'] = self.sdk_frame_gaps
+        stats['elapsed_s'] = elapsed
+        stats['capture_fps'] = stats['produced'] / elapsed if elapsed > 0 else 0.0
+        return stats
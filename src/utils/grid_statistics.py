@@ -0,0 +1,170 @@
+"""
+Grid Statistics
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: Reduce per-pixel depth statistics to grid cells in one vectorized pass
+
+Works on a PixelStatistics, so every cell value is weighted by the number of
+valid samples behind it and dropouts never pull a cell toward zero. Cell
+sums come from np.add.reduceat over row and column edges (any grid size, cells
+need not divide the image evenly); percentiles come from one sort of all
+pixels keyed by cell and value.
+"""
+
+import numpy as np
+
+
+def grid_edges(length, cells):
+    """
+    Start index of each cell along one axis (cell k covers int(k * length / cells) onward).
+
+    Args:
+        length: Image size along the axis
+        cells: Number of cells
+
+    Returns:
+        int array of cell starts
+    """
+    if not 1 <= cells <= length:
+        raise ValueError(f"Cannot split {length} pixels into {cells} cells")
+    return np.arange(cells) * length // cells
+
+
+def block_sum(values, row_edges, col_edges):
+    """
+    Sum of values inside each grid cell.
+
+    Args:
+        values: HxW array
+        row_edges, col_edges: Cell starts from grid_edges()
+
+    Returns:
+        rows x cols float64 array
+    """
+    sums = np.add.reduceat(values.astype(np.float64, copy=False), row_edges, axis=0)
+    return np.add.reduceat(sums, col_edges, axis=1)
+
+
+def block_percentiles(values, row_edges, col_edges, percentiles):
+    """
+    Percentiles of the finite values inside each grid cell (linear interpolation, like np.percentile).
+
+    Args:
+        values: HxW float array (NaN = no value)
+        row_edges, col_edges: Cell starts from grid_edges()
+        percentiles: Sequence of percentiles (0-100)
+
+    Returns:
+        dict {percentile: rows x cols float64 array}, NaN for empty cells
+    """
+    height, width = values.shape
+    rows, cols = len(row_edges), len(col_edges)
+    row_cell = np.repeat(np.arange(rows), np.diff(np.append(row_edges, height)))
+    col_cell = np.repeat(np.arange(cols), np.diff(np.append(col_edges, width)))
+    cell = (row_cell[:, None] * cols + col_cell[None, :]).ravel()
+
+    flat = values.ravel()
+    finite = np.isfinite(flat)
+    cell, flat = cell[finite], flat[finite]
+
+    if not len(flat):
+        return {percentile: np.full((rows, cols), np.nan) for percentile in percentiles}
+
+    # One sort by cell, then value (cell * span + value); each cell is then
+    # one contiguous sorted run
+    low_bound = float(flat.min())
+    span = float(flat.max()) - low_bound + 1
+    counts = np.bincount(cell, minlength=rows * cols)
+    ordered = np.sort(cell * span + (flat.astype(np.float64) - low_bound))
+    ordered -= np.repeat(np.arange(rows * cols) * span - low_bound, counts)
+    starts = np.cumsum(counts) - counts
+    has_values = counts > 0
+    last = np.maximum(counts - 1, 0)
+
+    result = {}
+    for percentile in percentiles:
+        position = last * (percentile / 100)
+        low = np.floor(position).astype(np.intp)
+        high = np.minimum(low + 1, last)
+        fraction = position - low
+        # Empty cells index a neighbor's run here and are masked below
+        low_value = ordered[np.minimum(starts + low, len(ordered) - 1)]
+        high_value = ordered[np.minimum(starts + high, len(ordered) - 1)]
+        cell_values = low_value + fraction * (high_value - low_value)
+        result[percentile] = np.where(has_values, cell_values, np.nan).reshape(rows, cols)
+    return result
+
+
+def grid_statistics(stats, grid_size=None, scale=1.0, percentiles=(5, 50, 95)):
+    """
+    Depth statistics per grid cell, or per pixel.
+
+    For a grid, each cell reports:
+    - mean: Mean of all valid samples in the cell
+    - std: Spread of the per-pixel means across the cell (spatial variation)
+    - noise: RMS over the cell of each pixel's standard deviation over time
+    - fill_rate: Valid samples / (pixels x frames)
+    - percentiles: Percentiles of the per-pixel means in the cell
+
+    With grid_size=None every pixel is its own cell (maps for heatmaps):
+    mean, noise (per-pixel std over time), fill_rate, and the running median,
+    min and max.
+
+    Args:
+        stats: PixelStatistics of the depth frames
+        grid_size: (rows, cols), or None for per-pixel maps
+        scale: Multiplier applied to depth values (e.g. depth_scale * 100 for cm)
+        percentiles: Percentiles to report per cell
+
+    Returns:
+        dict of 2-D float arrays (NaN where there were no valid samples);
+        'percentiles' maps percentile -> array
+    """
+    if stats.shape is None:
+        raise ValueError("No frames have been added to the statistics")
+
+    mean = stats.mean()
+    variance = stats.variance()
+
+    if grid_size is None:
+        return {
+            'mean': mean * scale,
+            'noise': np.sqrt(variance) * scale,
+            'fill_rate': stats.fill_rate(),
+            'percentiles': {50: stats.median() * scale},
+            'min': stats.minimum() * scale,
+            'max': stats.maximum() * scale
+        }
+
+    height, width = stats.shape
+    row_edges = grid_edges(height, grid_size[0])
+    col_edges = grid_edges(width, grid_size[1])
+
+    count = stats.count.astype(np.float64)
+    valid_pixel = stats.count > 0
+    pixel_mean = np.where(valid_pixel, mean, 0).astype(np.float64)
+    pixel_variance = np.where(valid_pixel, variance, 0).astype(np.float64)
+
+    samples = block_sum(count, row_edges, col_edges)
+    pixels = block_sum(valid_pixel, row_edges, col_edges)
+    sample_sum = block_sum(count * pixel_mean, row_edges, col_edges)
+    mean_sum = block_sum(pixel_mean, row_edges, col_edges)
+    mean_square_sum = block_sum(pixel_mean * pixel_mean, row_edges, col_edges)
+    variance_sum = block_sum(count * pixel_variance, row_edges, col_edges)
+    cell_pixels = np.outer(np.diff(np.append(row_edges, height)), np.diff(np.append(col_edges, width)))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cell_mean = sample_sum / samples
+        spatial_mean = mean_sum / pixels
+        spatial_variance = np.maximum(mean_square_sum / pixels - spatial_mean ** 2, 0)
+        noise = np.sqrt(variance_sum / samples)
+
+    return {
+        'mean': cell_mean * scale,
+        'std': np.sqrt(spatial_variance) * scale,
+        'noise': noise * scale,
+        'fill_rate': samples / (cell_pixels * max(stats.frames, 1)),
+        'valid_pixels': pixels,
+        'percentiles': {p: values * scale
+                        for p, values in block_percentiles(mean, row_edges, col_edges, percentiles).items()}
+    }
@@ -0,0 +1,162 @@
+"""
+Camera Intrinsics Helpers
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: Build, serialize and restore rs.intrinsics without a connected camera
+"""
+
+import pyrealsense2 as rs
+import numpy as np
+
+
+# D435 color sensor horizontal / vertical field of view (degrees)
+D435_COLOR_HFOV_DEG = 69.4
+D435_COLOR_VFOV_DEG = 42.5
+
+
+def make_intrinsics(width, height, fx, fy, ppx, ppy, model=rs.distortion.none, coeffs=None):
+    """
+    Build an rs.intrinsics object from raw parameters.
+
+    Args:
+        width, height: Image size in pixels
+        fx, fy: Focal lengths in pixels
+        ppx, ppy: Principal point in pixels
+        model: rs.distortion model
+        coeffs: 5 distortion coefficients (default all zero)
+
+    Returns:
+        rs.intrinsics
+    """
+    intrinsics = rs.intrinsics()
+    intrinsics.width = int(width)
+    intrinsics.height = int(height)
+    intrinsics.fx = float(fx)
+    intrinsics.fy = float(fy)
+    intrinsics.ppx = float(ppx)
+    intrinsics.ppy = float(ppy)
+    intrinsics.model = model
+    intrinsics.coeffs = [float(c) for c in (coeffs if coeffs is not None else [0.0] * 5)]
+    return intrinsics
+
+
+def default_intrinsics(width=1280, height=720):
+    """
+    Approximate D435 color intrinsics for a resolution (ideal pinhole, centered).
+
+    Args:
+        width, height: Image size in pixels
+
+    Returns:
+        rs.intrinsics
+    """
+    fx = width / (2 * np.tan(np.radians(D435_COLOR_HFOV_DEG) / 2))
+    fy = fx  # Square pixels
+    return make_intrinsics(width, height, fx, fy, (width - 1) / 2, (height - 1) / 2)
+
+
+def intrinsics_to_dict(intrinsics):
+    """
+    Convert rs.intrinsics to a JSON-serializable dict.
+
+    Args:
+        intrinsics: rs.intrinsics
+
+    Returns:
+        dict with width, height, fx, fy, ppx, ppy, model, coeffs
+    """
+    return {
+        'width': intrinsics.width,
+        'height': intrinsics.height,
+        'fx': intrinsics.fx,
+        'fy': intrinsics.fy,
+        'ppx': intrinsics.ppx,
+        'ppy': intrinsics.ppy,
+        'model': str(intrinsics.model).split('.')[-1],
+        'coeffs': list(intrinsics.coeffs)
+    }
+
+
+def intrinsics_from_dict(data):
+    """
+    Restore rs.intrinsics from a dict written by intrinsics_to_dict().
+
+    Also accepts the 'cx'/'cy' keys used in camera_intrinsics.json.
+
+    Args:
+        data: dict of intrinsic parameters
+
+    Returns:
+        rs.intrinsics
+    """
+    model_name = data.get('model', data.get('distortion_model', 'none'))
+    model_name = str(model_name).split('.')[-1]
+    model = getattr(rs.distortion, model_name, rs.distortion.none)
+
+    return make_intrinsics(
+        data['width'],
+        data['height'],
+        data['fx'],
+        data['fy'],
+        data.get('ppx', data.get('cx')),
+        data.get('ppy', data.get('cy')),
+        model=model,
+        coeffs=data.get('coeffs', data.get('distortion_coeffs'))
+    )
+
+
+def scale_intrinsics(intrinsics, factor, width=None, height=None, block_centers=True):
+    """
+    Intrinsics of an image downsampled by factor x factor pixel blocks.
+
+    Each output pixel covers one block, so its center maps back to
+    factor * x + (factor - 1) / 2 in the original image (block_centers).
+    rs.decimation_filter instead divides ppx/ppy by the factor, and its
+    frames carry those intrinsics; pass block_centers=False for depth
+    decimated by the SDK so both agree. Distortion coefficients act on
+    normalized coordinates and are unchanged.
+
+    Args:
+        intrinsics: rs.intrinsics of the full-resolution image
+        factor: Downsampling factor
+        width, height: Output size (default: original size // factor)
+        block_centers: True for decimate_depth(), False to match rs.decimation_filter
+
+    Returns:
+        rs.intrinsics
+    """
+    offset = (factor - 1) / 2 if block_centers else 0.0
+    return make_intrinsics(
+        width if width is not None else intrinsics.width // factor,
+        height if height is not None else intrinsics.height // factor,
+        intrinsics.fx / factor,
+        intrinsics.fy / factor,
+        (intrinsics.ppx - offset) / factor,
+        (intrinsics.ppy - offset) / factor,
+        model=intrinsics.model,
+        coeffs=list(intrinsics.coeffs)
+    )
+
+
+def crop_intrinsics(intrinsics, x, y, width, height):
+    """
+    Intrinsics of a sub-image (pixel (x, y) of the original becomes (0, 0)).
+
+    Args:
+        intrinsics: rs.intrinsics of the full image
+        x, y: Top-left corner of the crop
+        width, height: Crop size
+
+    Returns:
+        rs.intrinsics
+    """
+    return make_intrinsics(
+        width,
+        height,
+        intrinsics.fx,
+        intrinsics.fy,
+        intrinsics.ppx - x,
+        intrinsics.ppy - y,
+        model=intrinsics.model,
+        coeffs=list(intrinsics.coeffs)
+    )
@@ -0,0 +1,177 @@
+"""
+Streaming Pixel Statistics
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: Per-pixel depth statistics updated in place, in constant memory
+
+Each update() folds one frame into float32 buffers allocated on the first
+frame, so a run of any length costs the same memory as one frame:
+- valid sample count (zeros are dropouts and are skipped)
+- mean and variance (Welford), or exponentially weighted mean and variance
+- min and max
+- approximate median (stochastic median tracking, step scaled by the spread)
+
+The same class works for a single value per frame (shape (1,) arrays).
+"""
+
+import numpy as np
+
+
+class PixelStatistics:
+    """
+    Running per-pixel statistics of a sequence of same-sized arrays.
+
+    With alpha=None every frame has the same weight (unbounded window). With
+    alpha set, mean, variance and median follow an exponentially weighted
+    window where the newest frame has weight alpha (about 2 / (N + 1) for an
+    N-frame window). Min, max and counts always cover every frame.
+    """
+
+    def __init__(self, alpha=None, median_rate=0.05):
+        """
+        Initialize empty statistics.
+
+        Args:
+            alpha: Weight of the newest frame (None = all frames weighted equally)
+            median_rate: Median step per frame as a fraction of the standard deviation
+        """
+        if alpha is not None and not 0 < alpha <= 1:
+            raise ValueError(f"alpha must be in (0, 1], got {alpha}")
+        self.alpha = alpha
+        self.median_rate = np.float32(median_rate)
+        self.frames = 0
+        self.shape = None
+
+    def reset(self):
+        """Forget all frames (buffers are reallocated on the next update)."""
+        self.frames = 0
+        self.shape = None
+
+    def _allocate(self, shape):
+        """Statistics and scratch buffers for one array shape."""
+        self.count = np.zeros(shape, dtype=np.uint32)
+        self._mean = np.zeros(shape, dtype=np.float32)
+        self._spread = np.zeros(shape, dtype=np.float32)  # M2 (Welford) or variance (weighted)
+        self._min = np.full(shape, np.inf, dtype=np.float32)
+        self._max = np.full(shape, -np.inf, dtype=np.float32)
+        self._median = np.zeros(shape, dtype=np.float32)
+
+        self._x = np.empty(shape, dtype=np.float32)
+        self._delta = np.empty(shape, dtype=np.float32)
+        self._step = np.empty(shape, dtype=np.float32)
+        self._valid = np.empty(shape, dtype=bool)
+        self._first = np.empty(shape, dtype=bool)
+        self._later = np.empty(shape, dtype=bool)
+        self.frames = 0
+        self.shape = shape
+
+    def update(self, values):
+        """
+        Add one frame.
+
+        Args:
+            values: Array of the same shape every frame (e.g. uint16 depth).
+                    Zeros (and NaN for float input) are treated as missing
+        """
+        if values.shape != self.shape:
+            self._allocate(values.shape)
+        x, delta, step = self._x, self._delta, self._step
+        valid, first, later = self._valid, self._first, self._later
+
+        np.copyto(x, values, casting='unsafe')
+        np.not_equal(values, 0, out=valid)
+        if values.dtype.kind == 'f':
+            valid &= np.isfinite(values)
+
+        self.count += valid
+        np.equal(self.count, 1, out=first)
+        first &= valid
+        np.logical_xor(valid, first, out=later)
+
+        # First sample of a pixel starts its mean, min, max and median
+        np.copyto(self._mean, x, where=first)
+        np.copyto(self._median, x, where=first)
+        np.subtract(x, self._mean, out=delta)
+
+        if self.alpha is None:
+            # Welford: mean += delta / n, M2 += delta * (x - new mean)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                np.divide(delta, self.count, out=step, where=later, casting='unsafe')
+            np.add(self._mean, step, out=self._mean, where=later)
+            np.subtract(x, self._mean, out=step)
+            step *= delta
+            np.add(self._spread, step, out=self._spread, where=later)
+        else:
+            # Weighted: mean += a * delta, var = (1 - a) * (var + a * delta^2)
+            alpha = np.float32(self.alpha)
+            np.multiply(delta, alpha, out=step)
+            np.add(self._mean, step, out=self._mean, where=later)
+            step *= delta
+            step += self._spread
+            step *= np.float32(1) - alpha
+            np.copyto(self._spread, step, where=later)
+
+        np.minimum(self._min, x, out=self._min, where=valid)
+        np.maximum(self._max, x, out=self._max, where=valid)
+
+        # Median: move a small step toward each new sample; at the median,
+        # steps up and down balance
+        np.subtract(x, self._median, out=delta)
+        np.sign(delta, out=delta)
+        if self.alpha is None:
+            np.divide(self._spread, self.count, out=step, where=later, casting='unsafe')
+        else:
+            np.copyto(step, self._spread)
+        np.sqrt(step, out=step, where=later)
+        step *= self.median_rate
+        step *= delta
+        np.add(self._median, step, out=self._median, where=later)
+
+        self.frames += 1
+
+    def _variance(self, ddof=0):
+        """Variance from the internal buffers (no NaN masking)."""
+        if self.alpha is not None:
+            return self._spread.copy()
+        variance = np.zeros(self.shape, dtype=np.float32)
+        np.divide(self._spread, self.count.astype(np.float32) - ddof, out=variance, where=self.count > ddof)
+        return variance
+
+    def _masked(self, values, minimum_count=1):
+        """Copy of values with NaN where there are too few samples."""
+        return np.where(self.count >= minimum_count, values, np.float32(np.nan))
+
+    def mean(self):
+        """Mean per pixel (NaN where never valid)."""
+        return self._masked(self._mean)
+
+    def variance(self, ddof=0):
+        """
+        Variance per pixel (NaN where there are not enough samples).
+
+        Args:
+            ddof: Delta degrees of freedom (unbounded window only); 0 matches np.var
+        """
+        return self._masked(self._variance(ddof), max(ddof + 1, 1) if self.alpha is None else 1)
+
+    def std(self, ddof=0):
+        """Standard deviation per pixel (NaN where there are not enough samples)."""
+        return np.sqrt(self.variance(ddof))
+
+    def minimum(self):
+        """Smallest valid value per pixel (NaN where never valid)."""
+        return self._masked(self._min)
+
+    def maximum(self):
+        """Largest valid value per pixel (NaN where never valid)."""
+        return self._masked(self._max)
+
+    def median(self):
+        """Approximate running median per pixel (NaN where never valid)."""
+        return self._masked(self._median)
+
+    def fill_rate(self):
+        """Fraction of frames each pixel was valid in."""
+        if self.frames == 0:
+            return np.zeros(self.shape, dtype=np.float32)
+        return self.count / np.float32(self.frames)
@@ -0,0 +1,125 @@
+"""
+Point Cloud Engine
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: Build colored point clouds from aligned depth with NumPy only
+
+Compared with rs.pointcloud() + Open3D:
+- Invalid (zero) depth is masked out first, so only valid pixels are deprojected
+- Depth aligned to color shares its pixel grid, so colors are read directly
+  (no texture-coordinate lookup)
+- Points and colors are written into float32 / uint8 buffers that are
+  allocated once and reused every frame
+- Open3D is only imported when a cloud is actually converted
+"""
+
+import numpy as np
+
+from src.utils.deprojection import get_ray_table
+
+
+class PointCloud:
+    """
+    A point cloud as plain arrays.
+
+    Attributes:
+        points: Nx3 float32 (meters, camera frame)
+        colors: Nx3 uint8 RGB, or None
+    """
+
+    def __init__(self, points, colors=None):
+        self.points = points
+        self.colors = colors
+
+    def __len__(self):
+        return len(self.points)
+
+    def copy(self):
+        """Copy out of the engine's reusable buffers."""
+        return PointCloud(self.points.copy(), None if self.colors is None else self.colors.copy())
+
+    def to_open3d(self):
+        """
+        Convert to an Open3D point cloud (imports Open3D on first use).
+
+        Returns:
+            o3d.geometry.PointCloud
+        """
+        import open3d as o3d
+
+        pcd = o3d.geometry.PointCloud()
+        pcd.points = o3d.utility.Vector3dVector(self.points.astype(np.float64))
+        if self.colors is not None:
+            pcd.colors = o3d.utility.Vector3dVector(self.colors / 255.0)
+        return pcd
+
+
+class PointCloudEngine:
+    """
+    Reusable point cloud builder.
+
+    The returned PointCloud views the engine's buffers and is overwritten by
+    the next compute() call; use PointCloud.copy() to keep it.
+    """
+
+    def __init__(self):
+        self._points = None
+        self._colors = None
+        self._capacity = 0
+
+    def _ensure_capacity(self, num_pixels):
+        """Allocate buffers for a frame size (only when it grows)."""
+        if num_pixels > self._capacity:
+            self._points = np.empty((num_pixels, 3), dtype=np.float32)
+            self._colors = np.empty((num_pixels, 3), dtype=np.uint8)
+            self._capacity = num_pixels
+
+    def compute(self, depth_image, color_image, intrinsics, depth_scale, max_distance_m=None):
+        """
+        Build a point cloud from depth aligned to color.
+
+        Args:
+            depth_image: HxW uint16 depth image (aligned to color)
+            color_image: HxWx3 uint8 BGR image, or None for an uncolored cloud
+            intrinsics: rs.intrinsics of depth_image
+            depth_scale: Meters per depth unit
+            max_distance_m: Also drop points farther than this (None = keep all)
+
+        Returns:
+            PointCloud (views into reusable buffers)
+        """
+        height, width = depth_image.shape
+        if color_image is not None and color_image.shape[:2] != (height, width):
+            raise ValueError("Color image must be aligned to depth (same size). "
+                             "Read frames with aligned=True.")
+
+        self._ensure_capacity(height * width)
+        table = get_ray_table(intrinsics)
+
+        # Mask invalid depth before any math
+        depth_flat = depth_image.reshape(-1)
+        if max_distance_m is None:
+            valid = depth_flat != 0
+        else:
+            valid = (depth_flat != 0) & (depth_flat <= max_distance_m / depth_scale)
+        index = np.flatnonzero(valid)
+        n = len(index)
+
+        # Gather straight into the output columns, then scale by depth in place
+        points = self._points[:n]
+        np.multiply(depth_flat.take(index), np.float32(depth_scale), out=points[:, 2])
+        np.take(table.x.reshape(-1), index, out=points[:, 0], mode='clip')
+        np.take(table.y.reshape(-1), index, out=points[:, 1], mode='clip')
+        points[:, 0] *= points[:, 2]
+        points[:, 1] *= points[:, 2]
+
+        if color_image is None:
+            return PointCloud(points)
+
+        # Same pixel grid as depth: read colors directly (BGR -> RGB)
+        colors = self._colors[:n]
+        color_flat = color_image.reshape(-1, 3)
+        for channel in range(3):
+            np.take(color_flat[:, 2 - channel], index, out=colors[:, channel], mode='clip')
+
+        return PointCloud(points, colors)
@@ -0,0 +1,317 @@
+"""
+Stage Profiler
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: Per-stage latency of the capture -> align -> filter -> convert -> render path
+
+Code is instrumented with named stages:
+
+    profiler = get_profiler()
+    with profiler.stage('align'):
+        frames = align.process(frames)
+
+Each stage keeps a fixed-size histogram of durations (log-spaced bins from
+1 us to 10 s), so memory does not grow with run time and p50/p95/p99 can be
+read at any point. When profiling is disabled stage() returns one shared
+no-op context, so instrumented code costs a method call per stage.
+
+Stage names used by the pipelines:
+    read                                         (FrameSource.read, any source)
+    wait_for_frames, align, asanyarray           (RealSenseFrameSource)
+    spatial_filter, temporal_filter, hole_filter (RealSenseDataProcessor)
+    colormap, overlay, imshow                    (display loops)
+    get_frame, get_frames, get_aligned_frames    (totals per call)
+"""
+
+import json
+import math
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+
+# Histogram range and resolution (20 bins per decade is ~12% per bin)
+HISTOGRAM_MIN_S = 1e-6
+HISTOGRAM_MAX_S = 10.0
+BINS_PER_DECADE = 20
+
+PROFILE_DIR = Path(__file__).resolve().parent.parent.parent / 'results' / 'profiling'
+
+
+class StageHistogram:
+    """
+    Fixed-size log-spaced histogram of durations for one stage.
+
+    Durations below HISTOGRAM_MIN_S go in the first bin and above
+    HISTOGRAM_MAX_S in the last. Count, total, min and max are exact;
+    percentiles are accurate to one bin. Adds and to_dict() are locked, so
+    a stage can be timed from several threads while another reports.
+    """
+
+    NUM_BINS = int(round(math.log10(HISTOGRAM_MAX_S / HISTOGRAM_MIN_S) * BINS_PER_DECADE))
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = [0] * self.NUM_BINS
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+
+    def add(self, seconds):
+        """
+        Record one duration.
+
+        Args:
+            seconds: Duration in seconds
+        """
+        if seconds > HISTOGRAM_MIN_S:
+            index = min(int(math.log10(seconds / HISTOGRAM_MIN_S) * BINS_PER_DECADE), self.NUM_BINS - 1)
+        else:
+            index = 0
+
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds < self.min:
+                self.min = seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    @staticmethod
+    def bin_upper_edge(index):
+        """Upper edge of a bin in seconds."""
+        return HISTOGRAM_MIN_S * 10 ** ((index + 1) / BINS_PER_DECADE)
+
+    def percentile(self, q):
+        """
+        Estimate a percentile from the histogram.
+
+        Args:
+            q: Percentile (0-100)
+
+        Returns:
+            Duration in seconds (geometric center of the bin, clamped to min/max), or None
+        """
+        with self._lock:
+            return self._percentile(q)
+
+    def _percentile(self, q):
+        if self.count == 0:
+            return None
+
+        target = max(1, math.ceil(self.count * q / 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                center = self.bin_upper_edge(index) * 10 ** (-0.5 / BINS_PER_DECADE)
+                return min(max(center, self.min), self.max)
+        return self.max
+
+    def to_dict(self):
+        """Summary in milliseconds plus the non-empty bins."""
+        with self._lock:
+            return self._to_dict()
+
+    def _to_dict(self):
+        if self.count == 0:
+            return {'count': 0}
+
+        return {
+            'count': self.count,
+            'mean_ms': self.total / self.count * 1000,
+            'min_ms': self.min * 1000,
+            'max_ms': self.max * 1000,
+            'p50_ms': self._percentile(50) * 1000,
+            'p95_ms': self._percentile(95) * 1000,
+            'p99_ms': self._percentile(99) * 1000,
+            'total_ms': self.total * 1000,
+            # [upper edge ms, count] for each non-empty bin
+            'histogram': [[self.bin_upper_edge(i) * 1000, c] for i, c in enumerate(self.counts) if c],
+        }
+
+
+class _NullStage:
+    """Context used for every stage while profiling is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    """Times one with-block into a histogram."""
+
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.histogram.add(time.perf_counter() - self.start)
+        return False
+
+
+class StageProfiler:
+    """
+    Collects per-stage duration histograms.
+
+    Stages can be timed from several threads (e.g. the capture thread and the
+    display loop); each with-block gets its own timer, new stage names are
+    added under a lock and reports work on a copy of the stage table.
+    """
+
+    def __init__(self, enabled=False):
+        """
+        Initialize the profiler.
+
+        Args:
+            enabled: Start recording immediately
+        """
+        self.enabled = enabled
+        self.histograms = {}
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def enable(self):
+        """Start recording stage durations."""
+        self.enabled = True
+
+    def disable(self):
+        """Stop recording (collected histograms are kept)."""
+        self.enabled = False
+
+    def reset(self):
+        """Drop all collected histograms."""
+        self.histograms = {}
+        self.started_at = time.time()
+
+    def _histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.get(name)
+                if histogram is None:
+                    histogram = self.histograms[name] = StageHistogram()
+        return histogram
+
+    def stage(self, name):
+        """
+        Context manager timing a named stage.
+
+        Args:
+            name: Stage name
+
+        Returns:
+            Context manager (a shared no-op when disabled)
+        """
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self._histogram(name))
+
+    def record(self, name, seconds):
+        """
+        Record a duration measured elsewhere.
+
+        Args:
+            name: Stage name
+            seconds: Duration in seconds
+        """
+        if self.enabled:
+            self._histogram(name).add(seconds)
+
+    def report(self):
+        """
+        Get all stage statistics.
+
+        Returns:
+            dict of stage name -> statistics (milliseconds)
+        """
+        with self._lock:
+            histograms = list(self.histograms.items())
+        return {name: histogram.to_dict() for name, histogram in histograms}
+
+    def summary(self):
+        """Print a p50/p95/p99 table of all stages."""
+        if not self.histograms:
+            print("No stages profiled")
+            return
+
+        print("\n" + "="*78)
+        print(f"{'Stage':<22}{'Count':>8}{'Mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'Max ms':>8}")
+        print("="*78)
+        for name, stats in self.report().items():
+            if stats['count'] == 0:
+                continue
+            print(f"{name:<22}{stats['count']:>8}{stats['mean_ms']:>10.2f}{stats['p50_ms']:>10.2f}"
+                  f"{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}{stats['max_ms']:>8.1f}")
+        print("="*78)
+
+    def dump(self, path=None, label='profile'):
+        """
+        Save all stage statistics as JSON.
+
+        Args:
+            path: Output file (default: results/profiling/<label>_<timestamp>.json)
+            label: File name prefix when path is not given
+
+        Returns:
+            Path written
+        """
+        if path is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            path = PROFILE_DIR / f"{label}_{timestamp}.json"
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(path, 'w') as f:
+            json.dump({
+                'label': label,
+                'started_at': datetime.fromtimestamp(self.started_at).isoformat(),
+                'duration_s': time.time() - self.started_at,
+                'histogram_bins_per_decade': BINS_PER_DECADE,
+                'stages': self.report(),
+            }, f, indent=2)
+        return path
+
+    def finish(self, label):
+        """
+        Print the summary and dump JSON if anything was recorded (call on shutdown).
+
+        Args:
+            label: File name prefix for the JSON dump
+        """
+        if not self.histograms:
+            return
+        self.summary()
+        path = self.dump(label=label)
+        print(f"Stage timings saved to: {path}")
+
+
+# Shared by the frame sources, processors and display loops
+_profiler = StageProfiler()
+
+
+def get_profiler():
+    """
+    Get the process-wide stage profiler (disabled until enable() is called).
+
+    Returns:
+        StageProfiler
+    """
+    return _profiler
@@ -0,0 +1,200 @@
+"""
+Processing Region of Interest
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: Restrict filtering, colormaps, deprojection and statistics to part of the image
+
+A ProcessingROI is a rectangle or polygon in fractions of the image size, so
+one ROI works at any resolution and decimation factor. For a given image
+size it resolves to an ROIWindow: the bounding box (cropped as a zero-copy
+view) plus, for polygons, a mask of the pixels inside.
+"""
+
+import cv2
+import numpy as np
+
+
+class ROIWindow:
+    """
+    A ProcessingROI resolved for one image size.
+
+    Attributes:
+        shape: (height, width) of the full image
+        x, y: Top-left corner of the bounding box
+        width, height: Bounding box size
+        mask: height x width bool array of pixels inside (None for rectangles)
+        pixel_count: Number of pixels inside the ROI
+    """
+
+    def __init__(self, shape, x, y, width, height, mask=None):
+        self.shape = tuple(shape)
+        self.x, self.y = x, y
+        self.width, self.height = width, height
+        self.mask = mask
+        self.outside = None if mask is None else ~mask
+        self.pixel_count = width * height if mask is None else int(np.count_nonzero(mask))
+
+    @property
+    def crop_shape(self):
+        return self.height, self.width
+
+    @property
+    def area_fraction(self):
+        """Fraction of the full image inside the ROI."""
+        return self.pixel_count / (self.shape[0] * self.shape[1])
+
+    def crop(self, image, scale=1):
+        """
+        Bounding box of the ROI as a view (no copy).
+
+        Args:
+            image: HxW or HxWxC image of this window's shape (or scale times larger)
+            scale: Size of image relative to the window's shape, e.g. the
+                   decimation factor to crop full-resolution data
+
+        Returns:
+            View of image
+        """
+        return image[self.y * scale:(self.y + self.height) * scale,
+                     self.x * scale:(self.x + self.width) * scale]
+
+    def clear_outside(self, crop):
+        """
+        Zero the pixels of a cropped image that are outside a polygon ROI, in place.
+
+        Args:
+            crop: Cropped image (writable)
+        """
+        if self.outside is not None:
+            crop[self.outside] = 0
+
+    def select(self, image):
+        """
+        Values of the pixels inside the ROI (for statistics).
+
+        Args:
+            image: Full image, or an image already cropped to this window
+
+        Returns:
+            Cropped view (rectangle) or 1-D array of values (polygon)
+        """
+        if image.shape[:2] != self.crop_shape:
+            image = self.crop(image)
+        return image if self.mask is None else image[self.mask]
+
+
+class ProcessingROI:
+    """
+    Rectangle or polygon region to process, in fractions of the image size.
+
+    Windows are cached per image size, so resolving the ROI every frame is a
+    dictionary lookup.
+    """
+
+    def __init__(self, points, is_rectangle=False):
+        """
+        Create an ROI from polygon vertices.
+
+        Args:
+            points: Nx2 vertices (x, y) as fractions of width and height (0-1)
+            is_rectangle: True if points are an axis-aligned rectangle (no mask needed)
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if len(points) < 3:
+            raise ValueError("An ROI needs at least 3 vertices")
+        if points.min() < 0 or points.max() > 1:
+            raise ValueError("ROI vertices must be fractions of the image size (0-1)")
+
+        self.points = points
+        self.is_rectangle = is_rectangle
+        self._windows = {}
+
+    @classmethod
+    def rectangle(cls, left, top, right, bottom):
+        """
+        Axis-aligned rectangle.
+
+        Args:
+            left, top, right, bottom: Edges as fractions of width and height
+
+        Returns:
+            ProcessingROI
+        """
+        if not (left < right and top < bottom):
+            raise ValueError("ROI rectangle must have left < right and top < bottom")
+        return cls([(left, top), (right, top), (right, bottom), (left, bottom)], is_rectangle=True)
+
+    @classmethod
+    def from_pixels(cls, points, width, height):
+        """
+        Polygon from pixel coordinates of a width x height image.
+
+        Args:
+            points: Nx2 vertices (x, y) in pixels
+            width, height: Size of the image the points refer to
+
+        Returns:
+            ProcessingROI
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2) / (width, height)
+        return cls(np.clip(points, 0, 1))
+
+    def pixel_points(self, shape):
+        """
+        Vertices in pixels for an image size.
+
+        Args:
+            shape: (height, width)
+
+        Returns:
+            Nx2 float array (x, y)
+        """
+        return self.points * (shape[1], shape[0])
+
+    def window(self, shape):
+        """
+        Bounding box and mask of the ROI for an image size (cached).
+
+        Args:
+            shape: (height, width)
+
+        Returns:
+            ROIWindow
+        """
+        shape = tuple(shape[:2])
+        window = self._windows.get(shape)
+        if window is not None:
+            return window
+
+        height, width = shape
+        points = self.pixel_points(shape)
+        x0, y0 = np.floor(points.min(axis=0)).astype(int)
+        x1, y1 = np.ceil(points.max(axis=0)).astype(int)
+        x0, x1 = max(x0, 0), min(max(x1, x0 + 1), width)
+        y0, y1 = max(y0, 0), min(max(y1, y0 + 1), height)
+
+        mask = None
+        if not self.is_rectangle:
+            raster = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+            cv2.fillPoly(raster, [np.round(points - (x0, y0)).astype(np.int32)], 1)
+            mask = raster.astype(bool)
+
+        window = ROIWindow(shape, x0, y0, x1 - x0, y1 - y0, mask)
+        self._windows[shape] = window
+        return window
+
+    def draw(self, image, color=(0, 0, 255), thickness=2):
+        """
+        Draw the ROI outline on a full-size image, in place.
+
+        Args:
+            image: HxWx3 BGR image
+            color: BGR line color
+            thickness: Line thickness
+        """
+        points = np.round(self.pixel_points(image.shape)).astype(np.int32)
+        cv2.polylines(image, [points], isClosed=True, color=color, thickness=thickness)
+
+
+# The 10%-90% rectangle drawn as the area of best accuracy
+BEST_ACCURACY_ROI = ProcessingROI.rectangle(0.1, 0.1, 0.9, 0.9)
@@ -0,0 +1,290 @@
+"""
+Multi-Object Tracker
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: Follow world-space detections over frames with a constant-velocity Kalman filter
+
+Each track is a constant-velocity Kalman filter on the floor position
+(state x, y, vx, vy; measurement x, y). Track state is struct-of-arrays in
+preallocated storage: state, covariance, height, id and counters are one
+array each, and live tracks are kept packed at the front, so predict and
+update for all tracks are a few batched NumPy operations on slices. No
+per-track Python objects.
+
+Association per frame: a Euclidean distance matrix between predicted track
+positions and detections, gated at gate_m, solved as an assignment problem
+(scipy linear_sum_assignment). Unmatched detections start tentative tracks;
+a track is confirmed after min_hits matches. Tentative tracks are dropped
+on their first miss, confirmed tracks after max_missed misses in a row.
+"""
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+
+TRACK_DTYPE = np.dtype([
+    ('id', np.int64),             # Track id (unique for the tracker's lifetime)
+    ('position', np.float32, 2),  # Filtered world position (x, y), meters
+    ('velocity', np.float32, 2),  # Filtered velocity (vx, vy), m/s
+    ('height', np.float32),       # Latest detection height (meters)
+    ('hits', np.int32),           # Detections matched so far
+    ('missed', np.int32),         # Frames in a row without a detection
+])
+
+# Cost for gated-out pairs; larger than any real distance so they are only chosen when unavoidable
+_GATED_COST = 1e6
+
+
+class MultiObjectTracker:
+    """
+    Batched constant-velocity Kalman tracker for floor positions.
+
+    Usage:
+        tracker = MultiObjectTracker()
+        tracks = tracker.step(blobs['centroid'][:, :2], timestamp_s, heights=blobs['max_height'])
+    """
+
+    def __init__(self, capacity=256, gate_m=0.5, acceleration_std=2.0, measurement_std=0.03,
+                 min_hits=3, max_missed=15):
+        """
+        Preallocate track storage.
+
+        Args:
+            capacity: Maximum number of simultaneous tracks
+            gate_m: Maximum distance between a predicted track and its detection (meters)
+            acceleration_std: Process noise, as random acceleration (m/s^2)
+            measurement_std: Detection position noise (meters)
+            min_hits: Matches needed before a track is reported
+            max_missed: Frames a confirmed track survives without a detection
+        """
+        self.capacity = capacity
+        self.gate_m = gate_m
+        self.acceleration_var = acceleration_std ** 2
+        self.measurement_var = measurement_std ** 2
+        self.min_hits = min_hits
+        self.max_missed = max_missed
+
+        # Struct-of-arrays track storage; tracks [0, count) are live
+        self.state = np.zeros((capacity, 4))            # x, y, vx, vy
+        self.covariance = np.zeros((capacity, 4, 4))
+        self.height = np.zeros(capacity, dtype=np.float32)
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.hits = np.zeros(capacity, dtype=np.int32)
+        self.missed = np.zeros(capacity, dtype=np.int32)
+        self.count = 0
+
+        # Covariance of a new track: measured position, unknown velocity (up to ~2 m/s)
+        self._initial_covariance = np.diag([self.measurement_var, self.measurement_var, 4.0, 4.0])
+
+        self.next_id = 1
+        self.last_timestamp = None
+        self.dropped_detections = 0
+        # Track id per detection of the last step (-1 = no confirmed track)
+        self.detection_ids = np.empty(0, dtype=np.int64)
+
+    def predict(self, dt):
+        """
+        Advance all live tracks by dt seconds.
+
+        Args:
+            dt: Time step (seconds)
+        """
+        n = self.count
+        if n == 0 or dt <= 0:
+            return
+        x, P = self.state[:n], self.covariance[:n]
+
+        # x' = F x with F = [[I, dt I], [0, I]]
+        x[:, :2] += dt * x[:, 2:]
+
+        # P' = F P F^T + Q, written out for F's block structure
+        P[:, :2, :] += dt * P[:, 2:, :]
+        P[:, :, :2] += dt * P[:, :, 2:]
+        q = self.acceleration_var
+        for axis in range(2):
+            P[:, axis, axis] += q * dt ** 4 / 4
+            P[:, axis, axis + 2] += q * dt ** 3 / 2
+            P[:, axis + 2, axis] += q * dt ** 3 / 2
+            P[:, axis + 2, axis + 2] += q * dt ** 2
+
+    def associate(self, positions):
+        """
+        Gated assignment of detections to live tracks (on predicted positions).
+
+        Args:
+            positions: Mx2 detection positions (meters)
+
+        Returns:
+            (track indices, detection indices) of matched pairs
+        """
+        n = self.count
+        if n == 0 or len(positions) == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+
+        difference = self.state[:n, None, :2] - positions[None, :, :]
+        distance = np.sqrt(np.einsum('ijk,ijk->ij', difference, difference))
+        gated = distance > self.gate_m
+
+        # Only rows and columns with at least one pair inside the gate need solving
+        rows = np.flatnonzero(~gated.all(axis=1))
+        cols = np.flatnonzero(~gated.all(axis=0))
+        if len(rows) == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        cost = np.where(gated, _GATED_COST, distance)[np.ix_(rows, cols)]
+        row_index, col_index = linear_sum_assignment(cost)
+        tracks, detections = rows[row_index], cols[col_index]
+        inside = ~gated[tracks, detections]
+        return tracks[inside], detections[inside]
+
+    def update(self, tracks, positions):
+        """
+        Kalman update of some tracks with their matched detections.
+
+        Args:
+            tracks: Track indices
+            positions: Matching Kx2 detection positions (meters)
+        """
+        if len(tracks) == 0:
+            return
+        x, P = self.state[tracks], self.covariance[tracks]
+
+        # S = H P H^T + R, H picks x and y: closed-form 2x2 inverse
+        s00 = P[:, 0, 0] + self.measurement_var
+        s11 = P[:, 1, 1] + self.measurement_var
+        s01 = P[:, 0, 1]
+        s10 = P[:, 1, 0]
+        det = s00 * s11 - s01 * s10
+        S_inv = np.empty((len(tracks), 2, 2))
+        S_inv[:, 0, 0] = s11 / det
+        S_inv[:, 0, 1] = -s01 / det
+        S_inv[:, 1, 0] = -s10 / det
+        S_inv[:, 1, 1] = s00 / det
+
+        K = P[:, :, :2] @ S_inv                          # 4x2 gain per track
+        innovation = positions - x[:, :2]
+        x += (K @ innovation[:, :, None])[:, :, 0]
+        P -= K @ P[:, :2, :]
+
+        self.state[tracks] = x
+        self.covariance[tracks] = P
+
+    def spawn(self, positions, heights):
+        """
+        Start tentative tracks at unmatched detections.
+
+        Args:
+            positions: Kx2 detection positions (meters)
+            heights: K detection heights (meters)
+
+        Returns:
+            Track indices of the new tracks (detections past capacity are dropped)
+        """
+        k = min(len(positions), self.capacity - self.count)
+        self.dropped_detections += len(positions) - k
+        new = np.arange(self.count, self.count + k)
+
+        self.state[new, :2] = positions[:k]
+        self.state[new, 2:] = 0.0
+        self.covariance[new] = self._initial_covariance
+        self.height[new] = heights[:k]
+        self.ids[new] = np.arange(self.next_id, self.next_id + k)
+        self.hits[new] = 1
+        self.missed[new] = 0
+
+        self.next_id += k
+        self.count += k
+        return new
+
+    def prune(self):
+        """
+        Drop dead tracks and pack the live ones to the front of storage.
+
+        Returns:
+            Index of each old track in the packed storage (-1 = dropped)
+        """
+        n = self.count
+        confirmed = self.hits[:n] >= self.min_hits
+        alive = np.where(confirmed, self.missed[:n] <= self.max_missed, self.missed[:n] == 0)
+
+        remap = np.full(n, -1, dtype=np.intp)
+        keep = np.flatnonzero(alive)
+        remap[keep] = np.arange(len(keep))
+        if len(keep) < n:
+            for array in (self.state, self.covariance, self.height, self.ids, self.hits, self.missed):
+                array[:len(keep)] = array[keep]
+            self.count = len(keep)
+        return remap
+
+    def step(self, positions, timestamp, heights=None):
+        """
+        Track one frame of detections.
+
+        Args:
+            positions: Mx2 detection floor positions (meters)
+            timestamp: Frame time (seconds)
+            heights: Optional M detection heights (meters)
+
+        Returns:
+            Structured array of TRACK_DTYPE with the confirmed tracks.
+            self.detection_ids maps each detection to its confirmed track id (-1 = none)
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        heights = np.zeros(len(positions)) if heights is None else np.asarray(heights)
+
+        dt = 0.0 if self.last_timestamp is None else timestamp - self.last_timestamp
+        self.last_timestamp = timestamp
+        self.predict(dt)
+
+        tracks, detections = self.associate(positions)
+        self.update(tracks, positions[detections])
+        self.missed[:self.count] += 1
+        self.missed[tracks] = 0
+        self.hits[tracks] += 1
+        self.height[tracks] = heights[detections]
+
+        unmatched = np.ones(len(positions), dtype=bool)
+        unmatched[detections] = False
+        unmatched = np.flatnonzero(unmatched)
+        spawned = self.spawn(positions[unmatched], heights[unmatched])
+
+        # Track index per detection (before packing)
+        track_of = np.full(len(positions), -1, dtype=np.intp)
+        track_of[detections] = tracks
+        track_of[unmatched[:len(spawned)]] = spawned
+
+        remap = self.prune()
+        matched = track_of >= 0
+        track_of[matched] = remap[track_of[matched]]
+        matched = track_of >= 0
+        self.detection_ids = np.full(len(positions), -1, dtype=np.int64)
+        confirmed = self.hits[track_of[matched]] >= self.min_hits
+        self.detection_ids[np.flatnonzero(matched)[confirmed]] = self.ids[track_of[matched][confirmed]]
+
+        return self.tracks()
+
+    def tracks(self, confirmed_only=True):
+        """
+        Current tracks as a structured array.
+
+        Args:
+            confirmed_only: If True, only tracks with at least min_hits matches
+
+        Returns:
+            Structured array of TRACK_DTYPE
+        """
+        n = self.count
+        index = np.flatnonzero(self.hits[:n] >= self.min_hits) if confirmed_only else np.arange(n)
+        tracks = np.empty(len(index), dtype=TRACK_DTYPE)
+        tracks['id'] = self.ids[index]
+        tracks['position'] = self.state[index, :2]
+        tracks['velocity'] = self.state[index, 2:]
+        tracks['height'] = self.height[index]
+        tracks['hits'] = self.hits[index]
+        tracks['missed'] = self.missed[index]
+        return tracks
+
+    def reset(self):
+        """Drop all tracks (ids keep counting up)."""
+        self.count = 0
+        self.last_timestamp = None
+        self.detection_ids = np.empty(0, dtype=np.int64)
@@ -0,0 +1,228 @@
+"""
+Floor Zones
+Author: Aaron Fraze
+Date: October 18, 2026
+Purpose: World-frame floor polygons rasterized once, so zone membership is an array lookup per frame
+
+Zones are polygons on the floor in world coordinates (meters). They are
+rasterized twice:
+- a floor grid (cell_m cells over the zones' bounding box) for world
+  positions such as blob centroids or tracks: membership is one index
+  computation and one lookup
+- a per-pixel label map for the camera: every pixel's ray meets the floor
+  plane somewhere, and the label there is the pixel's zone. Membership of
+  every foreground pixel is pixel_labels[mask]
+
+The pixel map ignores depth: a pixel on top of a tall object gets the zone
+of the floor point behind it, not the zone under the object (parallax,
+growing with height and distance from the image center). It suits floor
+overlays and coarse pixel counts. For whether an object is in a zone, look
+up its measured world position: lookup(blobs['centroid']).
+
+Labels are zone index + 1 (0 = no zone). Where zones overlap, the later one
+wins. The pixel map depends on the calibration. It is rebuilt on first use
+after the pose or intrinsics change (a reloaded WorldFrameCalibrator,
+CoordinateTransformer.update_tilt), the same way the world ray cache of
+WorldFrameCalibrator is keyed.
+
+Zones file (JSON):
+    {"zones": [{"name": "door", "polygon": [[x, y], [x, y], ...]}, ...]}
+"""
+
+import json
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from src.utils.deprojection import get_ray_table, intrinsics_key
+from src.utils.foreground import camera_pose
+
+
+class Zone:
+    """
+    A named floor polygon in world coordinates.
+    """
+
+    def __init__(self, name, polygon):
+        """
+        Args:
+            name: Zone name (shown in alerts and on screen)
+            polygon: Nx2 world (x, y) vertices in meters, N >= 3
+        """
+        self.name = name
+        self.polygon = np.asarray(polygon, dtype=np.float64).reshape(-1, 2)
+        if len(self.polygon) < 3:
+            raise ValueError(f"Zone '{name}' needs at least 3 vertices")
+
+    def __repr__(self):
+        return f"Zone({self.name!r}, {len(self.polygon)} vertices)"
+
+
+def load_zones(path):
+    """
+    Read zones from a JSON file.
+
+    Args:
+        path: Zones file ({"zones": [{"name": ..., "polygon": [[x, y], ...]}, ...]})
+
+    Returns:
+        List of Zone
+    """
+    with open(path) as f:
+        data = json.load(f)
+    return [Zone(zone['name'], zone['polygon']) for zone in data['zones']]
+
+
+def save_zones(zones, path):
+    """
+    Write zones to a JSON file.
+
+    Args:
+        zones: List of Zone
+        path: Output file
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({'zones': [{'name': zone.name, 'polygon': zone.polygon.tolist()} for zone in zones]}, f, indent=2)
+
+
+class ZoneMap:
+    """
+    Zone label rasters for world positions and for camera pixels.
+
+    Usage:
+        zone_map = ZoneMap(load_zones('zones.json'), transformer)
+        labels = zone_map.lookup(blobs['centroid'])        # zone of each blob
+        counts = zone_map.pixel_counts(foreground)        # pixels per zone (floor behind them)
+    """
+
+    def __init__(self, zones, transformer, cell_m=0.01, plane_height_m=0.0):
+        """
+        Rasterize the floor grid (the pixel map follows on first use).
+
+        Args:
+            zones: List of Zone
+            transformer: CoordinateTransformer (intrinsics set) or calibrated WorldFrameCalibrator
+            cell_m: Floor grid cell size (meters)
+            plane_height_m: Height of the plane pixels are mapped through (0 = floor)
+        """
+        if not zones:
+            raise ValueError("No zones given")
+        if len(zones) > 254:
+            raise ValueError("At most 254 zones")
+        self.zones = list(zones)
+        self.names = [zone.name for zone in self.zones]
+        self.transformer = transformer
+        self.cell_m = cell_m
+        self.plane_height_m = plane_height_m
+
+        # Floor grid over the zones' bounding box, one cell of margin
+        vertices = np.vstack([zone.polygon for zone in self.zones])
+        self.origin = vertices.min(axis=0) - cell_m
+        size = np.ceil((vertices.max(axis=0) + cell_m - self.origin) / cell_m).astype(int) + 1
+        self.grid = np.zeros((size[1], size[0]), dtype=np.uint8)  # Rows = y, columns = x
+        # Cell (i, j) covers [i, i + 1) cells from the origin; fillPoly tests cell centers,
+        # so vertices go in as fixed-point cell coordinates (8 fractional bits) shifted by half a cell
+        for label, zone in enumerate(self.zones, start=1):
+            corners = np.round(((zone.polygon - self.origin) / cell_m - 0.5) * 256).astype(np.int32)
+            cv2.fillPoly(self.grid, [corners], label, shift=8)
+
+        self.pixel_labels = None
+        self.outlines = None
+        self.rebuilds = 0
+        self._pose_key = None
+
+    def __len__(self):
+        return len(self.zones)
+
+    def lookup(self, positions):
+        """
+        Zone label of world positions (floor grid lookup).
+
+        Args:
+            positions: Nx2 (or Nx3, z ignored) world positions in meters
+
+        Returns:
+            N uint8 labels (zone index + 1, 0 = none)
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, np.shape(positions)[-1])
+        cells = np.floor((positions[:, :2] - self.origin) / self.cell_m).astype(np.intp)
+        inside = (cells >= 0).all(axis=1) & (cells[:, 0] < self.grid.shape[1]) & (cells[:, 1] < self.grid.shape[0])
+        labels = np.zeros(len(positions), dtype=np.uint8)
+        labels[inside] = self.grid[cells[inside, 1], cells[inside, 0]]
+        return labels
+
+    def pixel_map(self):
+        """
+        Per-pixel zone labels for the current calibration (rebuilt if it changed).
+
+        Returns:
+            HxW uint8 labels (zone index + 1, 0 = none or ray never meets the plane)
+        """
+        intrinsics, rotation, position = camera_pose(self.transformer)
+        key = (intrinsics_key(intrinsics), rotation.tobytes(), position.tobytes())
+        if key != self._pose_key:
+            self._rasterize(intrinsics, rotation, position)
+            self._pose_key = key
+        return self.pixel_labels
+
+    def _rasterize(self, intrinsics, rotation, position):
+        """Label every pixel by where its ray meets the plane."""
+        ray_table = get_ray_table(intrinsics)
+        direction = [ray_table.x * rotation[axis, 0] + ray_table.y * rotation[axis, 1] + rotation[axis, 2]
+                     for axis in range(3)]
+
+        # Ray parameter where world Z reaches the plane; only rays going toward it count
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = (self.plane_height_m - position[2]) / direction[2]
+        hits = np.isfinite(t) & (t > 0)
+        t = np.where(hits, t, 0)
+        floor = np.stack([position[0] + t * direction[0], position[1] + t * direction[1]], axis=-1)
+
+        labels = self.lookup(floor.reshape(-1, 2)).reshape(t.shape)
+        labels[~hits] = 0
+        self.pixel_labels = labels
+
+        # Zone outlines in the image, for drawing
+        self.outlines = []
+        for label in range(1, len(self.zones) + 1):
+            contours, _ = cv2.findContours((labels == label).view(np.uint8), cv2.RETR_EXTERNAL,
+                                           cv2.CHAIN_APPROX_SIMPLE)
+            self.outlines.append(contours)
+        self.rebuilds += 1
+
+    def pixel_counts(self, mask):
+        """
+        Number of mask pixels in each zone.
+
+        A pixel counts for the zone of the floor point behind it, so pixels
+        of objects above the floor near a zone edge land in the wrong zone;
+        use lookup() on measured positions for object membership.
+
+        Args:
+            mask: HxW bool mask (e.g. the foreground)
+
+        Returns:
+            Array of len(zones) counts
+        """
+        return np.bincount(self.pixel_map()[mask], minlength=len(self.zones) + 1)[1:]
+
+    def draw(self, image, color=(0, 0, 255), occupied=None):
+        """
+        Draw zone outlines and names, in place.
+
+        Args:
+            image: HxWx3 BGR image
+            color: BGR color of the outlines
+            occupied: Optional bool per zone; occupied zones are drawn thicker
+        """
+        self.pixel_map()
+        for index, (name, contours) in enumerate(zip(self.names, self.outlines)):
+            if not contours:
+                continue
+            thickness = 3 if occupied is not None and occupied[index] else 1
+            cv2.drawContours(image, contours, -1, color, thickness)
+            x, y, _, _ = cv2.boundingRect(max(contours, key=cv2.contourArea))
+            cv2.putText(image, name, (x + 4, y + 16), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
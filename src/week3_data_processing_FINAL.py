@@ -8,11 +8,28 @@ Purpose: Implement depth filtering, point cloud generation, and coordinate syste
 import pyrealsense2 as rs
 import numpy as np
 import cv2
-import open3d as o3d
 from pathlib import Path
 import json
+import sys
 from datetime import datetime
 
+# Make the repository root importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.data.frame_source import RealSenseFrameSource, open_frame_source
+from src.utils.deprojection import get_ray_table, get_cropped_ray_table, intrinsics_key
+from src.utils.depth_filters import (decimate_depth, decimated_shape, SpatialFilter, TemporalFilter,
+                                     HoleFillingFilter)
+from src.utils.intrinsics import scale_intrinsics
+from src.utils.point_cloud import PointCloud, PointCloudEngine
+from src.data.point_cloud_writer import PointCloudWriter
+from src.utils.profiling import StageProfiler, get_profiler
+
+# With a ROI, SDK frames are cropped first and filtered with the array filters only
+# when the crop's bounding box is at most this fraction of the frame. The array
+# filters are 2.5-7x slower than the SDK's at 1280x720 (about 3x for all three),
+# so cropping wins only below about a third of the frame; larger ROIs run the SDK
+# filters on the full frame and crop afterwards
+ARRAY_FILTER_MAX_ROI_AREA = 0.25
 
 class RealSenseDataProcessor:
     """
@@ -20,47 +37,68 @@ class RealSenseDataProcessor:
     Handles filtering, point clouds, and coordinate transformations.
     """
     
-    def __init__(self, output_dir="results/week3_processing"):
-        """Initialize the data processor."""
+    def __init__(self, output_dir="results/week3_processing", source=None, profile=False,
+                 max_warmup_frames=90, decimation=1, roi=None):
+        """
+        Initialize the data processor.
+
+        Args:
+            output_dir: Directory to save results
+            source: FrameSource to read from (None = live RealSense camera)
+            profile: If True, record per-stage timings (saved on shutdown)
+            max_warmup_frames: Upper bound on warm-up frames (stops early once exposure and depth settle)
+            decimation: Process depth at 1/decimation resolution (1 = full resolution)
+            roi: ProcessingROI to restrict processing to (None = full frame), see set_roi
+        """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
         # Initialize RealSense
-        self.pipeline = rs.pipeline()
-        self.config = rs.config()
-        
         # Configure streams - 1280x720 for wider FOV (~87° horizontal)
         # This provides better coverage for overhead workspace tracking
         # For smaller coverage or faster processing, use 640x480 or 848x480
-        self.config.enable_stream(rs.stream.depth, 1280, 720, rs.format.z16, 30)
-        self.config.enable_stream(rs.stream.color, 1280, 720, rs.format.bgr8, 30)
-        
-        # Start pipeline
-        print("Starting RealSense camera...")
-        self.profile = self.pipeline.start(self.config)
+        if source is None:
+            source = RealSenseFrameSource(1280, 720, 30)
+        self.source = source
         
-        # Get device and sensors
-        self.device = self.profile.get_device()
-        self.depth_sensor = self.device.first_depth_sensor()
-        self.depth_scale = self.depth_sensor.get_depth_scale()
+        # Start source
+        self.source.start()
+        self.depth_scale = self.source.depth_scale
         
         # Get intrinsics (will be populated after first frame)
         self.depth_intrinsics = None
         self.color_intrinsics = None
         
-        # Create alignment object (align depth to color)
-        self.align = rs.align(rs.stream.color)
-        
         # Filtering options
         self.filters = self._setup_filters()
+        self.array_filters = self._setup_array_filters()
+        
+        # Decimated processing (intrinsics of decimated images, cached)
+        self._scaled_intrinsics = {}
+        self.set_decimation(decimation)
+        
+        # Processing region of interest
+        self.roi = roi
+        
+        # Reusable point cloud buffers and background file writer
+        self.point_cloud_engine = PointCloudEngine()
+        self.cloud_writer = PointCloudWriter()
         
         print(f"Depth scale: {self.depth_scale} meters/unit")
         print("Camera initialized!\n")
         
         # Warm up
-        print("Warming up camera (3 seconds)...")
-        for _ in range(90):
-            self.pipeline.wait_for_frames()
+        if self.source.is_live:
+            print(f"Warming up camera (up to {max_warmup_frames} frames)...")
+        self.source.warmup(max_warmup_frames)
+
+        # Load (or build and save) the ray table for aligned depth
+        get_ray_table(self.source.color_intrinsics)
+
+        # Stage timings (enabled after warm-up so warm-up frames are not counted)
+        self.profiler = get_profiler()
+        if profile:
+            self.profiler.enable()
         print("Ready!\n")
     
     def _setup_filters(self):
@@ -94,6 +132,127 @@ class RealSenseDataProcessor:
         
         return filters
     
+    def _setup_array_filters(self):
+        """
+        Set up the array versions of the spatial, temporal and hole filling filters.
+        
+        They take their settings from the SDK filters and filter depth from
+        sources without SDK frames (.opsrec recordings, synthetic scenes).
+        """
+        spatial = self.filters['spatial']
+        temporal = self.filters['temporal']
+        return {
+            'spatial': SpatialFilter(magnitude=spatial.get_option(rs.option.filter_magnitude),
+                                     alpha=spatial.get_option(rs.option.filter_smooth_alpha),
+                                     delta=spatial.get_option(rs.option.filter_smooth_delta)),
+            'temporal': TemporalFilter(alpha=temporal.get_option(rs.option.filter_smooth_alpha),
+                                       delta=temporal.get_option(rs.option.filter_smooth_delta),
+                                       persistence=int(temporal.get_option(rs.option.holes_fill))),
+            'hole_filling': HoleFillingFilter(int(self.filters['hole_filling'].get_option(rs.option.holes_fill)))
+        }
+    
+    def set_decimation(self, factor):
+        """
+        Set the decimation factor of the processing path.
+        
+        With factor > 1, depth is decimated before the other filters, aligned
+        color is resampled onto the decimated grid, and intrinsics (and so the
+        ray tables) are rescaled to match. get_frames, pixel_to_3d_point and
+        generate_point_cloud all work on the smaller images unchanged.
+        
+        Args:
+            factor: Decimation factor, 1 (full resolution) to 8
+        """
+        factor = int(factor)
+        if not 1 <= factor <= 8:
+            raise ValueError("Decimation factor must be between 1 and 8")
+        
+        self.decimation = factor
+        self.filters['decimation'].set_option(rs.option.filter_magnitude, factor)
+    
+    def set_roi(self, roi):
+        """
+        Restrict processing to a region of interest.
+        
+        Depth is cropped to the ROI's bounding box right after capture (and
+        decimation), so the filters, colormap, point cloud and statistics
+        only see pixels inside it. get_frames returns the cropped images
+        with matching intrinsics; pixels outside a polygon ROI are 0.
+        The SDK filters cannot be restricted to part of a frame: SDK frames
+        (camera, .bag) are filtered in full and then cropped, unless the ROI's
+        bounding box is at most ARRAY_FILTER_MAX_ROI_AREA of the frame, where
+        cropping first and using the (slower per pixel) array filters wins.
+        Other sources always crop first.
+        
+        Args:
+            roi: ProcessingROI, or None for the full frame
+        """
+        self.roi = roi
+    
+    def _intrinsics_for(self, depth_image, intrinsics, window=None, sdk_decimated=False):
+        """
+        Intrinsics of a depth image that may have been decimated and cropped to the ROI.
+        
+        Args:
+            depth_image: HxW depth image
+            intrinsics: rs.intrinsics of the full-resolution image
+            window: ROIWindow depth_image was cropped with (None = not cropped)
+            sdk_decimated: True if rs.decimation_filter decimated depth_image
+                           (it scales the principal point without the block offset)
+            
+        Returns:
+            rs.intrinsics matching depth_image
+        """
+        height, width = depth_image.shape[:2] if window is None else window.shape
+        if (width, height) == (intrinsics.width, intrinsics.height):
+            scaled = intrinsics
+        else:
+            # The SDK pads decimated frames, so the size is passed explicitly
+            key = (intrinsics_key(intrinsics), self.decimation, width, height, sdk_decimated)
+            scaled = self._scaled_intrinsics.get(key)
+            if scaled is None:
+                scaled = scale_intrinsics(intrinsics, self.decimation, width, height,
+                                          block_centers=not sdk_decimated)
+                self._scaled_intrinsics[key] = scaled
+        
+        if window is None:
+            return scaled
+        
+        # Cropped intrinsics; the ray table is cut from the full one
+        key = (intrinsics_key(scaled), window.x, window.y, window.width, window.height)
+        cropped = self._scaled_intrinsics.get(key)
+        if cropped is None:
+            cropped = get_cropped_ray_table(scaled, window.x, window.y, window.width, window.height).intrinsics
+            self._scaled_intrinsics[key] = cropped
+        return cropped
+    
+    def _match_color(self, color_image, shape):
+        """
+        Resample aligned color onto the decimated depth grid (block average).
+        
+        Args:
+            color_image: HxWx3 BGR image aligned to full-resolution depth
+            shape: (height, width) of the decimated depth image
+            
+        Returns:
+            color image of the given shape
+        """
+        if color_image.shape[:2] == tuple(shape):
+            return color_image
+        
+        factor = self.decimation
+        height = min(shape[0], color_image.shape[0] // factor)
+        width = min(shape[1], color_image.shape[1] // factor)
+        resized = cv2.resize(color_image[:height * factor, :width * factor], (width, height),
+                             interpolation=cv2.INTER_AREA)
+        if resized.shape[:2] == tuple(shape):
+            return resized
+        
+        # Match the SDK's padded decimated frame size
+        padded = np.zeros((shape[0], shape[1], 3), dtype=np.uint8)
+        padded[:height, :width] = resized
+        return padded
+    
     def get_frames(self, aligned=True, apply_filters=True):
         """
         Capture and process frames.
@@ -103,115 +262,265 @@ class RealSenseDataProcessor:
             apply_filters: If True, apply post-processing filters
             
         Returns:
-            dict with color_image, depth_image, depth_colormap
+            dict with color, depth, depth_colormap, depth_frame, color_frame,
+            intrinsics (of depth/color as returned, decimated if enabled) and
+            roi (ROIWindow the images were cropped with, or None)
         """
-        frames = self.pipeline.wait_for_frames()
-        
-        # Align if requested
-        if aligned:
-            frames = self.align.process(frames)
-        
-        depth_frame = frames.get_depth_frame()
-        color_frame = frames.get_color_frame()
-        
-        if not depth_frame or not color_frame:
+        with self.profiler.stage('get_frames'):
+            return self._get_frames(aligned, apply_filters)
+
+    def _get_frames(self, aligned, apply_filters):
+        frame = self.source.read(aligned=aligned)
+        if frame is None:
             return None
         
-        # Store intrinsics on first frame
-        if self.depth_intrinsics is None:
-            self.depth_intrinsics = depth_frame.profile.as_video_stream_profile().intrinsics
-            self.color_intrinsics = color_frame.profile.as_video_stream_profile().intrinsics
-        
-        # Apply filters
-        if apply_filters:
-            depth_frame = self._apply_filters(depth_frame)
-        
-        # Convert to numpy arrays
-        depth_image = np.asanyarray(depth_frame.get_data())
-        color_image = np.asanyarray(color_frame.get_data())
+        depth_frame, depth_image, window = self._process_depth(frame, apply_filters, self.profiler)
+        color_image = frame['color_image']
+        color_frame = frame['color_frame']
+        
+        # Aligned color follows depth onto the ROI and the decimated grid
+        if aligned and window is not None:
+            color_image = window.crop(color_image, scale=self.decimation)
+        elif window is not None:
+            color_image = self.roi.window(color_image.shape).crop(color_image)
+        if aligned and self.decimation > 1:
+            with self.profiler.stage('color_resample'):
+                color_image = self._match_color(color_image, depth_image.shape)
+        
+        # Intrinsics of the images handed out (rescaled when decimated, cropped with a ROI)
+        # SDK frames are always decimated by rs.decimation_filter (see _process_depth)
+        self.depth_intrinsics = self._intrinsics_for(depth_image, frame['depth_intrinsics'], window,
+                                                     sdk_decimated=frame['depth_frame'] is not None)
+        if self.color_intrinsics is None:
+            self.color_intrinsics = frame['color_intrinsics']
         
         # Create colormap for visualization
-        depth_colormap = cv2.applyColorMap(
-            cv2.convertScaleAbs(depth_image, alpha=0.03), 
-            cv2.COLORMAP_JET
-        )
+        with self.profiler.stage('colormap'):
+            depth_colormap = cv2.applyColorMap(
+                cv2.convertScaleAbs(depth_image, alpha=0.03),
+                cv2.COLORMAP_JET
+            )
         
         return {
             'color': color_image,
             'depth': depth_image,
             'depth_colormap': depth_colormap,
             'depth_frame': depth_frame,  # Keep for point cloud
-            'color_frame': color_frame
+            'color_frame': color_frame,
+            'intrinsics': self.depth_intrinsics,
+            'roi': window
         }
     
-    def _apply_filters(self, depth_frame):
-        """Apply post-processing filters to depth frame."""
-        # Apply in recommended order (skip decimation for visualization)
-        filtered = depth_frame
-        # Skip decimation - it reduces resolution and causes size mismatch
-        # filtered = self.filters['decimation'].process(filtered)
-        filtered = self.filters['spatial'].process(filtered)
-        filtered = self.filters['temporal'].process(filtered)
-        filtered = self.filters['hole_filling'].process(filtered)
-        return filtered
-    
-    def generate_point_cloud(self, depth_frame, color_frame, save_path=None):
+    def _process_depth(self, frame, apply_filters, profiler):
         """
-        Generate point cloud from depth and color frames.
+        Crop to the ROI, filter (optionally) and convert the depth of an already captured frame.
         
         Args:
-            depth_frame: RealSense depth frame
-            color_frame: RealSense color frame
-            save_path: Optional path to save point cloud (.ply)
+            frame: Frame dict from the source
+            apply_filters: If True, apply post-processing filters
+            profiler: StageProfiler that times each step
             
         Returns:
-            Open3D point cloud object
+            tuple: (depth_frame, depth_image, window); depth_frame is None for
+            non-SDK sources and with a ROI, window is the ROIWindow (or None)
+        """
+        depth_frame = frame['depth_frame']
+        
+        if self.roi is not None:
+            if depth_frame is not None and apply_filters and not self._crop_before_filters(depth_frame):
+                return self._filter_then_crop(depth_frame, profiler)
+            return self._process_depth_roi(frame, apply_filters, profiler)
+        
+        # Sources without SDK frames: array versions of the filters
+        if depth_frame is None:
+            depth_image = frame['depth_image']
+            if self.decimation > 1:
+                with profiler.stage('decimation_filter'):
+                    depth_image = decimate_depth(depth_image, self.decimation)
+            if apply_filters:
+                # The filters work in place; keep the source's image intact
+                if depth_image is frame['depth_image']:
+                    depth_image = depth_image.copy()
+                self._apply_array_filters(depth_image, profiler)
+            return None, depth_image, None
+        
+        if self.decimation == 1 and not apply_filters:
+            return depth_frame, frame['depth_image'], None
+        
+        depth_frame, depth_image = self._process_depth_frame(depth_frame, apply_filters, profiler)
+        return depth_frame, depth_image, None
+    
+    def _process_depth_frame(self, depth_frame, apply_filters, profiler):
+        """
+        Decimate and filter a full SDK depth frame with the SDK filters.
+        
+        Returns:
+            tuple: (depth_frame, depth_image)
         """
-        # Create point cloud using RealSense
-        pc = rs.pointcloud()
-        pc.map_to(color_frame)
-        points = pc.calculate(depth_frame)
+        # Decimate first so the other filters run on the smaller image
+        if self.decimation > 1:
+            with profiler.stage('decimation_filter'):
+                depth_frame = self.filters['decimation'].process(depth_frame)
+        if apply_filters:
+            depth_frame = self._apply_filters(depth_frame, profiler)
         
-        # Get vertices and texture coordinates
-        vtx = np.asanyarray(points.get_vertices()).view(np.float32).reshape(-1, 3)
-        tex = np.asanyarray(points.get_texture_coordinates()).view(np.float32).reshape(-1, 2)
+        with profiler.stage('asanyarray'):
+            depth_image = np.asanyarray(depth_frame.get_data())
+        return depth_frame, depth_image
+    
+    def _crop_before_filters(self, depth_frame):
+        """
+        Whether the ROI is small enough for cropping + array filters to beat the SDK filters on the full frame.
         
-        # Get color image
-        color_image = np.asanyarray(color_frame.get_data())
+        Args:
+            depth_frame: SDK depth frame (full resolution)
+        """
+        shape = decimated_shape((depth_frame.get_height(), depth_frame.get_width()), self.decimation)
+        window = self.roi.window(shape)
+        return window.width * window.height <= ARRAY_FILTER_MAX_ROI_AREA * shape[0] * shape[1]
+    
+    def _filter_then_crop(self, depth_frame, profiler):
+        """
+        _process_depth with a large ROI on SDK frames: SDK filters on the full frame, then crop.
         
-        # Map texture coordinates to colors
-        h, w = color_image.shape[:2]
-        u = np.clip(tex[:, 0] * w, 0, w-1).astype(int)
-        v = np.clip(tex[:, 1] * h, 0, h-1).astype(int)
-        colors = color_image[v, u] / 255.0  # Normalize to [0, 1]
+        Returns:
+            tuple: (None, depth_image, window)
+        """
+        _, depth_image = self._process_depth_frame(depth_frame, True, profiler)
+        window = self.roi.window(depth_image.shape)
+        depth_image = window.crop(depth_image)
+        
+        # Outside a polygon is no data; the filtered frame belongs to the SDK, so copy first
+        if window.mask is not None:
+            depth_image = depth_image.copy()
+            window.clear_outside(depth_image)
+        return None, depth_image, window
+    
+    def _process_depth_roi(self, frame, apply_filters, profiler):
+        """
+        _process_depth with a ROI: crop first, then decimate and filter only the crop.
         
-        # Convert to Open3D format (BGR -> RGB)
-        colors = colors[:, [2, 1, 0]]
+        Returns:
+            tuple: (None, depth_image, window)
+        """
+        depth_frame = frame['depth_frame']
+        depth_image = frame['depth_image']
+        
+        if depth_frame is None or self.decimation == 1:
+            # Blocks line up, so cropping full-resolution depth to the ROI
+            # scaled by the factor and then decimating equals the reverse
+            window = self.roi.window(decimated_shape(depth_image.shape, self.decimation))
+            depth_image = window.crop(depth_image, scale=self.decimation)
+            if self.decimation > 1:
+                with profiler.stage('decimation_filter'):
+                    depth_image = decimate_depth(depth_image, self.decimation)
+        else:
+            # The SDK decimates (and pads) whole frames
+            with profiler.stage('decimation_filter'):
+                depth_frame = self.filters['decimation'].process(depth_frame)
+            depth_image = np.asanyarray(depth_frame.get_data())
+            window = self.roi.window(depth_image.shape)
+            depth_image = window.crop(depth_image)
+        
+        # The crop is a view of the source's image; copy before writing to it
+        if window.mask is None and not apply_filters:
+            return None, depth_image, window
+        if depth_image.base is not None:
+            depth_image = depth_image.copy()
+        
+        # Outside a polygon is no data, before (no influence) and after (no hole filling) filtering
+        window.clear_outside(depth_image)
+        if apply_filters:
+            self._apply_array_filters(depth_image, profiler)
+            window.clear_outside(depth_image)
+        return None, depth_image, window
+    
+    def _apply_filters(self, depth_frame, profiler=None):
+        """Apply post-processing filters to depth frame."""
+        profiler = profiler or self.profiler
         
-        # Create Open3D point cloud
-        pcd = o3d.geometry.PointCloud()
-        pcd.points = o3d.utility.Vector3dVector(vtx)
-        pcd.colors = o3d.utility.Vector3dVector(colors)
+        # Apply in recommended order (decimation, when enabled, already ran in _process_depth)
+        filtered = depth_frame
+        with profiler.stage('spatial_filter'):
+            filtered = self.filters['spatial'].process(filtered)
+        with profiler.stage('temporal_filter'):
+            filtered = self.filters['temporal'].process(filtered)
+        with profiler.stage('hole_filter'):
+            filtered = self.filters['hole_filling'].process(filtered)
+        return filtered
+    
+    def _apply_array_filters(self, depth_image, profiler=None):
+        """Apply the array versions of the post-processing filters to a depth image, in place."""
+        profiler = profiler or self.profiler
+        
+        with profiler.stage('spatial_filter'):
+            self.array_filters['spatial'].process(depth_image)
+        with profiler.stage('temporal_filter'):
+            self.array_filters['temporal'].process(depth_image)
+        with profiler.stage('hole_filter'):
+            self.array_filters['hole_filling'].process(depth_image)
+        return depth_image
+    
+    def generate_point_cloud(self, depth, color, save_path=None, max_distance_m=None, intrinsics=None):
+        """
+        Generate point cloud from aligned depth and color.
         
-        # Remove invalid points (zero depth)
-        valid_mask = np.any(vtx != 0, axis=1)
-        pcd = pcd.select_by_index(np.where(valid_mask)[0])
+        Args:
+            depth: Depth image (HxW uint16, aligned to color) or RealSense depth frame
+            color: Color image (HxWx3 BGR) or RealSense color frame
+            save_path: Optional path to save point cloud (.ply or .pcd).
+                       Written on a background thread; this call does not wait for it
+            max_distance_m: Drop points farther than this (None = keep all)
+            intrinsics: Intrinsics of depth (default: derived from its size; with
+                        a ROI, those of the last get_frames call)
+            
+        Returns:
+            PointCloud with float32 points (meters) and uint8 RGB colors.
+            The arrays are reused by the next call; use .copy() to keep them
+            and .to_open3d() for an Open3D cloud.
+        """
+        if depth is None or color is None:
+            raise ValueError("Point cloud generation needs a depth and a color frame")
+        
+        if hasattr(depth, 'get_data'):
+            depth = np.asanyarray(depth.get_data())
+        if hasattr(color, 'get_data'):
+            color = np.asanyarray(color.get_data())
+        
+        # Full-resolution color (e.g. an SDK color frame) goes onto the decimated grid
+        if color.shape[:2] != depth.shape:
+            color = self._match_color(color, depth.shape)
+        
+        # Aligned depth uses the color intrinsics (rescaled if decimated, cropped with a ROI)
+        if intrinsics is None:
+            if self.roi is not None and self.depth_intrinsics is not None:
+                intrinsics = self.depth_intrinsics
+            else:
+                # Camera and .bag sources deliver SDK frames, decimated by the SDK
+                intrinsics = self._intrinsics_for(depth, self.source.color_intrinsics,
+                                                  sdk_decimated=isinstance(self.source, RealSenseFrameSource))
+        cloud = self.point_cloud_engine.compute(depth, color, intrinsics,
+                                                self.depth_scale, max_distance_m)
         
-        # Save if path provided
+        # Save in the background if path provided
         if save_path:
-            o3d.io.write_point_cloud(str(save_path), pcd)
-            print(f"Point cloud saved to: {save_path}")
+            self.cloud_writer.submit(save_path, cloud)
         
-        return pcd
+        return cloud
     
     def visualize_point_cloud(self, pcd, window_name="Point Cloud"):
         """
         Visualize point cloud using Open3D.
         
         Args:
-            pcd: Open3D point cloud
+            pcd: PointCloud or Open3D point cloud
             window_name: Window title
         """
+        import open3d as o3d
+        
+        if isinstance(pcd, PointCloud):
+            pcd = pcd.to_open3d()
+        
         print("\nPoint Cloud Visualization Controls:")
         print("  - Mouse: Rotate view")
         print("  - Scroll: Zoom")
@@ -309,12 +618,8 @@ class RealSenseDataProcessor:
         
         depth_m = depth_value * self.depth_scale
         
-        # Use intrinsic parameters to deproject
-        point_3d = rs.rs2_deproject_pixel_to_point(
-            self.depth_intrinsics,
-            [pixel_x, pixel_y],
-            depth_m
-        )
+        # Use the cached ray table for these intrinsics to deproject
+        point_3d = get_ray_table(self.depth_intrinsics).deproject_pixel(pixel_x, pixel_y, depth_m)
         
         return point_3d
     
@@ -410,7 +715,8 @@ class RealSenseDataProcessor:
             cv2.putText(vis, "Click to measure 3D coordinates | 'q' quit | 's' save point cloud",
                        (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
             
-            cv2.imshow('Click for 3D Coordinates', vis)
+            with self.profiler.stage('imshow'):
+                cv2.imshow('Click for 3D Coordinates', vis)
             
             key = cv2.waitKey(1) & 0xFF
             if key == ord('q'):
@@ -419,21 +725,31 @@ class RealSenseDataProcessor:
                 # Save point cloud
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 save_path = self.output_dir / f"pointcloud_{timestamp}.ply"
-                pcd = self.generate_point_cloud(
-                    frames_data['depth_frame'],
-                    frames_data['color_frame'],
-                    save_path=save_path
-                )
-                print(f"\n✓ Point cloud saved! ({len(pcd.points)} points)")
+                try:
+                    pcd = self.generate_point_cloud(
+                        frames_data['depth'],
+                        frames_data['color'],
+                        save_path=save_path
+                    )
+                    print(f"\n✓ Saving point cloud ({len(pcd.points)} points)...")
+                except ValueError as e:
+                    print(f"\n⚠ {e}")
         
         cv2.destroyAllWindows()
     
-    def compare_filtering_methods(self, duration_sec=5):
+    def compare_filtering_methods(self, duration_sec=5, show=True):
         """
         Compare raw vs filtered depth maps side-by-side.
         
+        Each frame is captured once; the raw and filtered branches both run
+        on it, so they show the same moment and no camera frames are wasted.
+        
         Args:
             duration_sec: How long to display comparison
+            show: If False, only run the branches and report their cost (no window)
+            
+        Returns:
+            dict with 'raw' and 'filtered' per-stage costs (see StageProfiler.report)
         """
         print("\n" + "="*60)
         print("DEPTH FILTERING COMPARISON")
@@ -441,40 +757,72 @@ class RealSenseDataProcessor:
         print(f"\nDisplaying comparison for {duration_sec} seconds...")
         print("Press 'q' to quit early\n")
         
+        # Per-branch stage costs
+        branches = (
+            ('raw', "RAW DEPTH", False, StageProfiler(enabled=True)),
+            ('filtered', "FILTERED DEPTH", True, StageProfiler(enabled=True)),
+        )
+        
+        # Allocated on the first frame and reused
+        canvas = None
+        scaled = None
+        
         start_time = cv2.getTickCount()
+        frame_count = 0
         
         while True:
-            # Get raw frames
-            frames_raw = self.get_frames(aligned=True, apply_filters=False)
-            frames_filtered = self.get_frames(aligned=True, apply_filters=True)
-            
-            if frames_raw is None or frames_filtered is None:
+            # Capture once for both branches
+            frame = self.source.read(aligned=True)
+            if frame is None:
+                if self.source.finished:
+                    break
                 continue
             
-            # Create side-by-side comparison
-            raw_colormap = frames_raw['depth_colormap']
-            filtered_colormap = frames_filtered['depth_colormap']
-            
-            # Add labels
-            cv2.putText(raw_colormap, "RAW DEPTH", (10, 30),
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-            cv2.putText(filtered_colormap, "FILTERED DEPTH", (10, 30),
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-            
-            comparison = np.hstack([raw_colormap, filtered_colormap])
+            for index, (_, label, apply_filters, costs) in enumerate(branches):
+                with costs.stage('total'):
+                    _, depth_image, _ = self._process_depth(frame, apply_filters, costs)
+                    
+                    # Sized from the processed depth (smaller when decimating)
+                    if canvas is None:
+                        height, width = depth_image.shape
+                        canvas = np.empty((height, width * 2, 3), dtype=np.uint8)
+                        scaled = np.empty((height, width), dtype=np.uint8)
+                    
+                    # Colorize straight into this branch's half of the canvas
+                    with costs.stage('colormap'):
+                        cv2.convertScaleAbs(depth_image, dst=scaled, alpha=0.03)
+                        cv2.applyColorMap(scaled, cv2.COLORMAP_JET, dst=canvas[:, index * width:(index + 1) * width])
+                
+                # Add labels
+                x = index * width + 10
+                cv2.putText(canvas, label, (x, 30),
+                           cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+                cv2.putText(canvas, f"{costs.histograms['total'].percentile(50) * 1000:.1f} ms/frame (p50)",
+                           (x, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+            frame_count += 1
             
-            cv2.imshow('Depth Filtering Comparison', comparison)
+            if show:
+                with self.profiler.stage('imshow'):
+                    cv2.imshow('Depth Filtering Comparison', canvas)
             
             # Check time
             elapsed = (cv2.getTickCount() - start_time) / cv2.getTickFrequency()
             if elapsed >= duration_sec:
                 break
             
-            if cv2.waitKey(1) & 0xFF == ord('q'):
+            if show and cv2.waitKey(1) & 0xFF == ord('q'):
                 break
         
-        cv2.destroyAllWindows()
+        if show:
+            cv2.destroyAllWindows()
+        
+        # Per-filter cost of each branch
+        for name, _, _, costs in branches:
+            print(f"\n{name.capitalize()} branch ({frame_count} frames):")
+            costs.summary()
+        
         print("✓ Comparison complete!")
+        return {name: costs.report() for name, _, _, costs in branches}
     
     def measure_workspace_guide(self):
         """
@@ -559,7 +907,9 @@ class RealSenseDataProcessor:
     def shutdown(self):
         """Stop camera pipeline."""
         print("\nShutting down camera...")
-        self.pipeline.stop()
+        self.cloud_writer.close()
+        self.source.stop()
+        self.profiler.finish('week3_processing')
         print("Done!")
 
 
@@ -569,7 +919,17 @@ if __name__ == "__main__":
     print("Week 3: Data Processing and Coordinate Systems")
     print("="*60)
     
-    processor = RealSenseDataProcessor()
+    # Optional frame source: 'synthetic' or a recording path (default: live camera)
+    # --profile saves per-stage timings on exit
+    args = [arg for arg in sys.argv[1:] if arg != '--profile']
+    source_spec = args[0] if args else None
+    
+    try:
+        processor = RealSenseDataProcessor(source=open_frame_source(source_spec),
+                                           profile='--profile' in sys.argv)
+    except RuntimeError as e:
+        print(e)
+        sys.exit(1)
     
     try:
         while True:
@@ -595,11 +955,15 @@ if __name__ == "__main__":
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 save_path = processor.output_dir / f"pointcloud_{timestamp}.ply"
                 
-                pcd = processor.generate_point_cloud(
-                    frames['depth_frame'],
-                    frames['color_frame'],
-                    save_path=save_path
-                )
+                try:
+                    pcd = processor.generate_point_cloud(
+                        frames['depth'],
+                        frames['color'],
+                        save_path=save_path
+                    )
+                except ValueError as e:
+                    print(f"\n⚠ {e}")
+                    continue
                 
                 print(f"\n✓ Generated point cloud with {len(pcd.points)} points")
                 
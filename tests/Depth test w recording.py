@@ -1,8 +1,15 @@
+import sys
+from pathlib import Path
+
 import pyrealsense2 as rs
 import numpy as np
 import cv2
 from datetime import datetime
 
+# Make the repository root importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.data.recorder import DepthRecorder
+
 # Create a pipeline
 pipeline = rs.pipeline()
 
@@ -12,15 +19,23 @@ config.enable_stream(rs.stream.depth, 848, 480, rs.format.z16, 30)
 config.enable_stream(rs.stream.color, 848, 480, rs.format.bgr8, 30)
 
 # Start streaming
-pipeline.start(config)
+profile = pipeline.start(config)
+
+# Stream info stored in the recording header
+depth_scale = profile.get_device().first_depth_sensor().get_depth_scale()
+depth_intrinsics = profile.get_stream(rs.stream.depth).as_video_stream_profile().get_intrinsics()
+color_intrinsics = profile.get_stream(rs.stream.color).as_video_stream_profile().get_intrinsics()
 
 # Create colorizer for depth visualization
 colorizer = rs.colorizer()
 
 # Recording variables
 is_recording = False
-color_writer = None
-depth_writer = None
+recorder = None
+
+# Depth codec of recordings: 'raw' writes frames as captured (no per-frame work in
+# this loop); 'rvl' compresses losslessly but encodes every frame here, on the UI thread
+depth_codec = 'raw'
 
 # Variables for mouse click
 click_x, click_y = 424, 240  # Start at center
@@ -52,9 +67,15 @@ try:
             continue
 
         # Convert to numpy arrays
+        raw_depth = np.asanyarray(depth_frame.get_data())
         depth_image = np.asanyarray(colorizer.colorize(depth_frame).get_data())
         color_image = np.asanyarray(color_frame.get_data())
 
+        # Record raw z16 depth and color before anything is drawn on them
+        if is_recording:
+            recorder.add_frame(raw_depth, color_image,
+                               depth_frame.get_frame_number(), depth_frame.get_timestamp())
+
         # Get depth at center point
         center_x, center_y = 424, 240
         center_depth = depth_frame.get_distance(center_x, center_y)
@@ -78,11 +99,6 @@ try:
                         (750, 40), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 255), 3)
             cv2.circle(color_image, (810, 30), 8, (0, 0, 255), -1)
 
-        # Write frames if recording
-        if is_recording:
-            color_writer.write(color_image)
-            depth_writer.write(depth_image)
-
         # Display images
         cv2.imshow('Color Image', color_image)
         cv2.imshow('Depth Image', depth_image)
@@ -96,29 +112,26 @@ try:
             if not is_recording:
                 # Start recording
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                color_filename = f"color_{timestamp}.mp4"
-                depth_filename = f"depth_{timestamp}.mp4"
+                filename = f"recording_{timestamp}.opsrec"
 
-                # Define codec for MP4 and create VideoWriter
-                fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-                color_writer = cv2.VideoWriter(color_filename, fourcc, 30.0, (848, 480))
-                depth_writer = cv2.VideoWriter(depth_filename, fourcc, 30.0, (848, 480))
+                # Lossless depth + color (unaligned, as captured)
+                recorder = DepthRecorder(filename, 848, 480, depth_scale,
+                                         depth_intrinsics=depth_intrinsics,
+                                         color_intrinsics=color_intrinsics,
+                                         fps=30, aligned=False, depth_codec=depth_codec)
 
                 is_recording = True
-                print(f"Recording started: {color_filename}, {depth_filename}")
+                print(f"Recording started: {filename}")
             else:
                 # Stop recording
                 is_recording = False
-                color_writer.release()
-                depth_writer.release()
-                color_writer = None
-                depth_writer = None
-                print("Recording stopped")
+                recorder.close()
+                print(f"Recording stopped: {recorder.frame_count} frames")
+                recorder = None
 
 finally:
     # Cleanup
     if is_recording:
-        color_writer.release()
-        depth_writer.release()
+        recorder.close()
     pipeline.stop()
     cv2.destroyAllWindows()
\ No newline at end of file
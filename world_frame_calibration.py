@@ -13,6 +13,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import Tuple, List, Dict, Optional
 
+from src.utils.deprojection import get_ray_table, intrinsics_key
+
 
 class WorldFrameCalibrator:
     """
@@ -47,6 +49,11 @@ class WorldFrameCalibrator:
         self.calibration_error_cm = None
         self.calibration_points = []
         
+        # Cached world-frame pixel rays (see depth_image_to_world_points)
+        self._world_rays = None
+        self._world_rays_key = None
+        self._world_offset_cm = None
+        
         print("World Frame Calibrator initialized")
     
     def setup_camera(self, pipeline: rs.pipeline):
@@ -201,12 +208,8 @@ class WorldFrameCalibrator:
         if self.camera_intrinsics is None:
             raise ValueError("Camera intrinsics not set. Call setup_camera() first.")
         
-        # Unproject using intrinsics
-        point_camera = rs.rs2_deproject_pixel_to_point(
-            self.camera_intrinsics,
-            [u, v],
-            depth_meters
-        )
+        # Unproject using the cached ray table (same result as rs2_deproject_pixel_to_point)
+        point_camera = get_ray_table(self.camera_intrinsics).deproject_pixel(u, v, depth_meters)
         
         return np.array(point_camera)
 
@@ -282,50 +285,85 @@ class WorldFrameCalibrator:
     '''
     def depth_image_to_world_points(
         self,
-        depth_frame: rs.depth_frame,
+        depth_frame,
         subsample: int = 1,
-        max_distance_cm: float = 300.0
-    ) -> Tuple[np.ndarray, np.ndarray]:
+        max_distance_cm: float = 300.0,
+        organized: bool = False
+    ) -> np.ndarray:
         """
         Convert entire depth image to world coordinates.
         
+        Each pixel's ray comes from a cached ray grid (see src/utils/deprojection.py),
+        and rotation, translation and the m -> cm conversion are applied as one
+        fused transform. Invalid and far pixels are masked out before any math.
+        
         Args:
-            depth_frame: RealSense depth frame
+            depth_frame: RealSense depth frame or HxW uint16 depth image
             subsample: Sample every Nth pixel (1 = all pixels)
             max_distance_cm: Ignore points beyond this distance
+            organized: If True, return an HxWx3 grid (of the subsampled image)
+                       with NaN at ignored pixels instead of an Nx3 array
             
         Returns:
-            (points_world, colors) - Nx3 array of world points (cm) and Nx3 RGB colors
+            float32 world points (cm): Nx3 array, or HxWx3 if organized
         """
-        depth_image = np.asanyarray(depth_frame.get_data())
-        height, width = depth_image.shape
+        if self.camera_intrinsics is None:
+            raise ValueError("Camera intrinsics not set. Call setup_camera() first.")
+        if self.T_world_camera is None:
+            raise ValueError("Calibration not set. Call define_simple_overhead_calibration() first.")
         
-        points_world = []
+        if hasattr(depth_frame, 'get_data'):
+            depth_image = np.asanyarray(depth_frame.get_data())
+        else:
+            depth_image = np.asarray(depth_frame)
         
-        for v in range(0, height, subsample):
-            for u in range(0, width, subsample):
-                depth_value = depth_image[v, u]
-                
-                if depth_value == 0:
-                    continue
-                
-                depth_meters = depth_value * self.depth_scale
-                depth_cm = depth_meters * 100
-                
-                if depth_cm > max_distance_cm:
-                    continue
-                
-                # Convert to camera frame
-                point_camera = self.pixel_to_camera_coordinates(u, v, depth_meters)
-                
-                # Convert to world frame
-                point_world = self.camera_to_world_coordinates(point_camera, return_cm=True)
-                
-                points_world.append(point_world)
+        # Subsample as views, no copies
+        depth = depth_image[::subsample, ::subsample]
+        world_rays = self._get_world_rays()[:, ::subsample, ::subsample]
+        
+        # Mask before transforming: valid depth within range
+        max_units = max_distance_cm / 100 / self.depth_scale
+        mask = (depth > 0) & (depth <= max_units)
         
-        points_world = np.array(points_world)
+        # World point = depth * (rotated ray) + camera position, all in cm
+        z = depth[mask].astype(np.float32)
+        z *= np.float32(self.depth_scale)
+        points = np.empty((len(z), 3), dtype=np.float32)
+        for axis in range(3):
+            np.multiply(world_rays[axis][mask], z, out=points[:, axis])
+            points[:, axis] += self._world_offset_cm[axis]
         
-        return points_world
+        if not organized:
+            return points
+        
+        grid = np.full(depth.shape + (3,), np.nan, dtype=np.float32)
+        grid[mask] = points
+        return grid
+    
+    def _get_world_rays(self) -> np.ndarray:
+        """
+        Per-pixel rays rotated into the world frame and scaled to cm.
+        
+        Stored as one HxW plane per axis so masking reads contiguous memory.
+        Cached until the intrinsics or the calibration change.
+        
+        Returns:
+            3xHxW float32 array
+        """
+        key = (intrinsics_key(self.camera_intrinsics), self.T_world_camera.tobytes())
+        if self._world_rays_key != key:
+            rays = get_ray_table(self.camera_intrinsics).rays
+            
+            # Fuse rotation and m -> cm into one 3x3 applied to (x/z, y/z, 1)
+            A = (self.T_world_camera[:3, :3] * 100).astype(np.float32)
+            world_rays = np.empty((3,) + rays.shape[:2], dtype=np.float32)
+            for axis in range(3):
+                world_rays[axis] = rays[..., 0] * A[axis, 0] + rays[..., 1] * A[axis, 1] + A[axis, 2]
+            
+            self._world_rays = world_rays
+            self._world_offset_cm = (self.T_world_camera[:3, 3] * 100).astype(np.float32)
+            self._world_rays_key = key
+        return self._world_rays
     
     def add_calibration_point(
         self,
@@ -7,14 +7,18 @@ Interactive tool to click points in the camera view and see their world coordina
 Used for validating the camera-to-world transformation.
 """
 
-import pyrealsense2 as rs
 import numpy as np
 import cv2
 import json
 from datetime import datetime
+import sys
 from pathlib import Path
 from coordinate_transform import CoordinateTransformer, format_coordinates
 
+# Make the repository root importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.data.frame_source import RealSenseFrameSource, open_frame_source
+
 
 class CalibrationClickTool:
     """
@@ -22,7 +26,7 @@ class CalibrationClickTool:
     """
     
     def __init__(self, camera_height_m=2.21, pitch_deg=0, roll_deg=0, yaw_deg=0,
-                 output_dir="results/calibration"):
+                 output_dir="results/calibration", source=None):
         """
         Initialize the calibration clicking tool.
         
@@ -32,6 +36,7 @@ class CalibrationClickTool:
             roll_deg: Camera roll angle (left/right rotation)
             yaw_deg: Camera yaw angle (side-to-side rotation)
             output_dir: Directory to save calibration data
+            source: FrameSource to read from (None = live RealSense camera)
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -45,32 +50,24 @@ class CalibrationClickTool:
         )
         
         # Initialize RealSense
-        self.pipeline = rs.pipeline()
-        self.config = rs.config()
-        
         # Use 640x480 as decided
-        self.config.enable_stream(rs.stream.depth, 848, 480, rs.format.z16, 30)
-        self.config.enable_stream(rs.stream.color, 848, 480, rs.format.bgr8, 30)
+        if source is None:
+            source = RealSenseFrameSource(848, 480, 30)
+        self.source = source
         
-        print("Starting RealSense camera...")
-        self.profile = self.pipeline.start(self.config)
+        self.source.start()
         
-        # Get depth sensor and scale
-        self.depth_sensor = self.profile.get_device().first_depth_sensor()
-        self.depth_scale = self.depth_sensor.get_depth_scale()
+        # Get depth scale
+        self.depth_scale = self.source.depth_scale
         
         # Get intrinsics and pass to transformer
-        depth_stream = self.profile.get_stream(rs.stream.depth)
-        self.intrinsics = depth_stream.as_video_stream_profile().get_intrinsics()
+        self.intrinsics = self.source.depth_intrinsics
         self.transformer.set_intrinsics(self.intrinsics)
         
-        # Align depth to color
-        self.align = rs.align(rs.stream.color)
-        
         # Warm up camera
-        print("Warming up camera...")
-        for _ in range(30):
-            self.pipeline.wait_for_frames()
+        if self.source.is_live:
+            print("Warming up camera (up to 1 second)...")
+        self.source.warmup(30)
         
         # Storage for clicked points
         self.clicked_points = []
@@ -157,19 +154,18 @@ class CalibrationClickTool:
         
         try:
             while True:
-                # Get frames
-                frames = self.pipeline.wait_for_frames()
-                aligned_frames = self.align.process(frames)
+                # Get aligned frames
+                frame = self.source.read(aligned=True)
                 
-                color_frame = aligned_frames.get_color_frame()
-                depth_frame = aligned_frames.get_depth_frame()
-                
-                if not color_frame or not depth_frame:
+                if frame is None:
+                    if self.source.finished:
+                        print("\nEnd of recording.")
+                        break
                     continue
                 
-                # Convert to numpy arrays
-                self.current_color = np.asanyarray(color_frame.get_data()).copy()
-                self.current_depth = np.asanyarray(depth_frame.get_data())
+                # Copy color so markers can be drawn on it
+                self.current_color = frame['color_image'].copy()
+                self.current_depth = frame['depth_image']
                 
                 # Add info overlay
                 self._add_info_overlay()
@@ -192,7 +188,7 @@ class CalibrationClickTool:
         
         finally:
             cv2.destroyAllWindows()
-            self.pipeline.stop()
+            self.source.stop()
             print("\nCamera stopped.")
     
     def _add_info_overlay(self):
@@ -273,44 +269,13 @@ class CalibrationClickTool:
         print(f"  Error:     ({error_x:+.1f}, {error_y:+.1f}) cm | Total: {error_total:.2f} cm")
 
 
-def main():
-    """Main entry point for the calibration tool."""
-    print("="*60)
-    print("CALIBRATION CLICKING TOOL")
-    print("="*60)
-    print()
-    
-    # Get camera parameters from user
-    print("Enter camera mounting parameters:")
-    print("(Press ENTER to use defaults from spatial test)")
-    print()
-    
-    height_input = input("Camera height (meters) [2.21]: ").strip()
-    camera_height = float(height_input) if height_input else 2.21
-    
-    pitch_input = input("Pitch angle (degrees, forward tilt) [3.0]: ").strip()
-    pitch_deg = float(pitch_input) if pitch_input else 3.0
-    
-    roll_input = input("Roll angle (degrees, left/right) [0.0]: ").strip()
-    roll_deg = float(roll_input) if roll_input else 0.0
-    
-    yaw_input = input("Yaw angle (degrees, rotation) [0.0]: ").strip()
-    yaw_deg = float(yaw_input) if yaw_input else 0.0
-    
-    print("\n" + "="*60)
-    
-    # Initialize tool
-    tool = CalibrationClickTool(
-        camera_height_m=camera_height,
-        pitch_deg=pitch_deg,
-        roll_deg=roll_deg,
-        yaw_deg=yaw_deg
-    )
-    
-    # Run interactive session
-    tool.run()
+def collect_ground_truth(tool):
+    """
+    Ask for physical measurements of the clicked points and print the error summary.
     
-    # Option to add ground truth measurements
+    Args:
+        tool: CalibrationClickTool after run()
+    """
     if len(tool.clicked_points) > 0:
         print("\n" + "="*60)
         print("Add ground truth measurements?")
@@ -341,6 +306,53 @@ def main():
                 print(f"Std dev: {np.std(errors):.2f} cm")
                 print(f"Max error: {np.max(errors):.2f} cm")
                 print(f"Min error: {np.min(errors):.2f} cm")
+
+
+def main():
+    """Main entry point for the calibration tool."""
+    print("="*60)
+    print("CALIBRATION CLICKING TOOL")
+    print("="*60)
+    print()
+    
+    # Get camera parameters from user
+    print("Enter camera mounting parameters:")
+    print("(Press ENTER to use defaults from spatial test)")
+    print()
+    
+    height_input = input("Camera height (meters) [2.21]: ").strip()
+    camera_height = float(height_input) if height_input else 2.21
+    
+    pitch_input = input("Pitch angle (degrees, forward tilt) [3.0]: ").strip()
+    pitch_deg = float(pitch_input) if pitch_input else 3.0
+    
+    roll_input = input("Roll angle (degrees, left/right) [0.0]: ").strip()
+    roll_deg = float(roll_input) if roll_input else 0.0
+    
+    yaw_input = input("Yaw angle (degrees, rotation) [0.0]: ").strip()
+    yaw_deg = float(yaw_input) if yaw_input else 0.0
+    
+    print("\n" + "="*60)
+    
+    # Initialize tool (optional frame source: 'synthetic' or a recording path)
+    source_spec = sys.argv[1] if len(sys.argv) > 1 else None
+    try:
+        tool = CalibrationClickTool(
+            camera_height_m=camera_height,
+            pitch_deg=pitch_deg,
+            roll_deg=roll_deg,
+            yaw_deg=yaw_deg,
+            source=open_frame_source(source_spec, 848, 480, 30)
+        )
+    except RuntimeError as e:
+        print(e)
+        sys.exit(1)
+    
+    # Run interactive session
+    tool.run()
+    
+    # Option to add ground truth measurements
+    collect_ground_truth(tool)
     
     print("\nCalibration session complete!")
 
@@ -11,8 +11,14 @@ Coordinate Systems:
 - World Frame: Origin on floor directly below camera, X forward, Y left, Z up (optional)
 """
 
+import sys
+from pathlib import Path
+
 import numpy as np
-import pyrealsense2 as rs
+
+# Make the repository root importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.utils.deprojection import undistort_normalized, get_ray_table
 
 
 class CoordinateTransformer:
@@ -44,6 +50,7 @@ class CoordinateTransformer:
         
         # Camera intrinsics (will be set when we get the actual camera)
         self.intrinsics = None
+        self.ray_table = None
         
         # Build rotation matrix from camera to world frame
         self._build_rotation_matrix()
@@ -60,6 +67,7 @@ class CoordinateTransformer:
             intrinsics: rs2.intrinsics object from depth stream
         """
         self.intrinsics = intrinsics
+        self.ray_table = get_ray_table(intrinsics)
         print(f"\nCamera intrinsics set:")
         print(f"  Resolution: {intrinsics.width} x {intrinsics.height}")
         print(f"  Focal length: fx={intrinsics.fx:.2f}, fy={intrinsics.fy:.2f}")
@@ -112,6 +120,18 @@ class CoordinateTransformer:
         ])
         
         self.R_cam_to_world = self.R_cam_to_world @ R_flip
+        
+        self._build_affine()
+    
+    def _build_affine(self):
+        """
+        Fuse rotation and camera height into one 3x4 affine transform
+        (world = A[:, :3] @ camera + A[:, 3]) used by the batch methods.
+        """
+        self.A_cam_to_world = np.zeros((3, 4))
+        self.A_cam_to_world[:, :3] = self.R_cam_to_world
+        self.A_cam_to_world[2, 3] = self.camera_height
+        self._affine_height = self.camera_height
     
     def pixel_to_camera_coords(self, pixel_x, pixel_y, depth_m):
         """
@@ -128,13 +148,9 @@ class CoordinateTransformer:
         if self.intrinsics is None:
             raise ValueError("Camera intrinsics not set! Call set_intrinsics() first.")
         
-        # Use RealSense SDK to deproject pixel to 3D point
-        # This handles all the intrinsic camera parameters (focal length, distortion, etc.)
-        point_3d = rs.rs2_deproject_pixel_to_point(
-            self.intrinsics,
-            [pixel_x, pixel_y],
-            depth_m
-        )
+        # Deproject with the cached ray table (same result as rs2_deproject_pixel_to_point,
+        # including focal length, principal point and distortion)
+        point_3d = self.ray_table.deproject_pixel(pixel_x, pixel_y, depth_m)
         
         return np.array(point_3d)
     
@@ -186,6 +202,79 @@ class CoordinateTransformer:
             'depth_m': depth_m
         }
     
+    def pixels_to_camera_coords(self, pixel_x, pixel_y, depth_m):
+        """
+        Batch version of pixel_to_camera_coords().
+        
+        Integer pixel arrays are looked up in the ray table; sub-pixel
+        coordinates are deprojected exactly.
+        
+        Args:
+            pixel_x: Array of pixel x coordinates (columns, may be sub-pixel)
+            pixel_y: Array of pixel y coordinates (rows)
+            depth_m: Array of depths (meters)
+            
+        Returns:
+            Nx3 array of (x, y, z) in camera frame (meters)
+        """
+        if self.intrinsics is None:
+            raise ValueError("Camera intrinsics not set! Call set_intrinsics() first.")
+        
+        pixel_x = np.asarray(pixel_x)
+        pixel_y = np.asarray(pixel_y)
+        if np.issubdtype(pixel_x.dtype, np.integer) and np.issubdtype(pixel_y.dtype, np.integer):
+            return self.ray_table.deproject_pixels(pixel_x, pixel_y, depth_m).astype(np.float64)
+        
+        u = np.asarray(pixel_x, dtype=np.float64).ravel()
+        v = np.asarray(pixel_y, dtype=np.float64).ravel()
+        depth = np.asarray(depth_m, dtype=np.float64).ravel()
+        
+        # Same math as rs2_deproject_pixel_to_point (also in float32), for all points at once
+        x, y = undistort_normalized(((u - self.intrinsics.ppx) / self.intrinsics.fx).astype(np.float32),
+                                    ((v - self.intrinsics.ppy) / self.intrinsics.fy).astype(np.float32),
+                                    self.intrinsics)
+        
+        camera_coords = np.empty((len(depth), 3))
+        np.multiply(x, depth, out=camera_coords[:, 0])
+        np.multiply(y, depth, out=camera_coords[:, 1])
+        camera_coords[:, 2] = depth
+        return camera_coords
+    
+    def cameras_to_world_coords(self, camera_coords):
+        """
+        Batch version of camera_to_world_coords().
+        
+        Args:
+            camera_coords: Nx3 array in camera frame (meters)
+            
+        Returns:
+            Nx3 array in world frame (meters)
+        """
+        # Camera height may have been changed directly on the object
+        if self._affine_height != self.camera_height:
+            self._build_affine()
+        
+        A = self.A_cam_to_world
+        world_coords = camera_coords @ A[:, :3].T
+        world_coords += A[:, 3]
+        return world_coords
+    
+    def pixels_to_world_coords(self, pixel_x, pixel_y, depth_m):
+        """
+        Batch version of pixel_to_world_coords() for detections, grids, etc.
+        
+        Args:
+            pixel_x: Array of pixel x coordinates (columns)
+            pixel_y: Array of pixel y coordinates (rows)
+            depth_m: Array of depths (meters)
+            
+        Returns:
+            (camera_coords, world_coords): two contiguous Nx3 arrays (meters).
+            world_coords[:, :2] is the floor position.
+        """
+        camera_coords = self.pixels_to_camera_coords(pixel_x, pixel_y, depth_m)
+        return camera_coords, self.cameras_to_world_coords(camera_coords)
+    
     def update_tilt(self, pitch_deg=None, roll_deg=None, yaw_deg=None):
         """
         Update camera tilt angles and rebuild rotation matrix.
@@ -195,6 +284,7 @@ class CoordinateTransformer:
             roll_deg: New roll angle (None = keep current)
             yaw_deg: New yaw angle (None = keep current)
         """
+        angles = (self.pitch_deg, self.roll_deg, self.yaw_deg)
         if pitch_deg is not None:
             self.pitch_deg = pitch_deg
         if roll_deg is not None:
@@ -202,7 +292,9 @@ class CoordinateTransformer:
         if yaw_deg is not None:
             self.yaw_deg = yaw_deg
         
-        self._build_rotation_matrix()
+        # Rotation and the fused affine only change when the angles do
+        if (self.pitch_deg, self.roll_deg, self.yaw_deg) != angles:
+            self._build_rotation_matrix()
         print(f"Tilt updated: Pitch={self.pitch_deg:.2f}°, Roll={self.roll_deg:.2f}°, Yaw={self.yaw_deg:.2f}°")
 
 